@@ -0,0 +1,125 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from calculator.constants import GNOMAD_REFERENCE_GENOMES
+from calculator.models import DashboardList, OutboxMessage, VariantList
+
+
+def get_transcript_id_without_version(transcript_id):
+    return transcript_id.split(".")[0] if transcript_id else None
+
+
+def includes_transcript_variants(variant_list):
+    """Return whether a list's variants are looked up from its transcript."""
+    metadata = variant_list.metadata or {}
+    return bool(
+        variant_list.type == VariantList.Type.RECOMMENDED
+        or metadata.get("include_gnomad_plof")
+        or metadata.get("include_clinvar_clinical_significance")
+    )
+
+
+def get_affected_variant_lists(change_set):
+    """
+    Return ready variant lists whose results may change with a ClinVar change set.
+
+    A list is affected if it contains a changed variant, or if its variants are
+    looked up from a transcript that a changed variant has a consequence in.
+    """
+    changed_variant_ids = {variant["id"] for variant in change_set["variants"]}
+    changed_transcript_ids = {
+        get_transcript_id_without_version(transcript_id)
+        for transcript_id in change_set["transcript_ids"]
+    }
+
+    affected_variant_lists = []
+    # Lists' variants can be large, so lists are read in batches
+    for variant_list in VariantList.objects.filter(
+        status=VariantList.Status.READY
+    ).iterator(chunk_size=100):
+        metadata = variant_list.metadata or {}
+        if (
+            GNOMAD_REFERENCE_GENOMES.get(metadata.get("gnomad_version"))
+            != change_set["reference_genome"]
+        ):
+            continue
+
+        if (
+            includes_transcript_variants(variant_list)
+            and get_transcript_id_without_version(metadata.get("transcript_id"))
+            in changed_transcript_ids
+        ) or any(
+            variant["id"] in changed_variant_ids for variant in variant_list.variants
+        ):
+            affected_variant_lists.append(variant_list)
+
+    return affected_variant_lists
+
+
+def get_affected_dashboard_lists(change_set):
+    """Return dashboard lists for transcripts that a changed variant has a consequence in."""
+    changed_transcript_ids = {
+        get_transcript_id_without_version(transcript_id)
+        for transcript_id in change_set["transcript_ids"]
+    }
+
+    return [
+        dashboard_list
+        for dashboard_list in DashboardList.objects.only("id", "gene_id", "metadata")
+        if GNOMAD_REFERENCE_GENOMES.get(dashboard_list.metadata.get("gnomad_version"))
+        == change_set["reference_genome"]
+        and get_transcript_id_without_version(
+            dashboard_list.metadata.get("transcript_id")
+        )
+        in changed_transcript_ids
+    ]
+
+
+def reprocess_variant_lists(variant_lists):
+    with transaction.atomic():
+        for variant_list in variant_lists:
+            variant_list.set_status(VariantList.Status.QUEUED)
+            # published to the worker by the website's scheduled outbox dispatch
+            OutboxMessage.objects.create(
+                message=variant_list.request_processing(lane=VariantList.Lane.BULK)
+            )
+
+
+class Command(BaseCommand):
+    help = "Find variant lists and dashboard lists affected by a ClinVar change set"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "change_set", help="Path to a change set written by diff_clinvar.py"
+        )
+        parser.add_argument(
+            "--reprocess",
+            action="store_true",
+            help="Queue affected variant lists for processing in the bulk lane",
+        )
+
+    def handle(self, *args, **options):
+        with open(options["change_set"], encoding="utf-8") as f:
+            change_set = json.load(f)
+
+        variant_lists = get_affected_variant_lists(change_set)
+        dashboard_lists = get_affected_dashboard_lists(change_set)
+
+        self.stdout.write(
+            f"{len(change_set['variants'])} variants changed between ClinVar releases "
+            f"{change_set['previous_release_date']} and {change_set['release_date']}"
+        )
+
+        self.stdout.write(f"{len(variant_lists)} affected variant lists:")
+        for variant_list in variant_lists:
+            self.stdout.write(f"  {variant_list.uuid}")
+
+        self.stdout.write(f"{len(dashboard_lists)} affected dashboard lists:")
+        for dashboard_list in dashboard_lists:
+            self.stdout.write(f"  {dashboard_list.gene_id}")
+
+        if options["reprocess"]:
+            reprocess_variant_lists(variant_lists)
+            self.stdout.write(f"Queued {len(variant_lists)} variant lists")
@@ -0,0 +1,242 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from calculator.constants import GNOMAD_VERSIONS
+from calculator.models import OutboxMessage, VariantList
+
+
+IN_FLIGHT_STATUSES = (VariantList.Status.QUEUED, VariantList.Status.PROCESSING)
+
+
+def get_selected_variant_lists(
+    gnomad_versions=None, clinvar_versions=None, statuses=None, gene_ids=None
+):
+    variant_lists = VariantList.objects.all()
+
+    if gnomad_versions:
+        variant_lists = variant_lists.filter(
+            metadata__gnomad_version__in=gnomad_versions
+        )
+
+    if clinvar_versions:
+        variant_lists = variant_lists.filter(
+            metadata__clinvar_version__in=clinvar_versions
+        )
+
+    if statuses:
+        variant_lists = variant_lists.filter(status__in=statuses)
+
+    if gene_ids:
+        gene_filter = Q()
+        for gene_id in gene_ids:
+            # Gene IDs in metadata include a version
+            gene_filter |= Q(metadata__gene_id=gene_id) | Q(
+                metadata__gene_id__startswith=f"{gene_id}."
+            )
+        variant_lists = variant_lists.filter(gene_filter)
+
+    return variant_lists.order_by("id")
+
+
+def load_checkpoint(path):
+    """
+    Read the progress of an earlier run, so that an interrupted run can be resumed.
+
+    The checkpoint records the last list that was queued, the lists that were
+    queued and have not finished processing, and the outcome of finished lists.
+    """
+    checkpoint = {"last_id": 0, "in_flight": [], "num_completed": 0, "failed": {}}
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            checkpoint.update(json.load(f))
+
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    if not path:
+        return
+
+    # Write to a temporary file first so that an interrupted write does not
+    #   leave a partial checkpoint
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def update_in_flight(checkpoint):
+    """Record the outcome of queued lists that have finished processing."""
+    in_flight = []
+    for variant_list in VariantList.objects.filter(id__in=checkpoint["in_flight"]).only(
+        "id", "uuid", "status", "error"
+    ):
+        if variant_list.status in IN_FLIGHT_STATUSES:
+            in_flight.append(variant_list.id)
+        elif variant_list.status == VariantList.Status.ERROR:
+            checkpoint["failed"][str(variant_list.uuid)] = variant_list.error
+        else:
+            checkpoint["num_completed"] += 1
+
+    checkpoint["in_flight"] = in_flight
+
+
+def queue_variant_list(variant_list, gnomad_version=None):
+    updated_fields = {}
+    if gnomad_version and variant_list.metadata["gnomad_version"] != gnomad_version:
+        updated_fields["metadata"] = {
+            **variant_list.metadata,
+            "gnomad_version": gnomad_version,
+        }
+
+    with transaction.atomic():
+        lease = (
+            VariantList.objects.select_for_update()
+            .only("status", "lease_expires_at")
+            .get(id=variant_list.id)
+        )
+        if lease.has_active_lease():
+            # Queuing the list now would let another worker claim it while
+            #   this run is in progress. The worker processing it requeues it
+            #   when the run finishes.
+            variant_list.request_processing_again(
+                lane=VariantList.Lane.BULK, **updated_fields
+            )
+        else:
+            variant_list.set_status(VariantList.Status.QUEUED, **updated_fields)
+            # published to the worker by the website's scheduled outbox dispatch
+            OutboxMessage.objects.create(
+                message=variant_list.request_processing(lane=VariantList.Lane.BULK)
+            )
+
+
+class Command(BaseCommand):
+    help = (
+        "Reprocess variant lists in the bulk lane at a limited rate, for example "
+        "after a gnomAD or ClinVar data release"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--gnomad-version",
+            action="append",
+            dest="gnomad_versions",
+            help="Select lists using this gnomAD version",
+        )
+        parser.add_argument(
+            "--clinvar-version",
+            action="append",
+            dest="clinvar_versions",
+            help="Select lists processed with this ClinVar release",
+        )
+        parser.add_argument(
+            "--status",
+            action="append",
+            dest="statuses",
+            choices=VariantList.Status.values,
+            help="Select lists with this status (default: ready)",
+        )
+        parser.add_argument(
+            "--gene-id",
+            action="append",
+            dest="gene_ids",
+            help="Select lists for this gene",
+        )
+        parser.add_argument(
+            "--set-gnomad-version",
+            choices=GNOMAD_VERSIONS,
+            help="Change selected lists to this gnomAD version before processing them",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=1,
+            help="Maximum number of lists to queue per second",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=20,
+            help="Maximum number of queued lists that have not finished processing",
+        )
+        parser.add_argument(
+            "--checkpoint",
+            help="File recording progress, used to resume an interrupted run",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the number of selected lists without queuing them",
+        )
+
+    def handle(self, *args, **options):
+        if options["rate"] <= 0 or options["max_in_flight"] <= 0:
+            raise CommandError("--rate and --max-in-flight must be positive")
+
+        variant_lists = get_selected_variant_lists(
+            gnomad_versions=options["gnomad_versions"],
+            clinvar_versions=options["clinvar_versions"],
+            statuses=options["statuses"] or [VariantList.Status.READY],
+            gene_ids=options["gene_ids"],
+        )
+
+        checkpoint = load_checkpoint(options["checkpoint"])
+        variant_lists = variant_lists.filter(id__gt=checkpoint["last_id"])
+
+        num_selected = variant_lists.count()
+        self.stdout.write(f"Selected {num_selected} variant lists")
+        if options["dry_run"]:
+            return
+
+        num_queued = 0
+        while True:
+            update_in_flight(checkpoint)
+
+            num_free_slots = options["max_in_flight"] - len(checkpoint["in_flight"])
+            # Lists are selected again for each batch so that lists which changed
+            #   since the run started are only queued if they still match
+            batch = (
+                list(
+                    variant_lists.filter(id__gt=checkpoint["last_id"])[:num_free_slots]
+                )
+                if num_free_slots > 0
+                else []
+            )
+
+            for variant_list in batch:
+                queue_variant_list(variant_list, options["set_gnomad_version"])
+                checkpoint["last_id"] = variant_list.id
+                checkpoint["in_flight"].append(variant_list.id)
+                num_queued += 1
+                save_checkpoint(options["checkpoint"], checkpoint)
+                time.sleep(1 / options["rate"])
+
+            if batch:
+                self.stdout.write(
+                    f"Queued {num_queued}/{num_selected}, "
+                    f"{len(checkpoint['in_flight'])} in flight, "
+                    f"{checkpoint['num_completed']} completed, "
+                    f"{len(checkpoint['failed'])} failed"
+                )
+
+            if (
+                not checkpoint["in_flight"]
+                and not variant_lists.filter(id__gt=checkpoint["last_id"]).exists()
+            ):
+                break
+
+            if not batch:
+                time.sleep(max(1 / options["rate"], 1))
+
+        save_checkpoint(options["checkpoint"], checkpoint)
+
+        self.stdout.write(
+            f"Finished: {checkpoint['num_completed']} completed, "
+            f"{len(checkpoint['failed'])} failed"
+        )
+        for uuid, error in checkpoint["failed"].items():
+            self.stdout.write(f"  {uuid}: {error}")
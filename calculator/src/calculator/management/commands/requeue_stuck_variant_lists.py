@@ -0,0 +1,105 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from calculator.models import OutboxMessage, VariantList
+
+DEFAULT_MAX_ATTEMPTS = 3
+
+DEFAULT_STALE_AFTER = timedelta(hours=2)
+
+
+def requeue_stuck_variant_lists(
+    max_attempts=DEFAULT_MAX_ATTEMPTS, stale_after=DEFAULT_STALE_AFTER
+):
+    """
+    Requeue variant lists that are PROCESSING but whose worker has stopped
+    sending heartbeats. Lists that have already been attempted max_attempts
+    times are marked as errored instead.
+
+    Returns the numbers of lists requeued and errored.
+    """
+    now = timezone.now()
+
+    num_requeued = 0
+    num_errored = 0
+
+    with transaction.atomic():
+        stuck_variant_lists = VariantList.objects.select_for_update(
+            skip_locked=True
+        ).filter(
+            Q(lease_expires_at__lt=now)
+            # lists started before heartbeats were recorded
+            | Q(lease_expires_at__isnull=True, updated_at__lt=now - stale_after),
+            status=VariantList.Status.PROCESSING,
+        )
+
+        for variant_list in stuck_variant_lists:
+            if variant_list.processing_attempts >= max_attempts:
+                variant_list.set_status(
+                    VariantList.Status.ERROR,
+                    error=(
+                        "Processing did not finish after "
+                        f"{variant_list.processing_attempts} attempts"
+                    ),
+                    lease_owner=None,
+                    lease_expires_at=None,
+                )
+                num_errored += 1
+            else:
+                variant_list.set_status(
+                    VariantList.Status.QUEUED, lease_owner=None, lease_expires_at=None
+                )
+                # published to the worker by the website's scheduled outbox dispatch
+                OutboxMessage.objects.create(
+                    message=variant_list.request_processing(
+                        lane=variant_list.lane, retry=True
+                    )
+                )
+                num_requeued += 1
+
+    return num_requeued, num_errored
+
+
+class Command(BaseCommand):
+    help = "Requeue variant lists whose worker stopped while processing them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=DEFAULT_MAX_ATTEMPTS,
+            help="Mark lists as errored after this many processing attempts",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=int(DEFAULT_STALE_AFTER.total_seconds()),
+            help="Seconds after which a processing list without a lease is stuck",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=None,
+            help="Keep running, checking for stuck lists every this many seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            num_requeued, num_errored = requeue_stuck_variant_lists(
+                options["max_attempts"], timedelta(seconds=options["stale_after"])
+            )
+
+            if num_requeued or num_errored:
+                self.stdout.write(
+                    f"Requeued {num_requeued} and errored {num_errored} stuck variant lists"
+                )
+
+            if options["interval"] is None:
+                break
+
+            time.sleep(options["interval"])
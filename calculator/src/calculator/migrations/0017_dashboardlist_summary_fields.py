@@ -0,0 +1,83 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:50
+
+from django.db import migrations, models
+
+
+def populate_summary_fields(apps, schema_editor):  # pylint: disable=unused-argument
+    DashboardList = apps.get_model("calculator", "DashboardList")
+
+    dashboard_lists = DashboardList.objects.select_related("dominant_dashboard_list")
+    for dashboard_list in dashboard_lists.iterator(chunk_size=500):
+        calculations = dashboard_list.variant_calculations or {}
+
+        carrier_frequency = calculations.get("carrier_frequency")
+        dashboard_list.aggregate_allele_frequency = (
+            carrier_frequency[0] / 2 if carrier_frequency else 0
+        )
+
+        prevalence = calculations.get("prevalence")
+        dashboard_list.estimated_genetic_prevalence = prevalence[0] if prevalence else 0
+
+        dominant_dashboard_list = dashboard_list.dominant_dashboard_list
+        dashboard_list.estimated_de_novo_incidence = (
+            (dominant_dashboard_list.de_novo_variant_calculations or {}).get(
+                "total_de_novo_incidence"
+            )
+            or 0
+            if dominant_dashboard_list
+            else None
+        )
+
+        dashboard_list.save(
+            update_fields=[
+                "aggregate_allele_frequency",
+                "estimated_genetic_prevalence",
+                "estimated_de_novo_incidence",
+            ]
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0016_dominant_dashboard_list"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dashboardlist",
+            name="aggregate_allele_frequency",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="dashboardlist",
+            name="estimated_de_novo_incidence",
+            field=models.FloatField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="dashboardlist",
+            name="estimated_genetic_prevalence",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="dashboardlist",
+            index=models.Index(
+                fields=["aggregate_allele_frequency"],
+                name="calculator__aggrega_68c2d5_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dashboardlist",
+            index=models.Index(
+                fields=["estimated_genetic_prevalence"],
+                name="calculator__estimat_6f71f4_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dashboardlist",
+            index=models.Index(
+                fields=["estimated_de_novo_incidence"],
+                name="calculator__estimat_3c9333_idx",
+            ),
+        ),
+        migrations.RunPython(populate_summary_fields, migrations.RunPython.noop),
+    ]
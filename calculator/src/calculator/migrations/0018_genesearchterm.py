@@ -0,0 +1,122 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def get_search_terms(metadata, label, gene_id=None):
+    metadata = metadata or {}
+
+    terms = []
+    if metadata.get("gene_symbol"):
+        terms.append(("s", metadata["gene_symbol"]))
+
+    for alias_symbol in metadata.get("alias_symbols") or []:
+        terms.append(("a", alias_symbol))
+
+    gene_id = gene_id or metadata.get("gene_id")
+    if gene_id:
+        terms.append(("g", gene_id.split(".")[0]))
+
+    if label:
+        terms.append(("l", label))
+
+    return {(kind, term.lower()) for kind, term in terms}
+
+
+def populate_search_terms(apps, schema_editor):  # pylint: disable=unused-argument
+    DashboardList = apps.get_model("calculator", "DashboardList")
+    VariantList = apps.get_model("calculator", "VariantList")
+    GeneSearchTerm = apps.get_model("calculator", "GeneSearchTerm")
+
+    search_terms = []
+
+    dashboard_lists = DashboardList.objects.only("gene_id", "label", "metadata")
+    for dashboard_list in dashboard_lists.iterator(chunk_size=500):
+        search_terms.extend(
+            GeneSearchTerm(dashboard_list=dashboard_list, kind=kind, term=term)
+            for kind, term in get_search_terms(
+                dashboard_list.metadata,
+                dashboard_list.label,
+                gene_id=dashboard_list.gene_id,
+            )
+        )
+
+    variant_lists = VariantList.objects.filter(
+        models.Q(is_public=True) | models.Q(representative_status="A")
+    ).only("label", "metadata")
+    for variant_list in variant_lists.iterator(chunk_size=500):
+        search_terms.extend(
+            GeneSearchTerm(variant_list=variant_list, kind=kind, term=term)
+            for kind, term in get_search_terms(
+                variant_list.metadata, variant_list.label
+            )
+        )
+
+    GeneSearchTerm.objects.bulk_create(search_terms, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0017_dashboardlist_summary_fields"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GeneSearchTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=1000)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("s", "Gene symbol"),
+                            ("g", "Gene ID"),
+                            ("a", "Alias symbol"),
+                            ("l", "Label"),
+                        ],
+                        max_length=1,
+                    ),
+                ),
+                (
+                    "dashboard_list",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        related_query_name="search_term",
+                        to="calculator.dashboardlist",
+                    ),
+                ),
+                (
+                    "variant_list",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_terms",
+                        related_query_name="search_term",
+                        to="calculator.variantlist",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["term"],
+                        name="calculator_search_term_idx",
+                        opclasses=("varchar_pattern_ops",),
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(populate_search_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:58
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0018_genesearchterm"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OutboxMessage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("message", models.JSONField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "available_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("attempts", models.IntegerField(default=0)),
+                ("last_error", models.TextField(default=None, null=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["available_at"], name="calculator__availab_cc4f8f_idx"
+                    )
+                ],
+            },
+        ),
+    ]
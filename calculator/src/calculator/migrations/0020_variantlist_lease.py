@@ -0,0 +1,26 @@
+# Generated by Django 4.2.30 on 2026-10-19 02:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0019_outboxmessage"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantlist",
+            name="lease_expires_at",
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="variantlist",
+            name="lease_owner",
+            field=models.CharField(default=None, max_length=100, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="variantlist",
+            index=models.Index(fields=["status"], name="calculator__status_e75d09_idx"),
+        ),
+    ]
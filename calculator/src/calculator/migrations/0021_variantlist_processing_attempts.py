@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0020_variantlist_lease"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantlist",
+            name="processing_attempts",
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0021_variantlist_processing_attempts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantlist",
+            name="job_generation",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="variantlist",
+            name="num_coalesced_jobs",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="variantlist",
+            name="num_dropped_jobs",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="variantlist",
+            name="started_generation",
+            field=models.IntegerField(default=0),
+        ),
+    ]
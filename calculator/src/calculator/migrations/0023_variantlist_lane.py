@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0022_variantlist_job_generation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantlist",
+            name="lane",
+            field=models.CharField(
+                choices=[("i", "Interactive"), ("l", "Large"), ("b", "Bulk")],
+                default="i",
+                max_length=1,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="variantlist",
+            index=models.Index(
+                fields=["status", "lane"], name="calculator__status_ba0284_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0023_variantlist_lane"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantlist",
+            name="finished_at",
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name="variantlist",
+            name="started_at",
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="variantlist",
+            index=models.Index(
+                fields=["lane", "finished_at"], name="calculator__lane_1de77b_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.30 on 2026-10-19 03:14
+
+import re
+
+from django.db import migrations, models
+
+
+UUID_PATTERN = re.compile(
+    r"\b[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}\b", re.I
+)
+
+QUOTED_VALUE_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+NUMBER_PATTERN = re.compile(r"\b(?:0x[0-9a-f]+|\d+(?:\.\d+)?)\b", re.I)
+
+FRAME_PATTERN = re.compile(r'^File "(?:.*/)?([^/"]+)", line \d+, in (\S+)')
+
+
+def get_error_signature(error):
+    lines = [line.strip() for line in (error or "").splitlines() if line.strip()]
+    if not lines:
+        return ""
+
+    exception = lines[-1]
+    exception = UUID_PATTERN.sub("<uuid>", exception)
+    exception = QUOTED_VALUE_PATTERN.sub("'...'", exception)
+    exception = NUMBER_PATTERN.sub("<n>", exception)
+
+    frames = [FRAME_PATTERN.match(line) for line in lines]
+    frames = [frame for frame in frames if frame]
+    if frames:
+        exception = f"{frames[-1][1]} in {frames[-1][2]}: {exception}"
+
+    return exception[:500]
+
+
+def populate_error_signatures(apps, schema_editor):  # pylint: disable=unused-argument
+    VariantList = apps.get_model("calculator", "VariantList")
+
+    variant_lists = VariantList.objects.filter(error__isnull=False).only("error")
+    for variant_list in variant_lists.iterator(chunk_size=500):
+        VariantList.objects.filter(id=variant_list.id).update(
+            error_signature=get_error_signature(variant_list.error)
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("calculator", "0024_variantlist_started_at_finished_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="variantlist",
+            name="error_signature",
+            field=models.CharField(default="", max_length=500),
+        ),
+        migrations.AddField(
+            model_name="variantlist",
+            name="queued_at",
+            field=models.DateTimeField(default=None, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="variantlist",
+            index=models.Index(
+                fields=["status", "error_signature"],
+                name="calculator__status_b7251d_idx",
+            ),
+        ),
+        migrations.RunPython(populate_error_signatures, migrations.RunPython.noop),
+    ]
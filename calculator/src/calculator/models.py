@@ -1,12 +1,73 @@
+import copy
+import re
 import uuid
 from functools import wraps
 
 import rules
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
+
+
+class GeneSearchIndexMixin:
+    """
+    Track the values of a model's SEARCH_INDEX_FIELDS as loaded from the
+    database, so that its gene search terms are only rebuilt when one of those
+    fields is changed.
+    """
+
+    SEARCH_INDEX_FIELDS = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.set_loaded_search_index_values(
+            {
+                field_name: value
+                for field_name, value in zip(field_names, values)
+                if field_name in cls.SEARCH_INDEX_FIELDS
+            }
+        )
+        return instance
+
+    def set_loaded_search_index_values(self, values):
+        # values are copied so that changes made to a loaded dict are detected
+        self._loaded_search_index_values = copy.deepcopy(values)
+
+    def has_search_index_changed(self, update_fields=None):
+        if self._state.adding:
+            return True
+
+        fields = self.SEARCH_INDEX_FIELDS
+        if update_fields is not None:
+            fields = [field for field in fields if field in update_fields]
+
+        loaded_values = getattr(self, "_loaded_search_index_values", None)
+        if loaded_values is None:
+            return bool(fields)
+
+        deferred_fields = self.get_deferred_fields()
+        return any(
+            field not in deferred_fields
+            and (
+                field not in loaded_values
+                or loaded_values[field] != getattr(self, field)
+            )
+            for field in fields
+        )
 
+    def save_search_index(self):
+        self.update_gene_search_terms()
+        self.set_loaded_search_index_values(
+            {
+                field: getattr(self, field)
+                for field in self.SEARCH_INDEX_FIELDS
+                if field not in self.get_deferred_fields()
+            }
+        )
 
-class VariantList(models.Model):
+
+class VariantList(GeneSearchIndexMixin, models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, unique=True)
 
     label = models.CharField(max_length=1000)
@@ -57,6 +118,206 @@ class VariantList(models.Model):
     )
 
     error = models.TextField(null=True, default=None)
+    # Derived from error, used to group lists that failed in the same way
+    error_signature = models.CharField(max_length=500, default="")
+
+    # Set while a worker that claimed this list from the job queue is processing
+    #   it. The worker extends the lease with periodic heartbeats.
+    lease_owner = models.CharField(max_length=100, null=True, default=None)
+    lease_expires_at = models.DateTimeField(null=True, default=None)
+
+    # number of times processing has been started since processing was last
+    #   requested, used to stop requeuing lists that keep failing
+    processing_attempts = models.IntegerField(default=0)
+
+    # Incremented for every request to process the list. Messages to the worker
+    #   carry the generation they were sent for, so that stale and duplicate
+    #   messages can be dropped and quick successive requests share one run.
+    job_generation = models.IntegerField(default=0)
+    # job_generation when the latest run started
+    started_generation = models.IntegerField(default=0)
+
+    # messages dropped by the worker because a newer generation will be processed
+    num_coalesced_jobs = models.IntegerField(default=0)
+    # messages dropped by the worker because their generation was already started
+    num_dropped_jobs = models.IntegerField(default=0)
+
+    # When processing was last requested and when the latest run started and
+    #   finished, used to report how long lists wait in the queue and how long
+    #   processing takes
+    queued_at = models.DateTimeField(null=True, default=None)
+    started_at = models.DateTimeField(null=True, default=None)
+    finished_at = models.DateTimeField(null=True, default=None)
+
+    # Jobs are routed to lanes by their estimated cost, so that small interactive
+    #   jobs do not wait behind large or bulk jobs. Each lane has its own topic
+    #   and concurrency limit.
+    class Lane(models.TextChoices):
+        INTERACTIVE = ("i", "Interactive")
+        LARGE = ("l", "Large")
+        BULK = ("b", "Bulk")
+
+    lane = models.CharField(
+        max_length=1, choices=Lane.choices, default=Lane.INTERACTIVE
+    )
+
+    # Lists with more variants than this are processed in the large jobs lane
+    INTERACTIVE_JOB_MAX_VARIANTS = 100
+
+    # These are only changed with QuerySet.update so that concurrent requests and
+    #   workers do not overwrite each other's changes, and are left out of saves
+    #   of existing lists.
+    JOB_STATE_FIELDS = (
+        "lane",
+        "queued_at",
+        "started_at",
+        "finished_at",
+        "job_generation",
+        "started_generation",
+        "num_coalesced_jobs",
+        "num_dropped_jobs",
+    )
+
+    def estimate_job_lane(self):
+        """
+        Return the lane for processing the list, from its estimated cost.
+
+        Cost is estimated from what the worker reads, rather than from the
+        genomic span of the list. Lists that read a whole transcript always go
+        to the large lane, since the transcript's span is only known once the
+        worker looks it up. Other lists are read one variant at a time, so their
+        cost depends on the number of variants and not on how far apart they are.
+        """
+        metadata = self.metadata or {}
+
+        # Recommended lists include every variant in a transcript, and gnomAD pLoF
+        #   and ClinVar variants are looked up across the whole transcript
+        if (
+            self.type == self.Type.RECOMMENDED
+            or metadata.get("include_gnomad_plof")
+            or metadata.get("include_clinvar_clinical_significance")
+        ):
+            return self.Lane.LARGE
+
+        num_variants = len(self.variants) + len(self.structural_variants)
+        if num_variants > self.INTERACTIVE_JOB_MAX_VARIANTS:
+            return self.Lane.LARGE
+
+        return self.Lane.INTERACTIVE
+
+    def get_process_message(self):
+        return {
+            "type": "process_variant_list",
+            "lane": self.lane,
+            "args": {"uuid": str(self.uuid), "generation": self.job_generation},
+        }
+
+    def request_processing(self, lane=None, retry=False):
+        """
+        Start a new job generation and return the message that asks the worker to
+        process it.
+
+        The job is routed to the given lane, or to a lane based on the estimated
+        cost of processing the list. Processing attempts are counted from the
+        latest request that is not a retry.
+        """
+        job_fields = {
+            "lane": lane or self.estimate_job_lane(),
+            "job_generation": models.F("job_generation") + 1,
+        }
+        if not retry:
+            job_fields["processing_attempts"] = 0
+
+        VariantList.objects.filter(id=self.id).update(**job_fields)
+        self.refresh_from_db(fields=job_fields.keys())
+        self.record_processing_event("queued")
+        return self.get_process_message()
+
+    def set_status(self, status, **fields):
+        """
+        Change the list's status, along with other processing state given as
+        keyword arguments.
+
+        Only those columns are written, so that status changes do not rewrite the
+        variants, which can be several megabytes.
+        """
+        self.status = status
+        for field, value in fields.items():
+            setattr(self, field, value)
+
+        self.save(update_fields=["status", *fields, "updated_at"])
+
+    def set_finished_status(self, status, **fields):
+        """
+        Record the outcome of a run, along with other state given as keyword
+        arguments, and release the run's lease.
+
+        The status is only written if the list is still leased to the run's worker
+        for the generation that the run started, so that a run which lost its
+        lease does not overwrite the state of a newer run. Returns whether the
+        status was written.
+        """
+        if self.lease_owner is None:
+            return False
+
+        fields = {**fields, "lease_owner": None, "lease_expires_at": None}
+        if "error" in fields:
+            fields["error_signature"] = get_error_signature(fields["error"])
+
+        num_updated = VariantList.objects.filter(
+            id=self.id,
+            lease_owner=self.lease_owner,
+            started_generation=self.started_generation,
+        ).update(status=status, updated_at=timezone.now(), **fields)
+        if not num_updated:
+            return False
+
+        self.status = status
+        for field, value in fields.items():
+            setattr(self, field, value)
+
+        return True
+
+    def has_active_lease(self):
+        return (
+            self.status == self.Status.PROCESSING
+            and self.lease_expires_at is not None
+            and self.lease_expires_at > timezone.now()
+        )
+
+    def request_processing_again(self, lane=None, **fields):
+        """
+        Ask for a list that is being processed to be processed again once the
+        current run finishes.
+
+        The list stays PROCESSING, so that no other worker can claim it while
+        the current run is in progress. When the run finishes, the worker sees the
+        newer job generation and requeues the list.
+        """
+        job_fields = {"job_generation": models.F("job_generation") + 1, **fields}
+        if lane:
+            job_fields["lane"] = lane
+
+        VariantList.objects.filter(id=self.id).update(**job_fields)
+        self.refresh_from_db(fields=job_fields.keys())
+
+    def record_processing_event(self, event):
+        """
+        Record the time that the list was queued, started, or finished processing.
+
+        Only the timestamp columns are updated, so that recording an event does not
+        rewrite the rest of the row.
+        """
+        now = timezone.now()
+        timestamps = {
+            "queued": {"queued_at": now, "started_at": None, "finished_at": None},
+            "started": {"started_at": now, "finished_at": None},
+            "finished": {"finished_at": now},
+        }[event]
+
+        VariantList.objects.filter(id=self.id).update(**timestamps)
+        for field, value in timestamps.items():
+            setattr(self, field, value)
 
     class RepresentativeStatus(models.TextChoices):
         PRIVATE = ("", "Private")
@@ -77,10 +338,54 @@ class VariantList(models.Model):
 
     is_public = models.BooleanField(default=False)
 
+    # fields that determine this list's entries in the gene search index
+    SEARCH_INDEX_FIELDS = ("label", "metadata", "is_public", "representative_status")
+
+    def is_listed_publicly(self):
+        return (
+            self.is_public
+            or self.representative_status == self.RepresentativeStatus.APPROVED
+        )
+
+    def update_gene_search_terms(self):
+        self.search_terms.all().delete()
+
+        if self.is_listed_publicly():
+            GeneSearchTerm.objects.bulk_create(
+                GeneSearchTerm(variant_list=self, kind=kind, term=term)
+                for kind, term in get_gene_search_terms(self.metadata, self.label)
+            )
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        search_index_changed = self.has_search_index_changed(update_fields)
+
+        if update_fields is None or "error" in update_fields:
+            self.error_signature = get_error_signature(self.error)
+            if update_fields is not None:
+                kwargs["update_fields"] = [*update_fields, "error_signature"]
+
+        if update_fields is None and not self._state.adding:
+            excluded_fields = {*self.JOB_STATE_FIELDS, *self.get_deferred_fields()}
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in excluded_fields
+            ]
+
+        super().save(*args, **kwargs)
+
+        if search_index_changed:
+            self.save_search_index()
+
     class Meta:
         indexes = [
             models.Index(fields=("uuid",)),
             models.Index(fields=("representative_status",)),
+            models.Index(fields=("status",)),
+            models.Index(fields=("status", "lane")),
+            models.Index(fields=("lane", "finished_at")),
+            models.Index(fields=("status", "error_signature")),
         ]
 
 
@@ -95,13 +400,43 @@ class DominantDashboardList(models.Model):
 
     inheritance_type = models.CharField(max_length=100, blank=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def get_total_de_novo_incidence(self):
+        de_novo_calculations = self.de_novo_variant_calculations or {}
+        return de_novo_calculations.get("total_de_novo_incidence") or 0
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+
+        # keep the summary column on linked dashboard lists in sync
+        DashboardList.objects.filter(dominant_dashboard_list=self).update(
+            estimated_de_novo_incidence=self.get_total_de_novo_incidence()
+        )
+
     class Meta:
         indexes = [
             models.Index(fields=("gene_id",)),
         ]
 
 
-class DashboardList(models.Model):
+def get_aggregate_allele_frequency(variant_calculations):
+    carrier_frequency = (variant_calculations or {}).get("carrier_frequency")
+    if carrier_frequency:
+        return carrier_frequency[0] / 2
+
+    return 0
+
+
+def get_estimated_genetic_prevalence(variant_calculations):
+    prevalence = (variant_calculations or {}).get("prevalence")
+    if prevalence:
+        return prevalence[0]
+
+    return 0
+
+
+class DashboardList(GeneSearchIndexMixin, models.Model):
     gene_id = models.CharField(max_length=100, unique=True)
     label = models.CharField(max_length=1000)
     notes = models.TextField(default="")
@@ -158,12 +493,171 @@ class DashboardList(models.Model):
 
     error = models.TextField(null=True, default=None)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Summary numbers derived from variant_calculations and the linked dominant
+    #   dashboard list. These are stored as columns so that the dashboard can be
+    #   sorted and filtered by them in the database.
+    aggregate_allele_frequency = models.FloatField(default=0)
+    estimated_genetic_prevalence = models.FloatField(default=0)
+    # null when there is no linked dominant dashboard list
+    estimated_de_novo_incidence = models.FloatField(null=True, default=None)
+
+    SUMMARY_FIELDS = (
+        "aggregate_allele_frequency",
+        "estimated_genetic_prevalence",
+        "estimated_de_novo_incidence",
+    )
+
+    def update_summary_fields(self):
+        self.aggregate_allele_frequency = get_aggregate_allele_frequency(
+            self.variant_calculations
+        )
+        self.estimated_genetic_prevalence = get_estimated_genetic_prevalence(
+            self.variant_calculations
+        )
+        self.estimated_de_novo_incidence = (
+            self.dominant_dashboard_list.get_total_de_novo_incidence()
+            if self.dominant_dashboard_list
+            else None
+        )
+
+    # fields that determine this list's entries in the gene search index
+    SEARCH_INDEX_FIELDS = ("gene_id", "label", "metadata")
+
+    def update_gene_search_terms(self):
+        self.search_terms.all().delete()
+
+        GeneSearchTerm.objects.bulk_create(
+            GeneSearchTerm(dashboard_list=self, kind=kind, term=term)
+            for kind, term in get_gene_search_terms(
+                self.metadata, self.label, gene_id=self.gene_id
+            )
+        )
+
+    def save(self, *args, **kwargs):
+        self.update_summary_fields()
+
+        update_fields = kwargs.get("update_fields")
+        search_index_changed = self.has_search_index_changed(update_fields)
+        if update_fields is not None:
+            kwargs["update_fields"] = {
+                *update_fields,
+                *self.SUMMARY_FIELDS,
+                "updated_at",
+            }
+
+        super().save(*args, **kwargs)
+
+        if search_index_changed:
+            self.save_search_index()
+
     class Meta:
         indexes = [
             models.Index(fields=("gene_id",)),
+            models.Index(fields=("aggregate_allele_frequency",)),
+            models.Index(fields=("estimated_genetic_prevalence",)),
+            models.Index(fields=("estimated_de_novo_incidence",)),
+        ]
+
+
+class GeneSearchTerm(models.Model):
+    """
+    Lower cased search terms for dashboard lists and publicly listed variant
+    lists, kept up to date when those lists are saved.
+    """
+
+    class Kind(models.TextChoices):
+        SYMBOL = ("s", "Gene symbol")
+        GENE_ID = ("g", "Gene ID")
+        ALIAS = ("a", "Alias symbol")
+        LABEL = ("l", "Label")
+
+    term = models.CharField(max_length=1000)
+
+    kind = models.CharField(max_length=1, choices=Kind.choices)
+
+    dashboard_list = models.ForeignKey(
+        DashboardList,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="search_terms",
+        related_query_name="search_term",
+    )
+
+    variant_list = models.ForeignKey(
+        VariantList,
+        null=True,
+        on_delete=models.CASCADE,
+        related_name="search_terms",
+        related_query_name="search_term",
+    )
+
+    class Meta:
+        indexes = [
+            # varchar_pattern_ops lets PostgreSQL use the index for prefix matches
+            models.Index(
+                fields=("term",),
+                name="calculator_search_term_idx",
+                opclasses=("varchar_pattern_ops",),
+            ),
         ]
 
 
+UUID_PATTERN = re.compile(
+    r"\b[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}\b", re.I
+)
+
+QUOTED_VALUE_PATTERN = re.compile(r"'[^']*'|\"[^\"]*\"")
+
+NUMBER_PATTERN = re.compile(r"\b(?:0x[0-9a-f]+|\d+(?:\.\d+)?)\b", re.I)
+
+FRAME_PATTERN = re.compile(r'^File "(?:.*/)?([^/"]+)", line \d+, in (\S+)')
+
+
+def get_error_signature(error):
+    """
+    Summarize an error traceback as its innermost frame and final exception line,
+    with values that differ between occurrences of the error replaced.
+    """
+    lines = [line.strip() for line in (error or "").splitlines() if line.strip()]
+    if not lines:
+        return ""
+
+    exception = lines[-1]
+    exception = UUID_PATTERN.sub("<uuid>", exception)
+    exception = QUOTED_VALUE_PATTERN.sub("'...'", exception)
+    exception = NUMBER_PATTERN.sub("<n>", exception)
+
+    frames = [FRAME_PATTERN.match(line) for line in lines]
+    frames = [frame for frame in frames if frame]
+    if frames:
+        exception = f"{frames[-1][1]} in {frames[-1][2]}: {exception}"
+
+    return exception[:500]
+
+
+def get_gene_search_terms(metadata, label, gene_id=None):
+    metadata = metadata or {}
+
+    terms = []
+    if metadata.get("gene_symbol"):
+        terms.append((GeneSearchTerm.Kind.SYMBOL, metadata["gene_symbol"]))
+
+    for alias_symbol in metadata.get("alias_symbols") or []:
+        terms.append((GeneSearchTerm.Kind.ALIAS, alias_symbol))
+
+    gene_id = gene_id or metadata.get("gene_id")
+    if gene_id:
+        # index the gene ID without its version
+        terms.append((GeneSearchTerm.Kind.GENE_ID, gene_id.split(".")[0]))
+
+    if label:
+        terms.append((GeneSearchTerm.Kind.LABEL, label))
+
+    return {(kind, term.lower()) for kind, term in terms}
+
+
 class VariantListAccessPermission(models.Model):
     uuid = models.UUIDField(default=uuid.uuid4, unique=True)
 
@@ -244,6 +738,29 @@ class VariantListAnnotation(models.Model):
     include_homozygotes_in_calculations = models.BooleanField(default=True)
     variant_calculations = models.JSONField(default=dict)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+
+class OutboxMessage(models.Model):
+    """
+    A message for the worker, written in the same transaction as the change that
+    requires it and published to the broker afterwards by the outbox dispatcher.
+    """
+
+    message = models.JSONField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # not published before this time, used to back off after failed publishes
+    available_at = models.DateTimeField(default=timezone.now)
+
+    attempts = models.IntegerField(default=0)
+
+    last_error = models.TextField(null=True, default=None)
+
+    class Meta:
+        indexes = [models.Index(fields=("available_at",))]
+
 
 def object_level_predicate(fn):  # pylint: disable=invalid-name
     @rules.predicate
@@ -46,6 +46,7 @@ class DashboardListMetadataSerializer(
 
     gene_id = serializers.CharField(max_length=20, required=False)
     gene_symbol = serializers.CharField(max_length=20)
+    alias_symbols = serializers.ListField(child=serializers.CharField(), required=False)
     transcript_id = serializers.CharField(max_length=20, required=False)
 
     include_gnomad_plof = serializers.BooleanField(required=False)
@@ -130,10 +131,6 @@ class DashboardListTopTenVariantSerializer(
 class DashboardListsSummarySerializer(ModelSerializer):
     gene_symbol = serializers.CharField(source="metadata.gene_symbol", read_only=True)
 
-    # recessive
-    aggregate_allele_frequency = serializers.SerializerMethodField()
-    estimated_genetic_prevalence = serializers.SerializerMethodField()
-
     # dominant
     estimated_de_novo_incidence = serializers.SerializerMethodField()
 
@@ -143,51 +140,12 @@ class DashboardListsSummarySerializer(ModelSerializer):
         many=False, read_only=True
     )
 
-    # TK: this one should be lifted into a top level field
-    #   the second field (estimated heterozygous freq) is just this * 2
-    def get_aggregate_allele_frequency(self, obj):
-        calculations = obj.variant_calculations or {}
-        carrier_freq = calculations.get("carrier_frequency")
-
-        if carrier_freq and len(carrier_freq) > 0:
-            total_freq = carrier_freq[0]
-
-            if total_freq == 0:
-                return 0
-
-            return total_freq / 2
-
-        return 0
-
-    # TK: this one should be lifted into a top level field
-    def get_estimated_genetic_prevalence(self, obj):
-        calculations = obj.variant_calculations or {}
-        genetic_prevalence = calculations.get("prevalence")
-
-        if genetic_prevalence and len(genetic_prevalence) > 0:
-            total_genetic_prevalence = genetic_prevalence[0]
-
-            if total_genetic_prevalence == 0:
-                return 0
-
-            return total_genetic_prevalence
-
-        return 0
-
     def get_estimated_de_novo_incidence(self, obj):
-        if not obj.dominant_dashboard_list:
+        if obj.estimated_de_novo_incidence is None:
             # sentinel value
             return -1.337
 
-        de_novo_calculations = (
-            obj.dominant_dashboard_list.de_novo_variant_calculations or {}
-        )
-        total_de_novo_incidence = de_novo_calculations.get("total_de_novo_incidence")
-
-        if total_de_novo_incidence:
-            return total_de_novo_incidence
-
-        return 0
+        return obj.estimated_de_novo_incidence
 
     class Meta:
         model = DashboardList
@@ -197,10 +155,10 @@ class DashboardListsSummarySerializer(ModelSerializer):
             "gene_symbol",
             "inheritance_type",
             "genetic_prevalence_orphanet",
-            # recessive -- nested inside JSON calcs
+            # recessive -- summary columns
             "aggregate_allele_frequency",
             "estimated_genetic_prevalence",
-            # dominant -- foreign key + json calcs!
+            # dominant -- summary column
             "estimated_de_novo_incidence",
             # user created list -- foreign key!
             "representative_variant_list",
@@ -0,0 +1,114 @@
+import json
+
+import pytest
+from django.core.management import call_command
+
+from calculator.models import DashboardList, OutboxMessage, VariantList
+
+
+CHANGE_SET = {
+    "reference_genome": "GRCh38",
+    "previous_release_date": "2024-05-01",
+    "release_date": "2024-05-08",
+    "variants": [
+        {
+            "id": "1-55051215-G-GA",
+            "change": "changed",
+            "previous_category": "uncertain_significance",
+            "category": "pathogenic_or_likely_pathogenic",
+        }
+    ],
+    "gene_ids": ["ENSG00000169174"],
+    "transcript_ids": ["ENST00000302118"],
+}
+
+
+def create_variant_list(label, **kwargs):
+    return VariantList.objects.create(
+        **{
+            "label": label,
+            "type": VariantList.Type.CUSTOM,
+            "metadata": {"version": "2", "gnomad_version": "4.1.0"},
+            "variants": [{"id": "1-55516888-G-GA"}],
+            "status": VariantList.Status.READY,
+            **kwargs,
+        }
+    )
+
+
+@pytest.fixture(name="change_set_path")
+def fixture_change_set_path(tmp_path):
+    path = tmp_path / "changes.json"
+    path.write_text(json.dumps(CHANGE_SET))
+    return str(path)
+
+
+@pytest.mark.django_db
+class TestFindClinvarAffectedLists:
+    def test_queues_affected_variant_lists(self, change_set_path):
+        list_with_variant = create_variant_list(
+            "Contains changed variant",
+            variants=[{"id": "1-55051215-G-GA"}, {"id": "1-55516888-G-GA"}],
+        )
+        recommended_list = create_variant_list(
+            "Recommended",
+            type=VariantList.Type.RECOMMENDED,
+            metadata={
+                "version": "2",
+                "gnomad_version": "4.1.0",
+                "gene_id": "ENSG00000169174.11",
+                "transcript_id": "ENST00000302118.5",
+                "include_gnomad_plof": True,
+            },
+            variants=[],
+        )
+        unaffected_list = create_variant_list("Unaffected")
+        other_reference_genome_list = create_variant_list(
+            "GRCh37",
+            metadata={"version": "2", "gnomad_version": "2.1.1"},
+            variants=[{"id": "1-55051215-G-GA"}],
+        )
+
+        call_command("find_clinvar_affected_lists", change_set_path, "--reprocess")
+
+        for variant_list in [list_with_variant, recommended_list]:
+            variant_list.refresh_from_db()
+            assert variant_list.status == VariantList.Status.QUEUED
+            assert variant_list.lane == VariantList.Lane.BULK
+
+        for variant_list in [unaffected_list, other_reference_genome_list]:
+            variant_list.refresh_from_db()
+            assert variant_list.status == VariantList.Status.READY
+
+        assert sorted(
+            message["args"]["uuid"]
+            for message in OutboxMessage.objects.values_list("message", flat=True)
+        ) == sorted([str(list_with_variant.uuid), str(recommended_list.uuid)])
+
+    def test_reports_affected_dashboard_lists(self, change_set_path, capsys):
+        DashboardList.objects.create(
+            gene_id="ENSG00000169174",
+            label="PCSK9",
+            created_at="2024-05-14T21:49:36.005507Z",
+            metadata={
+                "gnomad_version": "4.1.0",
+                "transcript_id": "ENST00000302118.5",
+            },
+        )
+        DashboardList.objects.create(
+            gene_id="ENSG00000000001",
+            label="GENEA",
+            created_at="2024-05-14T21:49:36.005507Z",
+            metadata={
+                "gnomad_version": "4.1.0",
+                "transcript_id": "ENST00000000001.1",
+            },
+        )
+
+        call_command("find_clinvar_affected_lists", change_set_path)
+
+        output = capsys.readouterr().out
+        assert "1 affected dashboard lists" in output
+        assert "ENSG00000169174" in output
+        assert "ENSG00000000001" not in output
+        assert not OutboxMessage.objects.exists()
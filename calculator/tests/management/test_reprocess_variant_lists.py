@@ -0,0 +1,128 @@
+import json
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from calculator.management.commands import reprocess_variant_lists
+from calculator.models import OutboxMessage, VariantList
+
+
+def create_variant_list(label, gnomad_version="4.1.0", **kwargs):
+    return VariantList.objects.create(
+        label=label,
+        type=VariantList.Type.CUSTOM,
+        metadata={"version": "2", "gnomad_version": gnomad_version},
+        variants=[{"id": "1-55516888-G-GA"}],
+        status=VariantList.Status.READY,
+        **kwargs,
+    )
+
+
+class FakeWorker:
+    """Finish processing queued lists whenever the command waits."""
+
+    def __init__(self, failing_labels=()):
+        self.failing_labels = failing_labels
+        self.max_in_flight = 0
+
+    def __call__(self, seconds):  # pylint: disable=unused-argument
+        queued_lists = VariantList.objects.filter(status=VariantList.Status.QUEUED)
+        self.max_in_flight = max(self.max_in_flight, queued_lists.count())
+
+        for variant_list in queued_lists:
+            if variant_list.label in self.failing_labels:
+                variant_list.set_status(VariantList.Status.ERROR, error="Failed")
+            else:
+                variant_list.set_status(VariantList.Status.READY)
+
+
+@pytest.fixture(name="worker")
+def fixture_worker(monkeypatch):
+    worker = FakeWorker(failing_labels=["Failing"])
+    monkeypatch.setattr(reprocess_variant_lists.time, "sleep", worker)
+    return worker
+
+
+@pytest.mark.django_db
+class TestReprocessVariantLists:
+    def test_queues_selected_lists_in_bulk_lane(self, worker, capsys):
+        selected_lists = [create_variant_list(f"List {i}", "4.0.0") for i in range(5)]
+        create_variant_list("Failing", "4.0.0")
+        other_list = create_variant_list("Other version", "2.1.1")
+
+        call_command(
+            "reprocess_variant_lists",
+            "--gnomad-version=4.0.0",
+            "--set-gnomad-version=4.1.0",
+            "--max-in-flight=2",
+            "--rate=100",
+        )
+
+        assert worker.max_in_flight <= 2
+
+        messages = list(OutboxMessage.objects.values_list("message", flat=True))
+        assert len(messages) == 6
+        assert all(message["lane"] == VariantList.Lane.BULK for message in messages)
+
+        for variant_list in selected_lists:
+            variant_list.refresh_from_db()
+            assert variant_list.metadata["gnomad_version"] == "4.1.0"
+
+        other_list.refresh_from_db()
+        assert other_list.metadata["gnomad_version"] == "2.1.1"
+
+        output = capsys.readouterr().out
+        assert "Finished: 5 completed, 1 failed" in output
+
+    def test_resumes_from_checkpoint(self, worker, tmp_path):
+        # pylint: disable=unused-argument
+        first_list = create_variant_list("First")
+        second_list = create_variant_list("Second")
+
+        checkpoint_path = tmp_path / "checkpoint.json"
+        checkpoint_path.write_text(
+            json.dumps(
+                {
+                    "last_id": first_list.id,
+                    "in_flight": [],
+                    "num_completed": 1,
+                    "failed": {},
+                }
+            )
+        )
+
+        call_command(
+            "reprocess_variant_lists",
+            f"--checkpoint={checkpoint_path}",
+            "--rate=100",
+        )
+
+        assert [
+            message["args"]["uuid"]
+            for message in OutboxMessage.objects.values_list("message", flat=True)
+        ] == [str(second_list.uuid)]
+
+        checkpoint = json.loads(checkpoint_path.read_text())
+        assert checkpoint["last_id"] == second_list.id
+        assert checkpoint["num_completed"] == 2
+
+    def test_requeues_lists_being_processed_after_current_run(self):
+        variant_list = create_variant_list("Processing", "4.0.0")
+        variant_list.set_status(
+            VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            lease_expires_at=timezone.now() + timedelta(minutes=5),
+        )
+        job_generation = variant_list.job_generation
+
+        reprocess_variant_lists.queue_variant_list(variant_list, "4.1.0")
+
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.PROCESSING
+        assert variant_list.lease_owner == "worker-1"
+        assert variant_list.job_generation == job_generation + 1
+        assert variant_list.lane == VariantList.Lane.BULK
+        assert variant_list.metadata["gnomad_version"] == "4.1.0"
+        assert not OutboxMessage.objects.exists()
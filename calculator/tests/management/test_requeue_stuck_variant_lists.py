@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from calculator.models import OutboxMessage, VariantList
+
+
+def create_variant_list(label, **kwargs):
+    return VariantList.objects.create(
+        label=label,
+        type=VariantList.Type.CUSTOM,
+        metadata={"version": "2", "gnomad_version": "4.1.0"},
+        variants=["1-55516888-G-GA"],
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+class TestRequeueStuckVariantLists:
+    def test_requeues_lists_with_expired_leases(self):
+        stuck_list = create_variant_list(
+            "Stuck",
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            lease_expires_at=timezone.now() - timedelta(minutes=1),
+            processing_attempts=1,
+        )
+        active_list = create_variant_list(
+            "Active",
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-2",
+            lease_expires_at=timezone.now() + timedelta(minutes=1),
+            processing_attempts=1,
+        )
+
+        call_command("requeue_stuck_variant_lists")
+
+        stuck_list.refresh_from_db()
+        assert stuck_list.status == VariantList.Status.QUEUED
+        assert stuck_list.lease_owner is None
+
+        active_list.refresh_from_db()
+        assert active_list.status == VariantList.Status.PROCESSING
+
+        assert list(OutboxMessage.objects.values_list("message", flat=True)) == [
+            {
+                "type": "process_variant_list",
+                "lane": "i",
+                "args": {"uuid": str(stuck_list.uuid), "generation": 1},
+            }
+        ]
+
+    def test_marks_lists_as_errored_after_max_attempts(self):
+        stuck_list = create_variant_list(
+            "Stuck",
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            lease_expires_at=timezone.now() - timedelta(minutes=1),
+            processing_attempts=3,
+        )
+
+        call_command("requeue_stuck_variant_lists", "--max-attempts=3")
+
+        stuck_list.refresh_from_db()
+        assert stuck_list.status == VariantList.Status.ERROR
+        assert "3 attempts" in stuck_list.error
+        assert not OutboxMessage.objects.exists()
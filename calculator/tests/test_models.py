@@ -2,12 +2,17 @@ import uuid
 
 import pytest
 from django.contrib.auth import get_user_model
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
 
 
 from calculator.models import (
+    DashboardList,
+    DominantDashboardList,
+    GeneSearchTerm,
     VariantList,
     VariantListAccessPermission,
+    get_error_signature,
 )
 
 
@@ -46,6 +51,151 @@ class TestVariantList:
                 variants=["1-55516888-G-GA"],
             )
 
+    @pytest.mark.django_db
+    def test_saving_does_not_overwrite_job_counters(self):
+        variant_list = VariantList.objects.create(
+            label="List 1",
+            type=VariantList.Type.CUSTOM,
+            metadata={
+                "version": "1",
+                "reference_genome": "GRCh37",
+                "gnomad_version": "2.1.1",
+            },
+            variants=["1-55516888-G-GA"],
+        )
+
+        stale_copy = VariantList.objects.get(id=variant_list.id)
+
+        message = variant_list.request_processing()
+        assert message == {
+            "type": "process_variant_list",
+            "lane": "i",
+            "args": {"uuid": str(variant_list.uuid), "generation": 1},
+        }
+
+        stale_copy.label = "Renamed list"
+        stale_copy.save()
+
+        variant_list.refresh_from_db()
+        assert variant_list.label == "Renamed list"
+        assert variant_list.job_generation == 1
+
+    @pytest.mark.parametrize(
+        "list_type,metadata,num_variants,expected_lane",
+        [
+            (VariantList.Type.CUSTOM, {}, 3, VariantList.Lane.INTERACTIVE),
+            (VariantList.Type.CUSTOM, {}, 500, VariantList.Lane.LARGE),
+            (
+                VariantList.Type.CUSTOM,
+                {"include_clinvar_clinical_significance": ["pathogenic"]},
+                3,
+                VariantList.Lane.LARGE,
+            ),
+            (VariantList.Type.RECOMMENDED, {}, 3, VariantList.Lane.LARGE),
+        ],
+    )
+    def test_estimate_job_lane(self, list_type, metadata, num_variants, expected_lane):
+        variant_list = VariantList(
+            label="List 1",
+            type=list_type,
+            metadata={"version": "2", "gnomad_version": "4.1.0", **metadata},
+            variants=[{"id": f"1-55516888-G-A{i}"} for i in range(num_variants)],
+        )
+
+        assert variant_list.estimate_job_lane() == expected_lane
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize(
+        "status,fields,expected_columns",
+        [
+            (
+                VariantList.Status.PROCESSING,
+                {"lease_owner": "worker-1", "processing_attempts": 1},
+                {"status", "lease_owner", "processing_attempts", "updated_at"},
+            ),
+            (
+                VariantList.Status.READY,
+                {"lease_owner": None},
+                {"status", "lease_owner", "updated_at"},
+            ),
+            (
+                VariantList.Status.ERROR,
+                {"error": "RuntimeError: Connection refused"},
+                {"status", "error", "error_signature", "updated_at"},
+            ),
+        ],
+    )
+    def test_set_status_only_updates_given_columns(
+        self, status, fields, expected_columns
+    ):
+        variant_list = VariantList.objects.create(
+            label="List 1",
+            type=VariantList.Type.CUSTOM,
+            metadata={"version": "2", "gnomad_version": "4.1.0"},
+            variants=[{"id": f"1-55516888-G-A{i}"} for i in range(1000)],
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            variant_list.set_status(status, **fields)
+
+        updates = [
+            query["sql"] for query in queries if query["sql"].startswith("UPDATE")
+        ]
+        assert len(updates) == 1
+
+        set_clause = updates[0].split(" SET ")[1].split(" WHERE ")[0]
+        assert {
+            assignment.split(" = ")[0].strip('"')
+            for assignment in set_clause.split(", ")
+        } == expected_columns
+
+        variant_list.refresh_from_db()
+        assert variant_list.status == status
+        assert len(variant_list.variants) == 1000
+
+    @pytest.mark.django_db
+    def test_set_finished_status_requires_lease_of_run(self):
+        variant_list = VariantList.objects.create(
+            label="List 1",
+            type=VariantList.Type.CUSTOM,
+            metadata={"version": "2", "gnomad_version": "4.1.0"},
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            started_generation=1,
+        )
+
+        # Another worker claims a newer generation of the list
+        VariantList.objects.filter(id=variant_list.id).update(
+            lease_owner="worker-2", job_generation=2, started_generation=2
+        )
+
+        assert not variant_list.set_finished_status(VariantList.Status.READY)
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.PROCESSING
+        assert variant_list.lease_owner == "worker-2"
+
+        assert variant_list.set_finished_status(
+            VariantList.Status.ERROR, error="RuntimeError: Connection refused"
+        )
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.ERROR
+        assert variant_list.lease_owner is None
+        assert variant_list.error_signature == "RuntimeError: Connection refused"
+
+
+def test_get_error_signature():
+    error = (
+        "Traceback (most recent call last):\n"
+        '  File "/app/worker/tasks.py", line 512, in _process_variant_list\n'
+        "    variant = variants[variant_id]\n"
+        "KeyError: '1-55516888-G-GA' in list 7d2b1c0e-5f3a-4b8e-9c1d-2e3f4a5b6c7d"
+    )
+
+    assert get_error_signature(error) == (
+        "tasks.py in _process_variant_list: KeyError: '...' in list <uuid>"
+    )
+    assert get_error_signature(None) == ""
+
 
 class TestVariantListAccessPermission:
     @pytest.mark.django_db
@@ -153,3 +303,125 @@ class TestVariantListAccessPermission:
                 variant_list=variant_list,
                 level=VariantListAccessPermission.Level.EDITOR,
             )
+
+
+def get_search_term_queries(queries):
+    return [
+        query["sql"] for query in queries if "calculator_genesearchterm" in query["sql"]
+    ]
+
+
+class TestVariantListSearchTerms:
+    @pytest.mark.django_db
+    def test_search_terms_are_only_rebuilt_when_search_index_fields_change(self):
+        variant_list = VariantList.objects.create(
+            label="List 1",
+            type=VariantList.Type.CUSTOM,
+            metadata={
+                "version": "2",
+                "gnomad_version": "4.1.0",
+                "gene_id": "ENSG00000169174.1",
+                "gene_symbol": "PCSK9",
+            },
+            is_public=True,
+        )
+        assert GeneSearchTerm.objects.filter(variant_list=variant_list).count() == 3
+
+        variant_list = VariantList.objects.get(id=variant_list.id)
+        variant_list.notes = "Some notes"
+        with CaptureQueriesContext(connection) as queries:
+            variant_list.save()
+        assert not get_search_term_queries(queries.captured_queries)
+
+        variant_list.label = "Renamed list"
+        variant_list.save()
+        assert (
+            GeneSearchTerm.objects.filter(
+                variant_list=variant_list, kind=GeneSearchTerm.Kind.LABEL
+            )
+            .get()
+            .term
+            == "renamed list"
+        )
+
+        # A second save with the same values does not rebuild the terms again
+        with CaptureQueriesContext(connection) as queries:
+            variant_list.save()
+        assert not get_search_term_queries(queries.captured_queries)
+
+        variant_list.is_public = False
+        variant_list.save(update_fields=["is_public"])
+        assert not GeneSearchTerm.objects.filter(variant_list=variant_list).exists()
+
+
+class TestDashboardList:
+    @pytest.mark.django_db
+    def test_search_terms_are_only_rebuilt_when_search_index_fields_change(self):
+        DashboardList.objects.create(
+            gene_id="ENSG00000000001",
+            label="GENEA - Dashboard",
+            created_at="2024-05-14T21:49:36.005507Z",
+            metadata={"gene_symbol": "GENEA"},
+        )
+
+        dashboard_list = DashboardList.objects.get(gene_id="ENSG00000000001")
+        dashboard_list.notes = "Some notes"
+        with CaptureQueriesContext(connection) as queries:
+            dashboard_list.save()
+        assert not get_search_term_queries(queries.captured_queries)
+
+        dashboard_list.metadata["alias_symbols"] = ["GA1"]
+        dashboard_list.save()
+        assert set(dashboard_list.search_terms.values_list("kind", "term")) == {
+            (GeneSearchTerm.Kind.SYMBOL, "genea"),
+            (GeneSearchTerm.Kind.ALIAS, "ga1"),
+            (GeneSearchTerm.Kind.GENE_ID, "ensg00000000001"),
+            (GeneSearchTerm.Kind.LABEL, "genea - dashboard"),
+        }
+
+    @pytest.mark.django_db
+    def test_summary_fields_are_derived_from_calculations(self):
+        dominant_dashboard_list = DominantDashboardList.objects.create(
+            gene_id="ENSG00000000001",
+            de_novo_variant_calculations={"total_de_novo_incidence": 3e-6},
+            date_created="2024-05-14T21:49:36.005507Z",
+            metadata={},
+        )
+
+        dashboard_list = DashboardList.objects.create(
+            gene_id="ENSG00000000001",
+            label="GENEA - Dashboard",
+            created_at="2024-05-14T21:49:36.005507Z",
+            metadata={},
+            variant_calculations={
+                "prevalence": [1e-5],
+                "carrier_frequency": [4e-3],
+            },
+            dominant_dashboard_list=dominant_dashboard_list,
+        )
+
+        assert dashboard_list.aggregate_allele_frequency == 2e-3
+        assert dashboard_list.estimated_genetic_prevalence == 1e-5
+        assert dashboard_list.estimated_de_novo_incidence == 3e-6
+
+        dominant_dashboard_list.de_novo_variant_calculations = {
+            "total_de_novo_incidence": 5e-6
+        }
+        dominant_dashboard_list.save()
+
+        dashboard_list.refresh_from_db()
+        assert dashboard_list.estimated_de_novo_incidence == 5e-6
+
+    @pytest.mark.django_db
+    def test_summary_fields_default_without_calculations(self):
+        dashboard_list = DashboardList.objects.create(
+            gene_id="ENSG00000000001",
+            label="GENEA - Dashboard",
+            created_at="2024-05-14T21:49:36.005507Z",
+            metadata={},
+            variant_calculations={"prevalence": [], "carrier_frequency": []},
+        )
+
+        assert dashboard_list.aggregate_allele_frequency == 0
+        assert dashboard_list.estimated_genetic_prevalence == 0
+        assert dashboard_list.estimated_de_novo_incidence is None
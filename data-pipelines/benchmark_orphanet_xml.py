@@ -0,0 +1,82 @@
+"""
+Compare the time and peak memory of parsing the Orphanet XML as a stream with
+building the whole document in memory.
+"""
+
+import argparse
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+from scrape_orphanet_prevalences import (
+    XML_PATH,
+    _get_gene_info,
+    get_gene_symbols_from_csv,
+    parse_orphanet_xml,
+)
+
+
+def parse_orphanet_xml_in_memory(gene_symbols_to_keep, xml_path=XML_PATH):
+    """Parse the XML by building the whole document, as parse_orphanet_xml did before."""
+    with open(xml_path, "r", encoding="latin-1") as input:
+        xml_input = input.read()
+
+    root = ET.fromstring(xml_input)
+    disorder_list = root.find("DisorderList")
+
+    gene_info = {}
+
+    for disorder in disorder_list.findall("Disorder"):
+        orpha_code = disorder.find("OrphaCode").text
+        for gene_element in disorder.findall(".//Gene"):
+            gene_symbol, ensg_id = _get_gene_info(gene_element)
+            if gene_symbol not in gene_info:
+                gene_info[gene_symbol] = {"OrphaCodes": [], "ENSG_ID": ""}
+            gene_info[gene_symbol]["OrphaCodes"].append(orpha_code)
+            gene_info[gene_symbol]["ENSG_ID"] = ensg_id
+
+    return {
+        gene_symbol: gene_info[gene_symbol]
+        for gene_symbol in gene_symbols_to_keep
+        if gene_symbol in gene_info
+    }
+
+
+def measure(parse, gene_symbols, xml_path):
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    result = parse(gene_symbols, xml_path)
+    duration = time.perf_counter() - start_time
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak_memory
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare streaming and in memory parsing of the Orphanet XML"
+    )
+    parser.add_argument("--xml-path", default=XML_PATH)
+    args = parser.parse_args()
+
+    gene_symbols = get_gene_symbols_from_csv()
+
+    results = {}
+    for name, parse in [
+        ("in memory", parse_orphanet_xml_in_memory),
+        ("streaming", parse_orphanet_xml),
+    ]:
+        result, duration, peak_memory = measure(parse, gene_symbols, args.xml_path)
+        results[name] = result
+        print(
+            f"{name}: {duration:.2f}s, peak memory {peak_memory / 1024**2:.1f} MB, "
+            f"{len(result)} genes"
+        )
+
+    assert (
+        results["in memory"] == results["streaming"]
+    ), "Parsers returned different results"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Measure how long the worker's interval reads take from tables with different partitionings.
+
+Each table is filtered to the span of each of a panel of transcripts, in the same
+way the worker reads tables when processing a variant list, and the time to
+read the filtered rows is reported along with the number of partitions read.
+"""
+
+import argparse
+import statistics
+import time
+
+import hail as hl
+
+
+# Approximate spans of transcripts of varying length and variant density,
+#   from short (HBB) to very long (DMD, TTN).
+TRANSCRIPT_INTERVALS = {
+    "GRCh37": {
+        "PCSK9": "1:55505221-55530525",
+        "CFTR": "7:117120017-117308718",
+        "BRCA1": "17:41196312-41277500",
+        "DMD": "X:31137345-33357726",
+        "TTN": "2:179390716-179695529",
+        "HBB": "11:5246696-5248301",
+        "SMN1": "5:70220768-70248839",
+    },
+    "GRCh38": {
+        "PCSK9": "chr1:55039548-55064852",
+        "CFTR": "chr7:117480025-117668665",
+        "BRCA1": "chr17:43044295-43125483",
+        "DMD": "chrX:31097677-33339441",
+        "TTN": "chr2:178525989-178830802",
+        "HBB": "chr11:5225464-5229395",
+        "SMN1": "chr5:70924941-70953015",
+    },
+}
+
+
+def count_partitions_read(ds, interval):
+    """Return the number of partitions of a table that overlap an interval."""
+    return hl.filter_intervals(ds, [interval]).n_partitions()
+
+
+def time_interval_read(path, interval):
+    start = time.perf_counter()
+    ds = hl.read_table(path)
+    ds = hl.filter_intervals(ds, [interval])
+    ds.aggregate(hl.agg.count())
+    return time.perf_counter() - start
+
+
+def benchmark_table(path, intervals, repeats):
+    ds = hl.read_table(path)
+
+    results = {}
+    for name, interval in intervals.items():
+        # Discard the first read, which includes reading the table's metadata
+        #   and indexes from the bucket.
+        time_interval_read(path, interval)
+
+        times = sorted(time_interval_read(path, interval) for _ in range(repeats))
+        results[name] = {
+            "partitions": count_partitions_read(ds, interval),
+            "median": statistics.median(times),
+            "p90": times[min(len(times) - 1, int(0.9 * len(times)))],
+        }
+
+    return ds.n_partitions(), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--table",
+        action="append",
+        dest="tables",
+        required=True,
+        metavar="NAME=PATH",
+        help="Table to benchmark, may be repeated to compare partitionings",
+    )
+    parser.add_argument(
+        "--reference-genome", choices=("GRCh37", "GRCh38"), default="GRCh38"
+    )
+    parser.add_argument(
+        "--intervals",
+        help="Comma separated intervals to read instead of the default transcripts",
+    )
+    parser.add_argument("--repeats", default=5, type=int)
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    hl.init(quiet=args.quiet)
+
+    if args.intervals:
+        intervals = {interval: interval for interval in args.intervals.split(",")}
+    else:
+        intervals = TRANSCRIPT_INTERVALS[args.reference_genome]
+
+    intervals = {
+        name: hl.parse_locus_interval(interval, reference_genome=args.reference_genome)
+        for name, interval in intervals.items()
+    }
+
+    print("table\tinterval\tpartitions\tmedian_seconds\tp90_seconds")
+    for table in args.tables:
+        table_name, path = table.split("=", 1)
+        n_partitions, results = benchmark_table(path, intervals, args.repeats)
+        print(f"# {table_name}: {n_partitions} partitions")
+
+        for interval_name, result in results.items():
+            print(
+                f"{table_name}\t{interval_name}\t{result['partitions']}\t"
+                f"{result['median']:.3f}\t{result['p90']:.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,13 @@ import os
 import pandas as pd
 from datetime import datetime
 import argparse
-import json
+
+from dashboard_files import (
+    get_json_value,
+    is_parquet_path,
+    read_dashboard_file,
+    write_dashboard_file,
+)
 
 
 def combine_csv_files(output_directory, output_filename):
@@ -13,16 +19,28 @@ def combine_csv_files(output_directory, output_filename):
     )
 
     filenames = [
-        f for f in os.listdir(recessive_downloads_directory) if f.endswith(".csv")
+        f
+        for f in os.listdir(recessive_downloads_directory)
+        if f.endswith(".csv") or is_parquet_path(f)
     ]
     non_test_files = [
         f for f in filenames if ((not "test" in f) and (not "combined" in f))
     ]
     non_test_files.sort(key=lambda x: int(x.split("-")[1]))
+
+    # Batches written as both CSV and Parquet are read from Parquet
+    parquet_batches = {
+        f.rsplit(".", 1)[0] for f in non_test_files if is_parquet_path(f)
+    }
+    non_test_files = [
+        f
+        for f in non_test_files
+        if is_parquet_path(f) or f.rsplit(".", 1)[0] not in parquet_batches
+    ]
     sorted_non_test_files = [f for f in non_test_files]
 
     print(
-        f"Combining {len(sorted_non_test_files)} CSV files from directory {recessive_downloads_directory}"
+        f"Combining {len(sorted_non_test_files)} files from directory {recessive_downloads_directory}"
     )
     print(f"Combine order is:")
     for filename in sorted_non_test_files:
@@ -35,7 +53,7 @@ def combine_csv_files(output_directory, output_filename):
     for filename in sorted_non_test_files:
         filepath = os.path.join(recessive_downloads_directory, filename)
         try:
-            df_curr = pd.read_csv(filepath)
+            df_curr = read_dashboard_file(filepath)
             df_full.append(df_curr)
         except Exception as e:
             print(f"Error reading {filename}, error: {e}. Skipping.")
@@ -56,9 +74,9 @@ def combine_csv_files(output_directory, output_filename):
     )
 
     output_filepath = os.path.join(recessive_downloads_directory, output_filename)
-    combined_df.to_csv(output_filepath, index=False)
+    write_dashboard_file(combined_df, output_filepath)
 
-    print(f"Successfully wrote combined CSV to {output_filepath}")
+    print(f"Successfully wrote combined file to {output_filepath}")
 
 
 def create_joined_downloads(
@@ -66,15 +84,17 @@ def create_joined_downloads(
 ):
     print("Running create joined downloads helper")
 
-    df_recessive = pd.read_csv(input_recessive_downloads_file)
+    df_recessive = read_dashboard_file(input_recessive_downloads_file)
 
     # ---
 
-    df_dominant = pd.read_csv(input_dominant_models_file)
+    df_dominant = read_dashboard_file(input_dominant_models_file)
 
     # flatten dominant calcs
     df_dominant = df_dominant.join(
-        df_dominant["de_novo_variant_calculations"].apply(json.loads).apply(pd.Series)
+        df_dominant["de_novo_variant_calculations"]
+        .apply(get_json_value)
+        .apply(pd.Series)
     )
     df_dominant = df_dominant.join(df_dominant["inputs"].apply(pd.Series))
     df_dominant["de_novo_estimated_per_100k"] = (
@@ -0,0 +1,228 @@
+"""
+Read and write dashboard list files as CSV or Parquet.
+
+In CSV files, nested fields such as metadata and variant calculations are
+stored as JSON strings. In Parquet files, they are stored as nested columns of
+the types in NESTED_COLUMN_TYPES, so that they can be read without parsing
+JSON. These types are given explicitly, because pyarrow would otherwise infer a
+struct type from the union of a column's keys.
+
+Parquet cannot store an empty struct, so empty nested values are written as
+nulls. Dict fields that a value does not have are also written as nulls, and
+null fields of dict columns are left out when they are read. Lists of dicts,
+such as the top ten variants, keep their null fields, since the variants
+written by the pipelines have every field.
+"""
+
+import json
+import math
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+METADATA_TYPE = pa.struct(
+    [
+        ("gnomad_version", pa.string()),
+        ("reference_genome", pa.string()),
+        ("gene_symbol", pa.string()),
+        ("alias_symbols", pa.list_(pa.string())),
+        ("populations", pa.list_(pa.string())),
+        ("clinvar_version", pa.string()),
+        ("gene_id", pa.string()),
+        ("transcript_id", pa.string()),
+        ("include_gnomad_plof", pa.bool_()),
+        ("include_clinvar_clinical_significance", pa.list_(pa.string())),
+        ("include_gnomad_missense_with_high_revel_score", pa.bool_()),
+    ]
+)
+
+VARIANT_CALCULATIONS_TYPE = pa.struct(
+    [
+        ("variant_count", pa.int64()),
+        ("prevalence", pa.list_(pa.float64())),
+        ("prevalence_bayesian", pa.list_(pa.float64())),
+        ("total_allele_frequency", pa.list_(pa.float64())),
+        ("carrier_frequency", pa.list_(pa.float64())),
+        ("carrier_frequency_simplified", pa.list_(pa.float64())),
+        (
+            "carrier_frequency_raw_numbers",
+            pa.list_(
+                pa.struct([("total_ac", pa.int64()), ("average_an", pa.float64())])
+            ),
+        ),
+    ]
+)
+
+TOP_TEN_VARIANT_TYPE = pa.struct(
+    [
+        ("id", pa.string()),
+        ("hgvsc", pa.string()),
+        ("hgvsp", pa.string()),
+        ("lof", pa.string()),
+        ("major_consequence", pa.string()),
+        ("gene_id", pa.string()),
+        ("gene_symbol", pa.string()),
+        ("transcript_id", pa.string()),
+        ("AC", pa.list_(pa.int64())),
+        ("AN", pa.list_(pa.int64())),
+        ("homozygote_count", pa.list_(pa.int64())),
+        ("clinvar_variation_id", pa.string()),
+        ("clinical_significance", pa.list_(pa.string())),
+        ("gold_stars", pa.int64()),
+        ("filters", pa.list_(pa.string())),
+        ("flags", pa.list_(pa.string())),
+        ("sample_sets", pa.list_(pa.string())),
+        ("source", pa.list_(pa.string())),
+    ]
+)
+
+DE_NOVO_VARIANT_CALCULATIONS_TYPE = pa.struct(
+    [
+        ("missense_de_novo_incidence", pa.float64()),
+        ("lof_de_novo_incidence", pa.float64()),
+        ("total_de_novo_incidence", pa.float64()),
+        ("has_insufficient_missense_data", pa.bool_()),
+        ("has_insufficient_lof_data", pa.bool_()),
+        (
+            "inputs",
+            pa.struct(
+                [
+                    ("oe_mis", pa.float64()),
+                    ("mu_mis", pa.float64()),
+                    ("oe_mis_prior", pa.float64()),
+                    ("oe_lof", pa.float64()),
+                    ("mu_lof", pa.float64()),
+                    ("oe_lof_prior", pa.float64()),
+                ]
+            ),
+        ),
+    ]
+)
+
+# Columns holding a JSON object or array, and their types in Parquet files
+NESTED_COLUMN_TYPES = {
+    "metadata": METADATA_TYPE,
+    "variant_calculations": VARIANT_CALCULATIONS_TYPE,
+    "top_ten_variants": pa.list_(TOP_TEN_VARIANT_TYPE),
+    "de_novo_variant_calculations": DE_NOVO_VARIANT_CALCULATIONS_TYPE,
+}
+
+
+# Dashboard list files are written in both formats, CSV for people and Parquet
+#   for loading into the website
+DASHBOARD_FILE_EXTENSIONS = [".csv", ".parquet"]
+
+
+def is_parquet_path(path):
+    return str(path).endswith(".parquet")
+
+
+def get_json_value(value):
+    """Return the parsed value of a nested column."""
+    if isinstance(value, str):
+        return json.loads(value)
+
+    return value
+
+
+def _to_json_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+
+    return value
+
+
+def _check_fields(value, value_type, path):
+    """Raise an error for dict keys that are not in value_type, which pyarrow would drop."""
+    if value is None:
+        return
+
+    if pa.types.is_struct(value_type):
+        field_names = [field.name for field in value_type]
+        unknown_fields = set(value) - set(field_names)
+        if unknown_fields:
+            raise ValueError(
+                f"{path} has fields that are not in its Parquet type: "
+                f"{', '.join(sorted(unknown_fields))}"
+            )
+
+        for field in value_type:
+            _check_fields(value.get(field.name), field.type, f"{path}.{field.name}")
+
+    elif pa.types.is_list(value_type):
+        for item in value:
+            _check_fields(item, value_type.value_type, path)
+
+
+def _to_nested_value(value, column):
+    if isinstance(value, float) and math.isnan(value):
+        return None
+
+    if isinstance(value, str):
+        value = json.loads(value) if value else None
+
+    # Parquet cannot store empty structs
+    if not value:
+        return None
+
+    _check_fields(value, NESTED_COLUMN_TYPES[column], column)
+    return value
+
+
+def _from_nested_value(value):
+    if isinstance(value, dict):
+        return {key: field for key, field in value.items() if field is not None}
+
+    return value
+
+
+def write_dashboard_file(df, path):
+    """Write a dataframe as CSV, or as Parquet if the path ends with .parquet."""
+    nested_columns = [column for column in df.columns if column in NESTED_COLUMN_TYPES]
+
+    if is_parquet_path(path):
+        table = pa.Table.from_pandas(
+            df.drop(columns=nested_columns), preserve_index=False
+        )
+        for column in nested_columns:
+            table = table.append_column(
+                pa.field(column, NESTED_COLUMN_TYPES[column]),
+                pa.array(
+                    [_to_nested_value(value, column) for value in df[column]],
+                    type=NESTED_COLUMN_TYPES[column],
+                ),
+            )
+
+        pq.write_table(table.select(list(df.columns)), path, compression="zstd")
+    else:
+        df = df.copy()
+        # Nested values may be held as JSON strings or as dicts and lists
+        for column in nested_columns:
+            df[column] = df[column].map(_to_json_value)
+
+        df.to_csv(path, index=False)
+
+
+def read_dashboard_file(path):
+    """
+    Read a dashboard list file written as CSV or Parquet.
+
+    Nested columns of Parquet files are read as dicts and lists, and those of
+    CSV files as JSON strings.
+    """
+    if not is_parquet_path(path):
+        return pd.read_csv(path)
+
+    table = pq.read_table(path)
+    nested_columns = [
+        column for column in table.column_names if column in NESTED_COLUMN_TYPES
+    ]
+
+    df = table.drop_columns(nested_columns).to_pandas()
+    for column in nested_columns:
+        df[column] = [
+            _from_nested_value(value) for value in table.column(column).to_pylist()
+        ]
+
+    return df[table.column_names]
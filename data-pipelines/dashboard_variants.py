@@ -0,0 +1,195 @@
+"""
+Store the recommended variants of dashboard list genes in one Parquet dataset.
+
+Each run of the pipeline replaces the dataset, and each batch of genes adds one
+file to it, which is partitioned by chromosome. Frequencies for each ancestry group are stored in typed columns,
+such as allele_count_east_asian. The CSV file of a single gene's variants, as
+previously written for every gene, can be extracted from the dataset with
+extract_dashboard_gene_variants.py.
+"""
+
+import os
+import shutil
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+ANCESTRY_GROUPS = [
+    "global",
+    "african_african_american",
+    "admixed_american",
+    "ashkenazi_jewish",
+    "east_asian",
+    "european_finnish",
+    "remaining",
+    "south_asian",
+]
+
+PER_ANCESTRY_FIELDS = [
+    ("allele_count", pa.int64()),
+    ("allele_number", pa.int64()),
+    ("allele_frequency", pa.float64()),
+    ("homozygote_count", pa.int64()),
+]
+
+VARIANT_FIELDS = [
+    "gene_symbol",
+    "gene_id",
+    "variant_gnomad_id",
+    "vep_consequence",
+    "hgvsc",
+    "hgvsp",
+    "loftee",
+    "clinvar_clinical_significance",
+    "clinvar_variation_id",
+    "flags",
+    "source",
+]
+
+PARTITIONING = ds.partitioning(pa.schema([("chrom", pa.string())]), flavor="hive")
+
+VARIANTS_SCHEMA = pa.schema(
+    [(field, pa.string()) for field in VARIANT_FIELDS]
+    + [
+        (f"{field}_{ancestry_group}", field_type)
+        for field, field_type in PER_ANCESTRY_FIELDS
+        for ancestry_group in ANCESTRY_GROUPS
+    ]
+    + [("chrom", pa.string())]
+)
+
+
+def get_variants_dataset_path(base_dir, test=False):
+    # Test runs are kept apart so that their genes are not read twice
+    dataset_name = "test_variants" if test else "variants"
+    return os.path.join(base_dir, "output", "dashboard", dataset_name)
+
+
+def clear_recommended_variants(dataset_path):
+    """Remove variants written by an earlier run, whose batches may have held other genes."""
+    shutil.rmtree(dataset_path, ignore_errors=True)
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def format_recommended_variants(gene_symbol, gene_id, chrom, recommended_variants):
+    """Return a table of a gene's recommended variants, with a column for each ancestry group's frequencies."""
+    num_variants = len(recommended_variants)
+    empty_values = [None] * len(ANCESTRY_GROUPS)
+
+    columns = {
+        "gene_symbol": [gene_symbol] * num_variants,
+        "gene_id": [gene_id] * num_variants,
+        "variant_gnomad_id": [variant["id"] for variant in recommended_variants],
+        "vep_consequence": [
+            variant["major_consequence"] for variant in recommended_variants
+        ],
+        "hgvsc": [variant["hgvsc"] for variant in recommended_variants],
+        "hgvsp": [variant["hgvsp"] for variant in recommended_variants],
+        "loftee": [variant["lof"] for variant in recommended_variants],
+        "clinvar_clinical_significance": [
+            variant["clinical_significance"][0]
+            if variant["clinical_significance"]
+            else None
+            for variant in recommended_variants
+        ],
+        "clinvar_variation_id": [
+            _to_str(variant["clinvar_variation_id"]) for variant in recommended_variants
+        ],
+        "flags": ["|".join(variant["flags"]) for variant in recommended_variants],
+        "source": ["|".join(variant["source"]) for variant in recommended_variants],
+    }
+
+    # Each variant has a list of values ordered by ANCESTRY_GROUPS, which is
+    #   transposed into one column per ancestry group
+    per_ancestry_values = {
+        field: list(
+            zip(*[variant[key] or empty_values for variant in recommended_variants])
+        )
+        or [[] for _ in ANCESTRY_GROUPS]
+        for field, key in [
+            ("allele_count", "AC"),
+            ("allele_number", "AN"),
+            ("homozygote_count", "homozygote_count"),
+        ]
+    }
+    per_ancestry_values["allele_frequency"] = [
+        [
+            (allele_count / allele_number)
+            if (allele_count is not None and allele_number)
+            else None
+            for allele_count, allele_number in zip(allele_counts, allele_numbers)
+        ]
+        for allele_counts, allele_numbers in zip(
+            per_ancestry_values["allele_count"], per_ancestry_values["allele_number"]
+        )
+    ]
+
+    for field, _ in PER_ANCESTRY_FIELDS:
+        for ancestry_group, values in zip(ANCESTRY_GROUPS, per_ancestry_values[field]):
+            columns[f"{field}_{ancestry_group}"] = list(values)
+
+    columns["chrom"] = [str(chrom)] * num_variants
+
+    return pa.table(columns, schema=VARIANTS_SCHEMA)
+
+
+def write_recommended_variants(dataset_path, basename, tables):
+    """
+    Write tables of recommended variants to the dataset as one file per chromosome.
+
+    Files are named after basename, so writing a batch again in the same run
+    replaces the files written for it before.
+    """
+    table = pa.concat_tables(tables) if tables else VARIANTS_SCHEMA.empty_table()
+    ds.write_dataset(
+        table,
+        dataset_path,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"{basename}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+    )
+
+
+def read_recommended_variants(dataset_path, genes):
+    """Read the recommended variants of genes, selected by gene ID or symbol."""
+    dataset = ds.dataset(dataset_path, format="parquet", partitioning=PARTITIONING)
+    return dataset.to_table(
+        filter=ds.field("gene_id").isin(genes) | ds.field("gene_symbol").isin(genes)
+    )
+
+
+def _per_ancestry_dict(row, field):
+    values = {
+        f"{field}_{ancestry_group}": row[f"{field}_{ancestry_group}"]
+        for ancestry_group in ANCESTRY_GROUPS
+    }
+    if all(value is None for value in values.values()):
+        return None
+
+    return values
+
+
+def to_gene_variants_rows(table):
+    """Return rows in the layout of the per gene CSV files, with frequencies for each ancestry group as dicts."""
+    rows = []
+    for row in table.to_pylist():
+        formatted_row = {
+            field: row[field]
+            for field in VARIANT_FIELDS
+            if field not in ("flags", "source")
+        }
+        for field, _ in PER_ANCESTRY_FIELDS:
+            formatted_row[field] = row[f"{field}_global"]
+        formatted_row["flags"] = row["flags"]
+        formatted_row["source"] = row["source"]
+        for field, _ in PER_ANCESTRY_FIELDS:
+            formatted_row[f"{field}_per_ancestry"] = _per_ancestry_dict(row, field)
+
+        rows.append(formatted_row)
+
+    return rows
@@ -0,0 +1,145 @@
+import argparse
+import json
+
+import hail as hl
+
+
+CLINVAR_FIELDS = [
+    "clinvar_variation_id",
+    "clinical_significance",
+    "clinical_significance_category",
+    "conflicting_clinical_significance_categories",
+    "gold_stars",
+]
+
+
+def variant_id(locus, alleles):
+    return hl.delimit(
+        [
+            locus.contig.replace("^chr", ""),
+            hl.str(locus.position),
+            alleles[0],
+            alleles[1],
+        ],
+        "-",
+    )
+
+
+def diff_clinvar_variants(previous_clinvar_path, clinvar_path, gnomad_variants_path):
+    """
+    Find variants that were added, removed, or changed between two ClinVar releases.
+
+    Variants are compared by the fields stored in the ClinVar variants table.
+    Each changed variant is annotated with the genes and transcripts that it
+    has consequences in according to gnomAD, which are the transcripts whose
+    recommended variants may change.
+    """
+    previous = hl.read_table(previous_clinvar_path)
+    current = hl.read_table(clinvar_path)
+
+    ds = previous.select(previous=previous.row_value.select(*CLINVAR_FIELDS)).join(
+        current.select(current=current.row_value.select(*CLINVAR_FIELDS)),
+        how="outer",
+    )
+
+    ds = ds.annotate(
+        change=hl.case()
+        .when(hl.is_missing(ds.previous), "added")
+        .when(hl.is_missing(ds.current), "removed")
+        .when(ds.previous != ds.current, "changed")
+        .or_missing()
+    )
+    ds = ds.filter(hl.is_defined(ds.change))
+
+    gnomad_variants = hl.read_table(gnomad_variants_path)
+    consequences = gnomad_variants[ds.locus, ds.alleles].transcript_consequences
+
+    ds = ds.select(
+        variant_id=variant_id(ds.locus, ds.alleles),
+        change=ds.change,
+        previous_category=ds.previous.clinical_significance_category,
+        category=ds.current.clinical_significance_category,
+        gene_ids=hl.or_else(
+            hl.set(consequences.map(lambda csq: csq.gene_id)), hl.empty_set(hl.tstr)
+        ),
+        transcript_ids=hl.or_else(
+            hl.set(consequences.map(lambda csq: csq.transcript_id)),
+            hl.empty_set(hl.tstr),
+        ),
+    )
+
+    ds = ds.select_globals(
+        reference_genome=current.globals.reference_genome,
+        previous_release_date=previous.globals.release_date,
+        release_date=current.globals.release_date,
+    )
+
+    return ds
+
+
+def write_change_set(ds, output_path):
+    """
+    Write changed variants as a JSON file.
+
+    ClinVar releases change a small fraction of variants, so the change set is
+    small enough to collect and read without Hail.
+    """
+    changed_variants = ds.collect()
+    globals_ = hl.eval(ds.globals)
+
+    change_set = {
+        "reference_genome": globals_.reference_genome,
+        "previous_release_date": globals_.previous_release_date,
+        "release_date": globals_.release_date,
+        "variants": [
+            {
+                "id": variant.variant_id,
+                "change": variant.change,
+                "previous_category": variant.previous_category,
+                "category": variant.category,
+            }
+            for variant in changed_variants
+        ],
+        "gene_ids": sorted(
+            {gene_id for variant in changed_variants for gene_id in variant.gene_ids}
+        ),
+        "transcript_ids": sorted(
+            {
+                transcript_id
+                for variant in changed_variants
+                for transcript_id in variant.transcript_ids
+            }
+        ),
+    }
+
+    with hl.hadoop_open(output_path, "w") as f:
+        json.dump(change_set, f)
+
+    print(
+        f"{len(change_set['variants'])} variants changed in "
+        f"{len(change_set['transcript_ids'])} transcripts between ClinVar releases "
+        f"{change_set['previous_release_date']} and {change_set['release_date']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write the variants that changed between two ClinVar releases"
+    )
+    parser.add_argument("--previous-clinvar-variants", required=True)
+    parser.add_argument("--clinvar-variants", required=True)
+    parser.add_argument("--gnomad-variants", required=True)
+    parser.add_argument("--quiet", action="store_true")
+    parser.add_argument("output")
+    args = parser.parse_args()
+
+    hl.init(quiet=args.quiet)
+
+    ds = diff_clinvar_variants(
+        args.previous_clinvar_variants, args.clinvar_variants, args.gnomad_variants
+    )
+    write_change_set(ds, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Write the recommended variants of dashboard list genes to one CSV file per gene,
+read from the variants dataset written by generate_recessive_dashboard_lists.py.
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+from dashboard_variants import (
+    get_variants_dataset_path,
+    read_recommended_variants,
+    to_gene_variants_rows,
+)
+
+
+def extract_gene_variants(dataset_path, genes, output_dir):
+    table = read_recommended_variants(dataset_path, genes)
+    df = pd.DataFrame(to_gene_variants_rows(table))
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    found_genes = set()
+    if not df.empty:
+        for (gene_symbol, gene_id), df_gene in df.groupby(
+            ["gene_symbol", "gene_id"], sort=False
+        ):
+            filename = f"GeniE_dashboard_variants-{gene_symbol}-{gene_id}.csv"
+            df_gene.to_csv(os.path.join(output_dir, filename), index=False)
+            print(f"Wrote {len(df_gene)} variants to {filename}")
+            found_genes.update([gene_symbol, gene_id])
+
+    for gene in genes:
+        if gene not in found_genes:
+            print(f"No variants found for {gene}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract the recommended variants of dashboard list genes to CSV files"
+    )
+    parser.add_argument("genes", nargs="+", help="Gene IDs or symbols")
+    parser.add_argument("--directory-root", required=False)
+    parser.add_argument(
+        "--test",
+        action="store_true",
+        help="Read variants written by a test run of the pipeline",
+    )
+    parser.add_argument(
+        "--output-directory",
+        help="Directory to write CSV files to (default: output/dashboard/individual_gene_files)",
+    )
+    args = parser.parse_args()
+
+    base_dir = os.path.join(os.path.dirname(__file__), "../data")
+    if args.directory_root:
+        base_dir = args.directory_root
+
+    output_dir = args.output_directory or os.path.join(
+        base_dir, "output", "dashboard", "individual_gene_files"
+    )
+
+    extract_gene_variants(
+        get_variants_dataset_path(base_dir, test=args.test), args.genes, output_dir
+    )
+
+
+if __name__ == "__main__":
+    main()
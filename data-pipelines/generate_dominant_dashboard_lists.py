@@ -7,6 +7,7 @@ import os
 
 from datetime import datetime
 
+from dashboard_files import DASHBOARD_FILE_EXTENSIONS, write_dashboard_file
 from generate_recessive_dashboard_lists import prepare_gene_models
 
 
@@ -344,23 +345,31 @@ def main():
     print(f"\n\ndownload info: \n")
     print(df_dashboard_download.info())
 
-    df_dashboard_download.to_csv(
-        os.path.join(
-            base_dir, "output", "dominant_dashboard", "dominant-dashboard-download.csv"
-        ),
-        index=False,
-    )
+    for extension in DASHBOARD_FILE_EXTENSIONS:
+        write_dashboard_file(
+            df_dashboard_download,
+            os.path.join(
+                base_dir,
+                "output",
+                "dominant_dashboard",
+                f"dominant-dashboard-download{extension}",
+            ),
+        )
     print("Wrote dominant dashboard downloads file")
 
     df_dashboard_models = prepare_dominant_dashboard_models(df_dashboard_download)
     print(f"\n\nmodels info: \n")
     print(df_dashboard_models.info())
-    df_dashboard_models.to_csv(
-        os.path.join(
-            base_dir, "output", "dominant_dashboard", "dominant-dashboard-models.csv"
-        ),
-        index=False,
-    )
+    for extension in DASHBOARD_FILE_EXTENSIONS:
+        write_dashboard_file(
+            df_dashboard_models,
+            os.path.join(
+                base_dir,
+                "output",
+                "dominant_dashboard",
+                f"dominant-dashboard-models{extension}",
+            ),
+        )
     print("Wrote dominant dashboard models file")
 
 
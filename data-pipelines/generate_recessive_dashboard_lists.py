@@ -14,6 +14,14 @@ from datetime import datetime
 import hail as hl
 import pandas as pd
 
+from dashboard_files import DASHBOARD_FILE_EXTENSIONS, write_dashboard_file
+from dashboard_variants import (
+    clear_recommended_variants,
+    format_recommended_variants,
+    get_variants_dataset_path,
+    write_recommended_variants,
+)
+
 GENIE_RECESSIVE_DASHBOARD_INPUT_GENES_GCS_PATH = "gs://aggregate-frequency-calculator-data/input/2026-05-29_genie-input_5k-disease-associated-genes.csv"
 GENIE_RECESSIVE_DASHBOARD_INPUT_GENES_LOCAL_FILENAME = (
     "2026-06-12_genie-input_5k-disease-associated-dashboard-genes.csv"
@@ -143,7 +151,35 @@ def get_highest_frequency_variants(ds, num_to_keep):
     return ds
 
 
-def _annotate_with_gnomad(contig, start, stop, transcript_id, gnomad_variants):
+def _get_transcript_consequences(transcript_id, transcript_consequences):
+    ht = hl.filter_intervals(
+        transcript_consequences,
+        [
+            hl.interval(
+                hl.struct(transcript_id=transcript_id),
+                hl.struct(transcript_id=transcript_id),
+                includes_start=True,
+                includes_end=True,
+            )
+        ],
+    )
+
+    return ht.key_by("locus", "alleles").select("major_consequence", "lof")
+
+
+def _annotate_with_gnomad(
+    contig, start, stop, transcript_id, gnomad_variants, transcript_consequences=None
+):
+    if transcript_consequences is not None:
+        # Read only the transcript's variants from the table keyed by transcript
+        ht = _get_transcript_consequences(transcript_id, transcript_consequences)
+
+        include_from_gnomad = PLOF_VEP_CONSEQUENCE_TERMS.contains(
+            ht.major_consequence
+        ) & (ht.lof == "HC")
+
+        return ht.annotate(include_from_gnomad=include_from_gnomad)
+
     if start is not None and stop is not None:
         ht = hl.filter_intervals(
             gnomad_variants,
@@ -275,10 +311,13 @@ def process_dashboard_list(
     chrom,
     gnomad_variants,
     clinvar_variants,
+    transcript_consequences=None,
 ):
     contig = f"chr{chrom}"
 
-    ht = _annotate_with_gnomad(contig, start, stop, transcript_id, gnomad_variants)
+    ht = _annotate_with_gnomad(
+        contig, start, stop, transcript_id, gnomad_variants, transcript_consequences
+    )
 
     ht = _annotate_with_clinvar(ht, clinvar_variants)
 
@@ -470,122 +509,11 @@ def annotate_variants_with_orphanet_prevalences(variants, orphanet):
     return merged_df
 
 
-def write_recommended_variants_to_csv(
-    base_dir, gene_symbol, gene_id, recommended_variants
-):
-    filename = f"GeniE_dashboard_variants-{gene_symbol}-{gene_id}.csv"
-
-    def format_dict(title, list):
-        ancestry_groups = [
-            "global",
-            "african_african_american",
-            "admixed_american",
-            "ashkenazi_jewish",
-            "east_asian",
-            "european_finnish",
-            "remaining",
-            "south_asian",
-        ]
-
-        obj = {}
-        for i, ancestry_group in enumerate(ancestry_groups):
-            name = f"{title}_{ancestry_group}"
-            value = list[i]
-            obj[name] = value
-
-        return obj
-
-    def format_af_dict(title, list1, list2):
-        ancestry_groups = [
-            "global",
-            "african_african_american",
-            "admixed_american",
-            "ashkenazi_jewish",
-            "east_asian",
-            "european_finnish",
-            "remaining",
-            "south_asian",
-        ]
-
-        obj = {}
-        for i, ancestry_group in enumerate(ancestry_groups):
-            name = f"{title}_{ancestry_group}"
-            ac = list1[i]
-            an = list2[i]
-            value = ac / an
-            obj[name] = value
-
-        return obj
-
-    formatted_variants = []
-    for variant in recommended_variants:
-        formatted_variants.append(
-            {
-                "gene_symbol": gene_symbol,
-                "gene_id": gene_id,
-                "variant_gnomad_id": variant["id"],
-                #
-                "vep_consequence": variant["major_consequence"],
-                "hgvsc": variant["hgvsc"],
-                "hgvsp": variant["hgvsp"],
-                "loftee": variant["lof"],
-                "clinvar_clinical_significance": variant["clinical_significance"][0]
-                if variant["clinical_significance"]
-                else None,
-                "clinvar_variation_id": variant["clinvar_variation_id"],
-                #
-                "allele_count": variant["AC"][0] if variant["AC"] else None,
-                "allele_number": variant["AN"][0] if variant["AN"] else None,
-                "allele_frequency": (variant["AC"][0] / variant["AN"][0])
-                if (variant["AC"] and variant["AN"])
-                else None,
-                "homozygote_count": variant["homozygote_count"][0]
-                if variant["homozygote_count"]
-                else None,
-                #
-                "flags": "|".join(variant["flags"]),
-                "source": "|".join(variant["source"]),
-                #
-                "allele_count_per_ancestry": format_dict("allele_count", variant["AC"])
-                if variant["AC"]
-                else None,
-                "allele_number_per_ancestry": format_dict(
-                    "allele_number", variant["AN"]
-                )
-                if variant["AN"]
-                else None,
-                "allele_frequency_per_ancestry": format_af_dict(
-                    "allele_frequency", variant["AC"], variant["AN"]
-                )
-                if (variant["AC"] and variant["AN"])
-                else None,
-                "homozygote_count_per_ancestry": format_dict(
-                    "homozygote_count", variant["homozygote_count"]
-                )
-                if variant["homozygote_count"]
-                else None,
-            }
-        )
-
-    df = pd.DataFrame(formatted_variants)
-
-    filename = f"GeniE_dashboard_variants-{gene_symbol}-{gene_id}.csv"
-    output_dir = os.path.join(
-        base_dir,
-        "output",
-        "dashboard",
-        "individual_gene_files",
-    )
-    full_output_path = os.path.join(output_dir, filename)
-
-    os.makedirs(output_dir, exist_ok=True)
-    df.to_csv(full_output_path, index=False)
-    print(f"    - Gene-variant CSV file written to ...{filename}")
-
-
 def prepare_dashboard_lists(
     df_genes_this_batch,
     base_dir,
+    variants_dataset_path,
+    variants_basename,
 ):
     GNOMAD_V4_VARIANTS_PATH = (
         "gs://aggregate-frequency-calculator-data/gnomAD/gnomAD_v4.1.0_variants.ht"
@@ -593,6 +521,15 @@ def prepare_dashboard_lists(
     ht_gnomad_variants = hl.read_table(GNOMAD_V4_VARIANTS_PATH)
     metadata_populations = hl.eval(ht_gnomad_variants.globals.populations)
 
+    # Built by prepare_transcript_consequences.py. Without it, each gene's
+    #   variants are found by scanning consequences of all variants in its region.
+    GNOMAD_V4_TRANSCRIPT_CONSEQUENCES_PATH = "gs://aggregate-frequency-calculator-data/gnomAD/gnomAD_v4.1.0_transcript_consequences.ht"
+    ht_transcript_consequences = None
+    if hl.hadoop_exists(GNOMAD_V4_TRANSCRIPT_CONSEQUENCES_PATH):
+        ht_transcript_consequences = hl.read_table(
+            GNOMAD_V4_TRANSCRIPT_CONSEQUENCES_PATH
+        )
+
     CLINVAR_GRCH38_PATH = os.path.join(
         base_dir, "processed_data", "ClinVar", "ClinVar_GRCh38_variants.ht"
     )
@@ -621,6 +558,7 @@ def prepare_dashboard_lists(
     df["inheritance_type"] = ""
 
     batch_i = 0
+    batch_recommended_variants = []
 
     def subset_gnomad_and_clinvar_to_chrom(chrom, start, stop):
         print(f"    -- Subsetting Hail tables...")
@@ -710,6 +648,10 @@ def prepare_dashboard_lists(
             "gnomad_version": "4.1.1",
             "reference_genome": "GRCh38",
             "gene_symbol": row.symbol,
+            # used by the website's gene search
+            "alias_symbols": sorted(row.alias_symbols)
+            if isinstance(row.alias_symbols, (list, set, frozenset))
+            else [],
             "populations": metadata_populations,
             "clinvar_version": metadata_clinvar_version,
             "gene_id": gene_id_with_version,
@@ -736,11 +678,13 @@ def prepare_dashboard_lists(
             chrom=row.chrom,
             gnomad_variants=chrom_gnomad_variants,
             clinvar_variants=chrom_clinvar_variants,
+            transcript_consequences=ht_transcript_consequences,
         )
 
-        # TODO: right here, call a helper to create a .csv for this variant
-        write_recommended_variants_to_csv(
-            base_dir, row.symbol, row.gene_id, recommended_variants
+        batch_recommended_variants.append(
+            format_recommended_variants(
+                row.symbol, row.gene_id, row.chrom, recommended_variants
+            )
         )
 
         calculate_stats(
@@ -758,6 +702,13 @@ def prepare_dashboard_lists(
         formatted_time = f"{minutes:02d}m{seconds:02d}s"
         print(f"    - Finished in {formatted_time}")
 
+    write_recommended_variants(
+        variants_dataset_path,
+        variants_basename,
+        batch_recommended_variants,
+    )
+    print("    - Wrote recommended variants to dataset")
+
     df = annotate_variants_with_orphanet_prevalences(df, df_orphanet_prevalences)
 
     FINAL_COLUMNS = [
@@ -1254,6 +1205,11 @@ def main() -> None:
         print(f"Path {gene_models_path} does not exist, creating ht.")
         prepare_gene_models(GNOMAD_GRCH38_GENES_PATH, base_dir)
 
+    # Batches of an earlier run may have held other genes, so the variants
+    #   dataset is written from scratch
+    variants_dataset_path = get_variants_dataset_path(base_dir, test=args.test)
+    clear_recommended_variants(variants_dataset_path)
+
     for batch_id in range(num_batches):
         try:
             print("starting cleanup")
@@ -1301,7 +1257,12 @@ def main() -> None:
 
             print("Preparing dashboard list models ...")
 
-            df_dashboard_models = prepare_dashboard_lists(df_genes_this_batch, base_dir)
+            df_dashboard_models = prepare_dashboard_lists(
+                df_genes_this_batch,
+                base_dir,
+                variants_dataset_path=variants_dataset_path,
+                variants_basename=f"recessive_dashboard_variants_batch-{batch_id + 1}",
+            )
             model_output_file = (
                 Path(base_dir)
                 / "output"
@@ -1310,7 +1271,10 @@ def main() -> None:
                 / f"{file_prefix}recessive_dashboard_models_batch-{batch_id + 1}-of-{num_batches}--{batch_length}-lists.csv"
             )
             model_output_file.parent.mkdir(parents=True, exist_ok=True)
-            df_dashboard_models.to_csv(model_output_file, index=False)
+            for extension in DASHBOARD_FILE_EXTENSIONS:
+                write_dashboard_file(
+                    df_dashboard_models, model_output_file.with_suffix(extension)
+                )
             print("\n\nWrote dashboard list models to file")
 
             # ---
@@ -1327,7 +1291,10 @@ def main() -> None:
                 / f"{file_prefix}recessive_dashboard_downloads_batch-{batch_id + 1}-of-{num_batches}--{batch_length}-lists.csv"
             )
             download_output_file.parent.mkdir(parents=True, exist_ok=True)
-            df_dashboard_download.to_csv(download_output_file, index=False)
+            for extension in DASHBOARD_FILE_EXTENSIONS:
+                write_dashboard_file(
+                    df_dashboard_download, download_output_file.with_suffix(extension)
+                )
             print("Wrote dashboard downloads to file")
 
             # ---
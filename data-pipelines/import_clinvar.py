@@ -1,12 +1,16 @@
 import argparse
+import contextlib
 import gzip
 import os
 import shutil
 import subprocess
 import tempfile
+import time
 
 import hail as hl
 
+from partitioning import add_partitioning_arguments, write_table
+
 
 CLINVAR_FTP_PATH = "ftp://ftp.ncbi.nlm.nih.gov/pub/clinvar/vcf_{reference_genome}/weekly/clinvar.vcf.gz"
 
@@ -144,6 +148,17 @@ GOLD_STARS = hl.dict(
 )
 
 
+@contextlib.contextmanager
+def _print_duration(stage):
+    start = time.perf_counter()
+    yield
+    print(f"{stage} took {time.perf_counter() - start:.1f}s")
+
+
+def _clean_clinical_significance(value):
+    return value.replace("^_", "").replace("_", " ")
+
+
 def import_clinvar_vcf(clinvar_vcf_path, *, intervals=None, partitions=2000):
     clinvar_release_date = _get_vcf_meta_info(clinvar_vcf_path, "fileDate")
     reference_genome = _get_vcf_meta_info(clinvar_vcf_path, "reference")
@@ -171,11 +186,15 @@ def import_clinvar_vcf(clinvar_vcf_path, *, intervals=None, partitions=2000):
         )
         clinvar_vcf_url = "/tmp/" + os.path.basename(clinvar_vcf_path)
 
+    # The ClinVar VCF is block gzipped, so it can be split into partitions as it
+    #   is read. Since the VCF is sorted, this gives partitions of contiguous loci
+    #   without shuffling rows.
     ds = hl.import_vcf(
         clinvar_vcf_url,
         contig_recoding=contig_recoding,
         drop_samples=True,
-        force=True,
+        force_bgz=True,
+        min_partitions=partitions,
         reference_genome=reference_genome,
         skip_invalid_loci=True,
     ).rows()
@@ -183,34 +202,51 @@ def import_clinvar_vcf(clinvar_vcf_path, *, intervals=None, partitions=2000):
     if intervals:
         ds = hl.filter_intervals(ds, intervals)
 
-    ds = ds.repartition(partitions, shuffle=True)
-
-    # catch any new terms in incoming ClinVar vcf early
-    print("Pre-scanning VCF for unknown clinical significance terms...")
-
-    cleaned_clnsig = ds.info.CLNSIG.flatmap(lambda s: s.split(r"\|")).map(
-        lambda s: s.replace("^_", "").replace("_", " ")
+    # Parse INFO fields once. The parsed table is checkpointed, so that checking
+    #   for unknown terms and annotating categories both read the parsed values
+    #   instead of reading and parsing the VCF again.
+    ds = ds.select(
+        clinvar_variation_id=ds.rsid,
+        clinical_significance=hl.set(
+            # CLNSIG is an array, but most rows contain only one element with multiple pipe
+            # delimited values. Flatmap and split should work both with the current format and
+            # if the value is properly formatted as an array sometime in the future.
+            ds.info.CLNSIG.flatmap(lambda s: s.split(r"\|")).map(
+                _clean_clinical_significance
+            )
+        ),
+        conflicting_clinical_significances=hl.set(
+            hl.or_else(ds.info.CLNSIGCONF, hl.empty_array(hl.tstr))
+            # CLNSIGCONF is an array, but when defined, contains only one element with multiple
+            # pipe delimited values. Flatmap and split should work both with the current format
+            # and if the value is properly formatted as an array sometime in the future.
+            .flatmap(lambda s: s.split(r"\|")).map(
+                lambda s: _clean_clinical_significance(s).replace(r"\(\d+\)$", "")
+            )
+        ),
+        gold_stars=GOLD_STARS[
+            hl.delimit(ds.info.CLNREVSTAT.map(_clean_clinical_significance), ", ")
+        ],
     )
 
-    cleaned_clnsigconf = (
-        hl.or_else(ds.info.CLNSIGCONF, hl.empty_array(hl.tstr))
-        .flatmap(lambda s: s.split(r"\|"))
-        .map(
-            lambda s: s.replace("^_", "")
-            .replace("_", " ")
-            .replace(r"\(\d+\)$", "")
-            .strip()
-        )
-    )
+    with _print_duration("Parsing VCF"):
+        ds = ds.checkpoint(hl.utils.new_temp_file("clinvar_parsed", "ht"))
 
-    unique_clnsig = ds.aggregate(
-        hl.agg.explode(lambda x: hl.agg.collect_as_set(x), cleaned_clnsig)
-    )
-    unique_clnsigconf = ds.aggregate(
-        hl.agg.explode(lambda x: hl.agg.collect_as_set(x), cleaned_clnsigconf)
-    )
+    # catch any new terms in incoming ClinVar vcf early
+    print("Scanning VCF for unknown clinical significance terms...")
+    with _print_duration("Scanning terms"):
+        all_found_terms = ds.aggregate(
+            hl.agg.explode(
+                hl.agg.collect_as_set,
+                hl.array(
+                    ds.clinical_significance.union(
+                        # trim whitespace as when categorizing conflicting terms below
+                        ds.conflicting_clinical_significances.map(lambda c: c.strip())
+                    )
+                ),
+            )
+        )
 
-    all_found_terms = set(unique_clnsig) | set(unique_clnsigconf)
     all_found_terms = {t for t in all_found_terms if t is not None}
     known_terms = {t for t in KNOWN_CLINICAL_SIGNIFICANCES if t is not None}
 
@@ -229,34 +265,6 @@ def import_clinvar_vcf(clinvar_vcf_path, *, intervals=None, partitions=2000):
         release_date=clinvar_release_date,
     )
 
-    ds = ds.annotate(clinvar_variation_id=ds.rsid)
-
-    ds = ds.annotate(
-        clinical_significance=hl.set(
-            # CLNSIG is an array, but most rows contain only one element with multiple pipe
-            # delimited values. Flatmap and split should work both with the current format and
-            # if the value is properly formatted as an array sometime in the future.
-            ds.info.CLNSIG.flatmap(lambda s: s.split(r"\|")).map(
-                lambda s: s.replace("^_", "").replace("_", " ")
-            )
-        ),
-        conflicting_clinical_significances=hl.set(
-            hl.or_else(ds.info.CLNSIGCONF, hl.empty_array(hl.tstr))
-            # CLNSIGCONF is an array, but when defined, contains only one element with multiple
-            # pipe delimited values. Flatmap and split should work both with the current format
-            # and if the value is properly formatted as an array sometime in the future.
-            .flatmap(lambda s: s.split(r"\|")).map(
-                lambda s: s.replace("^_", "").replace("_", " ").replace(r"\(\d+\)$", "")
-            )
-        ),
-        gold_stars=GOLD_STARS[
-            hl.delimit(
-                ds.info.CLNREVSTAT.map(lambda s: s.replace("^_", "").replace("_", " ")),
-                ", ",
-            )
-        ],
-    )
-
     # Categorize clinical significance.
     ds = ds.annotate(
         clinical_significance_categories=ds.clinical_significance.map(
@@ -309,7 +317,7 @@ def main() -> None:
         "--reference-genome", choices=("GRCh37", "GRCh38"), default="GRCh38"
     )
     parser.add_argument("--intervals")
-    parser.add_argument("--partitions", default=2000, type=int)
+    add_partitioning_arguments(parser, default_partitions=2000)
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("output")
     args = parser.parse_args()
@@ -330,7 +338,8 @@ def main() -> None:
         ds = import_clinvar_vcf(
             clinvar_vcf_path, intervals=intervals, partitions=args.partitions
         )
-        ds.write(args.output, overwrite=True)
+        with _print_duration("Writing table"):
+            write_table(ds, args.output, args)
 
 
 if __name__ == "__main__":
@@ -4,6 +4,8 @@ import re
 
 import hail as hl
 
+from partitioning import add_partitioning_arguments, write_table
+
 
 FLAG_MAPPING = {
     "Essential Splice Rescue": "Splice Rescue",
@@ -153,7 +155,8 @@ def import_gnomad_lof_curation_results(version, *, intervals=None, partitions=16
     if intervals:
         ds = hl.filter_intervals(ds, intervals)
 
-    ds = ds.repartition(partitions, shuffle=True)
+    if partitions:
+        ds = ds.repartition(partitions, shuffle=True)
 
     return ds
 
@@ -162,7 +165,7 @@ def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--gnomad-version", choices=(2,), default=2, type=int)
     parser.add_argument("--intervals")
-    parser.add_argument("--partitions", default=16, type=int)
+    add_partitioning_arguments(parser, default_partitions=16)
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("output")
     args = parser.parse_args()
@@ -178,9 +181,11 @@ def main() -> None:
         ]
 
     ds = import_gnomad_lof_curation_results(
-        args.gnomad_version, intervals=intervals, partitions=args.partitions
+        args.gnomad_version,
+        intervals=intervals,
+        partitions=None if args.partition_size_mb else args.partitions,
     )
-    ds.write(args.output, overwrite=True)
+    write_table(ds, args.output, args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+"""
+Partitioning for tables read by the worker.
+
+The worker reads small intervals from each table, so reads are fastest when
+partitions hold a similar amount of data and a gene's variants fall in few
+partitions. Instead of shuffling the table into a fixed number of partitions,
+tables can be written with partitions of a target size: the table is written
+once as it is, and then read back with boundaries that split it into key
+ranges of about the target size. Reading with new boundaries uses the table's
+index and does not shuffle rows.
+
+Submit pipelines that use this module with `--pyfiles partitioning.py`.
+"""
+
+import math
+
+import hail as hl
+
+
+def get_table_size(path):
+    """Return the size in bytes of a table's rows."""
+    return sum(entry["size_bytes"] for entry in hl.hadoop_ls(f"{path}/rows/parts"))
+
+
+def read_table_with_partitions(path, num_partitions):
+    """
+    Read a table split into num_partitions contiguous key ranges.
+
+    Hail has no public method for reading a table with new partition boundaries,
+    so this uses Table._calculate_new_partitions and read_table's _intervals.
+    If a later version of Hail removes either of them, the table is shuffled into
+    num_partitions partitions with Table.repartition instead.
+    """
+    try:
+        intervals = hl.read_table(path)._calculate_new_partitions(num_partitions)
+        return hl.read_table(path, _intervals=intervals)
+    except (AttributeError, TypeError):
+        return hl.read_table(path).repartition(num_partitions)
+
+
+def write_table_with_partition_size(ds, output, partition_size):
+    """
+    Write a table with contiguous partitions of about partition_size bytes.
+
+    Rows are of similar sizes in the tables written by these pipelines, so
+    partitions are chosen to hold equal numbers of rows.
+    """
+    # The table is written to a temporary directory, which is removed once the
+    #   table has been written again with new partitions
+    with hl.TemporaryDirectory(prefix="partitioning", ensure_exists=False) as tmp_dir:
+        tmp_path = f"{tmp_dir}/table.ht"
+        ds.write(tmp_path)
+
+        num_partitions = max(1, math.ceil(get_table_size(tmp_path) / partition_size))
+
+        ds = read_table_with_partitions(tmp_path, num_partitions)
+        ds.write(output, overwrite=True)
+
+
+def add_partitioning_arguments(parser, default_partitions):
+    parser.add_argument("--partitions", default=default_partitions, type=int)
+    parser.add_argument(
+        "--partition-size-mb",
+        type=int,
+        help="Write partitions of about this size instead of a fixed number of partitions",
+    )
+
+
+def write_table(ds, output, args):
+    if args.partition_size_mb:
+        write_table_with_partition_size(ds, output, args.partition_size_mb * 1024**2)
+    else:
+        ds.write(output, overwrite=True)
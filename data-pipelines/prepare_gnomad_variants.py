@@ -6,6 +6,8 @@ import tempfile
 
 import hail as hl
 
+from partitioning import add_partitioning_arguments, write_table
+
 
 VEP_CONSEQUENCE_TERMS = [
     "transcript_ablation",
@@ -795,7 +797,8 @@ def prepare_gnomad_variants(gnomad_version, *, intervals=None, partitions=2000):
         ),
     )
 
-    ds = ds.repartition(partitions, shuffle=True)
+    if partitions:
+        ds = ds.repartition(partitions, shuffle=True)
 
     return ds
 
@@ -804,7 +807,7 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--gnomad-version", choices=(2, 3, 4), default=4, type=int)
     parser.add_argument("--intervals")
-    parser.add_argument("--partitions", default=2000, type=int)
+    add_partitioning_arguments(parser, default_partitions=2000)
     parser.add_argument("--quiet", action="store_true")
     parser.add_argument("output")
     args = parser.parse_args()
@@ -821,7 +824,9 @@ def main():
         ]
 
     ds = prepare_gnomad_variants(
-        args.gnomad_version, intervals=intervals, partitions=args.partitions
+        args.gnomad_version,
+        intervals=intervals,
+        partitions=None if args.partition_size_mb else args.partitions,
     )
 
     gencode_version = (
@@ -840,7 +845,7 @@ def main():
             )
         )
 
-    ds.write(args.output, overwrite=True)
+    write_table(ds, args.output, args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,202 @@
+import argparse
+
+import hail as hl
+
+from partitioning import add_partitioning_arguments, write_table
+
+
+# Transcript consequence fields read by the worker
+TRANSCRIPT_CONSEQUENCE_FIELDS = [
+    "gene_id",
+    "gene_symbol",
+    "hgvsc",
+    "hgvsp",
+    "lof",
+    "major_consequence",
+    "transcript_id",
+]
+
+CLINVAR_FIELDS = [
+    "clinvar_variation_id",
+    "clinical_significance",
+    "clinical_significance_category",
+    "conflicting_clinical_significance_categories",
+    "gold_stars",
+]
+
+# For each frequency subset, the (frequency, filters) sample sets combined into it.
+#   This matches combined_freq in the worker: gnomAD v4 uses joint frequencies,
+#   while earlier versions add exome and genome frequencies.
+FREQUENCY_SUBSETS = {
+    2: {"freq": [("exome", "exome"), ("genome", "genome")]},
+    3: {"freq": [("exome", "exome"), ("genome", "genome")]},
+    4: {"freq": [("joint", "joint")]},
+}
+
+# LoF curation results of a variant, one per gene. Tables built without curation
+#   results have an empty array, so that the worker can read the field for every
+#   gnomAD version.
+LOF_CURATION_TYPE = hl.tstruct(
+    gene_id=hl.tstr, verdict=hl.tstr, flags=hl.tset(hl.tstr), project=hl.tstr
+)
+
+
+def combine_freq(ds, sample_sets, n_populations):
+    """
+    Add the AC, AN, and homozygote counts of sample sets that pass filters.
+
+    The result is missing for variants that are not in gnomAD.
+    """
+    zeroes = hl.range(1 + n_populations).map(lambda _: 0)
+
+    def sample_set_freq(freq_field, filters_field, field):
+        return hl.if_else(
+            hl.is_defined(ds.freq[freq_field])
+            & (
+                hl.len(hl.or_else(ds.filters[filters_field], hl.empty_set(hl.tstr)))
+                == 0
+            ),
+            ds.freq[freq_field][field],
+            zeroes,
+        )
+
+    def sum_arrays(arrays):
+        if len(arrays) == 1:
+            return arrays[0]
+
+        return hl.zip(*arrays).map(
+            lambda values: hl.sum([values[i] for i in range(len(arrays))])
+        )
+
+    return hl.or_missing(
+        hl.is_defined(ds.freq),
+        hl.struct(
+            **{
+                field: sum_arrays(
+                    [
+                        sample_set_freq(freq_field, filters_field, field)
+                        for freq_field, filters_field in sample_sets
+                    ]
+                )
+                for field in ("AC", "AN", "homozygote_count")
+            }
+        ),
+    )
+
+
+def prepare_serving_variants(
+    gnomad_version,
+    gnomad_variants_path,
+    clinvar_variants_path,
+    lof_curation_results_path=None,
+    *,
+    intervals=None,
+    partitions=1000,
+):
+    gnomad = hl.read_table(gnomad_variants_path)
+    populations = hl.eval(gnomad.globals.populations)
+
+    if intervals:
+        gnomad = hl.filter_intervals(gnomad, intervals)
+
+    gnomad = gnomad.select(
+        transcript_consequences=gnomad.transcript_consequences.map(
+            lambda csq: csq.select(*TRANSCRIPT_CONSEQUENCE_FIELDS)
+        ),
+        revel_score=gnomad.revel_score,
+        filters=gnomad.filters,
+        sample_sets=gnomad.sample_sets,
+        **{
+            subset: combine_freq(gnomad, sample_sets, len(populations))
+            for subset, sample_sets in FREQUENCY_SUBSETS[gnomad_version].items()
+        },
+    )
+    gnomad = gnomad.select_globals()
+
+    clinvar = hl.read_table(clinvar_variants_path)
+    clinvar_release_date = hl.eval(clinvar.globals.release_date)
+
+    if intervals:
+        clinvar = hl.filter_intervals(clinvar, intervals)
+
+    clinvar = clinvar.select(*CLINVAR_FIELDS)
+    clinvar = clinvar.select_globals()
+
+    # Keep variants that are only in ClinVar, which may be included in a list
+    ds = gnomad.join(clinvar, how="outer")
+
+    if lof_curation_results_path:
+        lof_curation_results = hl.read_table(lof_curation_results_path)
+
+        if intervals:
+            lof_curation_results = hl.filter_intervals(lof_curation_results, intervals)
+
+        lof_curation_results = lof_curation_results.group_by(
+            lof_curation_results.locus, lof_curation_results.alleles
+        ).aggregate(
+            lof_curations=hl.agg.collect(
+                lof_curation_results.row.select(
+                    "gene_id", "verdict", "flags", "project"
+                )
+            )
+        )
+
+        ds = ds.join(lof_curation_results, how="outer")
+    else:
+        ds = ds.annotate(lof_curations=hl.empty_array(LOF_CURATION_TYPE))
+
+    ds = ds.select_globals(
+        populations=populations, clinvar_release_date=clinvar_release_date
+    )
+
+    if partitions:
+        ds = ds.repartition(partitions, shuffle=True)
+
+    return ds
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Combine prepared gnomAD, ClinVar, and LoF curation tables into the "
+            "table read by the worker"
+        )
+    )
+    parser.add_argument("--gnomad-version", choices=(2, 3, 4), default=4, type=int)
+    parser.add_argument("--gnomad-variants", required=True)
+    parser.add_argument("--clinvar-variants", required=True)
+    parser.add_argument(
+        "--lof-curation-results",
+        help="LoF curation results to join, if there are any for the gnomAD version",
+    )
+    parser.add_argument("--intervals")
+    add_partitioning_arguments(parser, default_partitions=1000)
+    parser.add_argument("--quiet", action="store_true")
+    parser.add_argument("output")
+    args = parser.parse_args()
+
+    hl.init(quiet=args.quiet)
+
+    reference_genome = "GRCh37" if args.gnomad_version == 2 else "GRCh38"
+
+    intervals = None
+    if args.intervals:
+        intervals = [
+            hl.parse_locus_interval(interval, reference_genome=reference_genome)
+            for interval in args.intervals.split(",")
+        ]
+
+    ds = prepare_serving_variants(
+        args.gnomad_version,
+        args.gnomad_variants,
+        args.clinvar_variants,
+        args.lof_curation_results,
+        intervals=intervals,
+        partitions=None if args.partition_size_mb else args.partitions,
+    )
+
+    write_table(ds, args.output, args)
+
+
+if __name__ == "__main__":
+    main()
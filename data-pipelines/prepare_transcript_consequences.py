@@ -0,0 +1,71 @@
+import argparse
+
+import hail as hl
+
+
+def prepare_transcript_consequences(serving_variants_path, *, intervals=None):
+    """
+    Index a serving table's variants by transcript.
+
+    The result has one row for each consequence of a variant in a transcript,
+    keyed by (transcript_id, locus, alleles), so that the variants in a
+    transcript can be read as one range of keys. Rows hold the fields used to
+    recommend variants.
+    """
+    ds = hl.read_table(serving_variants_path)
+
+    if intervals:
+        ds = hl.filter_intervals(ds, intervals)
+
+    # Variants only in ClinVar have no consequences and are dropped by explode
+    ds = ds.select(
+        "transcript_consequences",
+        "revel_score",
+        "clinical_significance_category",
+        "conflicting_clinical_significance_categories",
+    )
+    ds = ds.explode(ds.transcript_consequences)
+    ds = ds.transmute(**ds.transcript_consequences)
+
+    ds = ds.select(
+        "transcript_id",
+        "major_consequence",
+        "lof",
+        "revel_score",
+        "clinical_significance_category",
+        "conflicting_clinical_significance_categories",
+    )
+    ds = ds.key_by("transcript_id", "locus", "alleles")
+
+    ds = ds.select_globals()
+
+    return ds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gnomad-version", choices=(2, 3, 4), default=4, type=int)
+    parser.add_argument("--intervals")
+    parser.add_argument("--quiet", action="store_true")
+    parser.add_argument("serving_variants")
+    parser.add_argument("output")
+    args = parser.parse_args()
+
+    hl.init(quiet=args.quiet)
+
+    reference_genome = "GRCh37" if args.gnomad_version == 2 else "GRCh38"
+
+    intervals = None
+    if args.intervals:
+        intervals = [
+            hl.parse_locus_interval(interval, reference_genome=reference_genome)
+            for interval in args.intervals.split(",")
+        ]
+
+    ds = prepare_transcript_consequences(args.serving_variants, intervals=intervals)
+
+    ds.write(args.output, overwrite=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 import argparse
+import concurrent.futures
 import csv
+import json
 import os
+import threading
+import time
 import pandas as pd
 import requests
 import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
 from datetime import datetime
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 base_dir = os.path.join(os.path.dirname(__file__), "../data")
 
@@ -30,30 +36,57 @@ def get_gene_symbols_from_csv(num_rows=None):
     return symbols
 
 
-def parse_orphanet_xml(gene_symbols_to_keep):
-    with open(XML_PATH, "r", encoding="latin-1") as input:
-        xml_input = input.read()
+def _get_gene_info(gene_element):
+    gene_symbol = gene_element.find("Symbol").text
+    ensg_id = ""
+    external_references = gene_element.findall(".//ExternalReference")
+    for ref in external_references:
+        if ref.find("Source").text == "Ensembl":
+            ensg_id = ref.find("Reference").text
+            break
+    return gene_symbol, ensg_id
 
-    root = ET.fromstring(xml_input)
-    disorder_list = root.find("DisorderList")
+
+def parse_orphanet_xml(gene_symbols_to_keep, xml_path=XML_PATH):
+    """
+    Return the OrphaCodes of disorders associated with each of the given genes.
+
+    The XML is parsed as a stream, and each disorder is discarded once its genes
+    have been read, so that the whole document is never held in memory.
+    """
+    gene_symbols_to_keep = list(gene_symbols_to_keep)
+    gene_symbols_set = set(gene_symbols_to_keep)
 
     gene_info = {}
 
-    for disorder in disorder_list.findall("Disorder"):
-        orpha_code = disorder.find("OrphaCode").text
-        gene_elements = disorder.findall(".//Gene")
-        for gene_element in gene_elements:
-            gene_symbol = gene_element.find("Symbol").text
-            ensg_id = ""
-            external_references = gene_element.findall(".//ExternalReference")
-            for ref in external_references:
-                if ref.find("Source").text == "Ensembl":
-                    ensg_id = ref.find("Reference").text
-                    break
-            if gene_symbol not in gene_info:
-                gene_info[gene_symbol] = {"OrphaCodes": [], "ENSG_ID": ""}
-            gene_info[gene_symbol]["OrphaCodes"].append(orpha_code)
-            gene_info[gene_symbol]["ENSG_ID"] = ensg_id
+    with open(xml_path, "r", encoding="latin-1") as input:
+        # Path of tags from the root to the current element, used to find
+        #   disorders that are direct children of DisorderList
+        path = []
+        disorder_list = None
+
+        for event, element in ET.iterparse(input, events=("start", "end")):
+            if event == "start":
+                path.append(element.tag)
+                if path[1:] == ["DisorderList"]:
+                    disorder_list = element
+                continue
+
+            if path[1:] == ["DisorderList", "Disorder"]:
+                orpha_code = element.find("OrphaCode").text
+                for gene_element in element.iterfind(".//Gene"):
+                    gene_symbol, ensg_id = _get_gene_info(gene_element)
+                    if gene_symbol not in gene_symbols_set:
+                        continue
+
+                    if gene_symbol not in gene_info:
+                        gene_info[gene_symbol] = {"OrphaCodes": [], "ENSG_ID": ""}
+                    gene_info[gene_symbol]["OrphaCodes"].append(orpha_code)
+                    gene_info[gene_symbol]["ENSG_ID"] = ensg_id
+
+                disorder_list.remove(element)
+
+            path.pop()
 
     filtered_gene_info = {
         gene_symbol: gene_info[gene_symbol]
@@ -64,37 +97,240 @@ def parse_orphanet_xml(gene_symbols_to_keep):
     return filtered_gene_info
 
 
-def scrape_orphanet_for_genetic_prevalence(orpha_code):
-    url = f"https://www.orpha.net/en/disease/detail/{orpha_code}?name={orpha_code}&mode=orpha"
-    response = requests.get(url)
-    if response.status_code == 200:
-        soup = BeautifulSoup(response.content, "html.parser")
-        prevalence_leader_text = soup.find(
-            "strong", string=lambda t: "prevalence" in t.lower()
-        )
-        if prevalence_leader_text:
-            prevalence_number = prevalence_leader_text.find_next_sibling("span")
-            if prevalence_number:
-                return prevalence_number.text.strip()
+ORPHANET_DISEASE_URL = (
+    "https://www.orpha.net/en/disease/detail/{orpha_code}?name={orpha_code}&mode=orpha"
+)
+
+DEFAULT_CACHE_DIR = os.path.join(base_dir, "cache", "orphanet")
+
+
+class ResponseCache:
+    """
+    Orphanet disease pages saved on disk, keyed by OrphaCode.
+
+    Pages older than ttl seconds are fetched again.
+    """
+
+    def __init__(self, cache_dir, ttl):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_path(self, orpha_code):
+        return os.path.join(self.cache_dir, f"{orpha_code}.html")
+
+    def get(self, orpha_code):
+        path = self._get_path(orpha_code)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                return None
+
+            with open(path, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def set(self, orpha_code, content):
+        path = self._get_path(orpha_code)
+        # Write to a temporary file first so that an interrupted write does not
+        #   leave a partial page in the cache
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+
+class RateLimiter:
+    """Space out requests made from any number of threads."""
+
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second
+        self.next_request_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_request_time - now
+            self.next_request_time = max(now, self.next_request_time) + self.interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def create_session(pool_size):
+    """Create a session that reuses connections and retries transient failures."""
+    retry = Retry(
+        total=5,
+        backoff_factor=1,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET"],
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_genetic_prevalence(content):
+    soup = BeautifulSoup(content, "html.parser")
+    prevalence_leader_text = soup.find(
+        "strong", string=lambda t: t and "prevalence" in t.lower()
+    )
+    if prevalence_leader_text:
+        prevalence_number = prevalence_leader_text.find_next_sibling("span")
+        if prevalence_number:
+            return prevalence_number.text.strip()
 
     return ""
 
 
-def scrape_orphanet_for_genetic_prevalences(genes_orphacode_dict):
-    local_dict = genes_orphacode_dict
-    length = len(genes_orphacode_dict)
-    i = 1
+def scrape_orphanet_for_genetic_prevalence(
+    orpha_code,
+    *,
+    session=None,
+    cache=None,
+    rate_limiter=None,
+    url=ORPHANET_DISEASE_URL,
+    timeout=30,
+):
+    content = cache.get(orpha_code) if cache else None
 
-    for gene_symbol, gene_data in genes_orphacode_dict.items():
-        print(f"  - Gene Symbol {gene_symbol} ({i} / {length})")
-        orpha_prevalence_array = []
+    if content is None:
+        if rate_limiter:
+            rate_limiter.wait()
+
+        response = (session or requests).get(
+            url.format(orpha_code=orpha_code), timeout=timeout
+        )
+        # Pages for unknown OrphaCodes have no prevalence, other failures are
+        #   raised so that the OrphaCode is fetched again on the next run
+        if response.status_code == 404:
+            return ""
+        response.raise_for_status()
+
+        content = response.content
+        if cache:
+            cache.set(orpha_code, content)
+
+    return parse_genetic_prevalence(content)
+
+
+def load_checkpoint(checkpoint_path, ttl):
+    """Read prevalences for OrphaCodes scraped by earlier runs less than ttl seconds ago."""
+    prevalences = {}
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last line may be incomplete if a run was interrupted
+                    continue
+
+                # Expired entries are scraped again, like expired cached pages
+                if time.time() - entry.get("scraped_at", 0) > ttl:
+                    continue
+
+                prevalences[entry["OrphaCode"]] = entry["prevalence"]
+
+    return prevalences
+
+
+def scrape_orphanet_for_genetic_prevalences(
+    genes_orphacode_dict,
+    *,
+    max_workers=8,
+    requests_per_second=5,
+    cache_dir=None,
+    cache_ttl=30 * 24 * 60 * 60,
+    checkpoint_path=None,
+    url=ORPHANET_DISEASE_URL,
+):
+    """
+    Add the prevalence from Orphanet for each OrphaCode of each gene.
+
+    Pages are fetched concurrently, at most requests_per_second at a time. If a
+    cache directory is given, fetched pages are saved there and reused until they
+    are older than cache_ttl seconds. If a checkpoint path is given, each scraped
+    prevalence is appended to it, and OrphaCodes in it are not scraped again
+    until their entry is older than cache_ttl seconds.
+    """
+    orpha_codes = sorted(
+        {
+            orpha_code
+            for gene_data in genes_orphacode_dict.values()
+            for orpha_code in gene_data["OrphaCodes"]
+        }
+    )
+
+    prevalences = load_checkpoint(checkpoint_path, cache_ttl)
+    missing_orpha_codes = [code for code in orpha_codes if code not in prevalences]
+    print(
+        f"  - {len(orpha_codes)} OrphaCodes, "
+        f"{len(orpha_codes) - len(missing_orpha_codes)} from checkpoint"
+    )
 
-        for orpha_code in gene_data["OrphaCodes"]:
-            prevalence = scrape_orphanet_for_genetic_prevalence(orpha_code)
-            orpha_prevalence_array.append(f"{orpha_code}:{prevalence}")
+    session = create_session(max_workers)
+    cache = ResponseCache(cache_dir, cache_ttl) if cache_dir else None
+    rate_limiter = RateLimiter(requests_per_second)
+    checkpoint_lock = threading.Lock()
+
+    failed_orpha_codes = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                scrape_orphanet_for_genetic_prevalence,
+                orpha_code,
+                session=session,
+                cache=cache,
+                rate_limiter=rate_limiter,
+                url=url,
+            ): orpha_code
+            for orpha_code in missing_orpha_codes
+        }
+
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            orpha_code = futures[future]
+            try:
+                prevalences[orpha_code] = future.result()
+            except requests.RequestException as e:
+                print(f"  - Failed to fetch OrphaCode {orpha_code}: {e}")
+                failed_orpha_codes.append(orpha_code)
+                continue
+
+            if checkpoint_path:
+                with checkpoint_lock, open(checkpoint_path, "a", encoding="utf-8") as f:
+                    f.write(
+                        json.dumps(
+                            {
+                                "OrphaCode": orpha_code,
+                                "prevalence": prevalences[orpha_code],
+                                "scraped_at": time.time(),
+                            }
+                        )
+                        + "\n"
+                    )
+
+            if i % 100 == 0:
+                print(f"  - Scraped {i} / {len(missing_orpha_codes)} OrphaCodes")
+
+    if failed_orpha_codes:
+        print(
+            f"  - Failed to fetch {len(failed_orpha_codes)} OrphaCodes, "
+            "rerun to retry them"
+        )
 
-        local_dict[gene_symbol]["OrphaPrevalence"] = orpha_prevalence_array
-        i += 1
+    local_dict = genes_orphacode_dict
+    for gene_symbol, gene_data in genes_orphacode_dict.items():
+        local_dict[gene_symbol]["OrphaPrevalence"] = [
+            f"{orpha_code}:{prevalences.get(orpha_code, '')}"
+            for orpha_code in gene_data["OrphaCodes"]
+        ]
 
     return local_dict
 
@@ -115,6 +351,14 @@ def main():
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--test", action="store_true", required=False)
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--requests-per-second", type=float, default=5)
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--cache-ttl-days", type=float, default=30)
+    parser.add_argument(
+        "--checkpoint",
+        default=os.path.join(base_dir, "processed_data", "orphanet_prevalences.jsonl"),
+    )
     args = parser.parse_args()
 
     print("\nGetting Orphanet prevalences ...")
@@ -131,7 +375,12 @@ def main():
     genes_orphacode_dict = parse_orphanet_xml(csv_genelist)
 
     genes_orphacode_prevalence_dict = scrape_orphanet_for_genetic_prevalences(
-        genes_orphacode_dict
+        genes_orphacode_dict,
+        max_workers=args.max_workers,
+        requests_per_second=args.requests_per_second,
+        cache_dir=args.cache_dir,
+        cache_ttl=args.cache_ttl_days * 24 * 60 * 60,
+        checkpoint_path=args.checkpoint,
     )
 
     convert_to_pandas(output_filename, genes_orphacode_prevalence_dict)
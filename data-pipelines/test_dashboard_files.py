@@ -0,0 +1,153 @@
+import json
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from dashboard_files import (
+    METADATA_TYPE,
+    read_dashboard_file,
+    write_dashboard_file,
+)
+
+RECESSIVE_METADATA = {
+    "gnomad_version": "4.1.1",
+    "reference_genome": "GRCh38",
+    "gene_symbol": "GENEA",
+    "populations": ["afr", "amr"],
+    "clinvar_version": "2025-06-01",
+    "gene_id": "ENSG00000000001.1",
+    "transcript_id": "ENST00000000001.1",
+    "include_gnomad_plof": True,
+    "include_clinvar_clinical_significance": ["pathogenic_or_likely_pathogenic"],
+    "include_gnomad_missense_with_high_revel_score": False,
+}
+
+VARIANT_CALCULATIONS = {
+    "variant_count": 1,
+    "prevalence": [1e-5, 2e-5, 0.0],
+    "prevalence_bayesian": [1e-5, 2e-5, 0.0],
+    "total_allele_frequency": [2e-3, 4e-3, 0.0],
+    "carrier_frequency": [4e-3, 8e-3, 0.0],
+    "carrier_frequency_simplified": [4e-3, 8e-3, 0.0],
+    "carrier_frequency_raw_numbers": [{"total_ac": 2, "average_an": 1000.0}],
+}
+
+TOP_TEN_VARIANT = {
+    "id": "1-100-A-T",
+    "hgvsc": "c.1A>T",
+    "hgvsp": "p.Met1Leu",
+    "lof": "HC",
+    "major_consequence": "stop_gained",
+    "gene_id": "ENSG00000000001.1",
+    "gene_symbol": "GENEA",
+    "transcript_id": "ENST00000000001.1",
+    "AC": [2, 0, 0],
+    "AN": [1000, 500, 500],
+    "homozygote_count": [0, 0, 0],
+    "clinvar_variation_id": None,
+    "clinical_significance": [],
+    "gold_stars": None,
+    "filters": None,
+    "flags": [],
+    "sample_sets": ["exome"],
+    "source": ["gnomAD"],
+}
+
+
+def test_nested_columns_round_trip_through_parquet(tmp_path):
+    df = pd.DataFrame(
+        {
+            "gene_id": ["ENSG00000000001", "ENSG00000000002"],
+            # The recessive pipeline holds nested values as JSON strings
+            "metadata": [
+                json.dumps(RECESSIVE_METADATA),
+                json.dumps({**RECESSIVE_METADATA, "alias_symbols": ["GA"]}),
+            ],
+            "variant_calculations": [VARIANT_CALCULATIONS, {}],
+            "top_ten_variants": [[TOP_TEN_VARIANT], []],
+            "genetic_prevalence_orphanet": ["1/10000", float("nan")],
+        }
+    )
+
+    path = tmp_path / "models.parquet"
+    write_dashboard_file(df, path)
+
+    assert pq.read_schema(path).field("metadata").type == METADATA_TYPE
+
+    df_read = read_dashboard_file(path)
+    assert list(df_read.columns) == list(df.columns)
+    assert df_read["metadata"].tolist() == [
+        RECESSIVE_METADATA,
+        {**RECESSIVE_METADATA, "alias_symbols": ["GA"]},
+    ]
+    assert df_read["variant_calculations"].tolist() == [VARIANT_CALCULATIONS, None]
+    # Variants keep their null fields
+    assert df_read["top_ten_variants"].tolist() == [[TOP_TEN_VARIANT], None]
+
+
+def test_dominant_nested_columns_round_trip_through_parquet(tmp_path):
+    metadata = {
+        "gnomad_version": "4.1.1",
+        "reference_genome": "GRCh38",
+        "gene_symbol": "GENEA",
+        "gene_id": "ENSG00000000001.1",
+        "transcript_id": "ENST00000000001.1",
+    }
+    de_novo_variant_calculations = {
+        "missense_de_novo_incidence": 1e-6,
+        "lof_de_novo_incidence": 0.0,
+        "total_de_novo_incidence": 1e-6,
+        "has_insufficient_missense_data": False,
+        "has_insufficient_lof_data": True,
+        "inputs": {
+            "oe_mis": 0.5,
+            "mu_mis": 1e-6,
+            "oe_mis_prior": 0.906,
+            "oe_lof": -1.337,
+            "mu_lof": -1.337,
+            "oe_lof_prior": 0.675,
+        },
+    }
+    df = pd.DataFrame(
+        {
+            "gene_id": ["ENSG00000000001"],
+            "metadata": [json.dumps(metadata)],
+            "de_novo_variant_calculations": [json.dumps(de_novo_variant_calculations)],
+        }
+    )
+
+    path = tmp_path / "dominant-models.parquet"
+    write_dashboard_file(df, path)
+
+    df_read = read_dashboard_file(path)
+    assert df_read["metadata"].tolist() == [metadata]
+    assert df_read["de_novo_variant_calculations"].tolist() == [
+        de_novo_variant_calculations
+    ]
+
+
+def test_writing_fields_missing_from_nested_column_types_fails(tmp_path):
+    df = pd.DataFrame(
+        {
+            "gene_id": ["ENSG00000000001"],
+            "metadata": [{**RECESSIVE_METADATA, "unknown_field": 1}],
+        }
+    )
+
+    with pytest.raises(ValueError, match="unknown_field"):
+        write_dashboard_file(df, tmp_path / "models.parquet")
+
+
+def test_nested_columns_are_written_as_json_to_csv(tmp_path):
+    df = pd.DataFrame(
+        {
+            "gene_id": ["ENSG00000000001"],
+            "metadata": [RECESSIVE_METADATA],
+        }
+    )
+
+    path = tmp_path / "models.csv"
+    write_dashboard_file(df, path)
+
+    assert json.loads(read_dashboard_file(path)["metadata"][0]) == RECESSIVE_METADATA
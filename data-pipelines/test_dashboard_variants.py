@@ -0,0 +1,148 @@
+import pandas as pd
+
+from dashboard_variants import (
+    clear_recommended_variants,
+    format_recommended_variants,
+    get_variants_dataset_path,
+    write_recommended_variants,
+)
+from extract_dashboard_gene_variants import extract_gene_variants
+
+
+def make_variant(variant_id, allele_counts, allele_numbers, **fields):
+    return {
+        "id": variant_id,
+        "major_consequence": "stop_gained",
+        "hgvsc": "c.1A>T",
+        "hgvsp": "p.Met1Leu",
+        "lof": "HC",
+        "clinical_significance": ["Pathogenic"],
+        "clinvar_variation_id": "12345",
+        "AC": allele_counts,
+        "AN": allele_numbers,
+        "homozygote_count": [0] * 8,
+        "flags": ["lcr"],
+        "source": ["gnomAD", "ClinVar"],
+        **fields,
+    }
+
+
+def test_extract_gene_variants(tmp_path):
+    dataset_path = get_variants_dataset_path(str(tmp_path))
+
+    write_recommended_variants(
+        dataset_path,
+        "batch-1",
+        [
+            format_recommended_variants(
+                "GENEA",
+                "ENSG00000000001",
+                "1",
+                [
+                    make_variant("1-100-A-T", [2] * 8, [10, 10, 10, 10, 10, 10, 10, 0]),
+                    make_variant(
+                        "1-200-G-C",
+                        [],
+                        [],
+                        homozygote_count=[],
+                        clinical_significance=[],
+                        flags=[],
+                    ),
+                ],
+            ),
+            format_recommended_variants("GENEB", "ENSG00000000002", "1", []),
+        ],
+    )
+    write_recommended_variants(
+        dataset_path,
+        "batch-2",
+        [
+            format_recommended_variants(
+                "GENEC",
+                "ENSG00000000003",
+                "X",
+                [make_variant("X-300-C-G", [1] * 8, [4] * 8)],
+            ),
+        ],
+    )
+
+    assert sorted(path.name for path in tmp_path.glob("**/*.parquet")) == [
+        "batch-1-0.parquet",
+        "batch-2-0.parquet",
+    ]
+
+    output_dir = tmp_path / "genes"
+    extract_gene_variants(
+        dataset_path, ["GENEA", "ENSG00000000003", "GENEB"], str(output_dir)
+    )
+
+    assert sorted(path.name for path in output_dir.iterdir()) == [
+        "GeniE_dashboard_variants-GENEA-ENSG00000000001.csv",
+        "GeniE_dashboard_variants-GENEC-ENSG00000000003.csv",
+    ]
+
+    df = pd.read_csv(output_dir / "GeniE_dashboard_variants-GENEA-ENSG00000000001.csv")
+    assert list(df.columns) == [
+        "gene_symbol",
+        "gene_id",
+        "variant_gnomad_id",
+        "vep_consequence",
+        "hgvsc",
+        "hgvsp",
+        "loftee",
+        "clinvar_clinical_significance",
+        "clinvar_variation_id",
+        "allele_count",
+        "allele_number",
+        "allele_frequency",
+        "homozygote_count",
+        "flags",
+        "source",
+        "allele_count_per_ancestry",
+        "allele_number_per_ancestry",
+        "allele_frequency_per_ancestry",
+        "homozygote_count_per_ancestry",
+    ]
+    assert df["variant_gnomad_id"].tolist() == ["1-100-A-T", "1-200-G-C"]
+    assert df["allele_frequency"].tolist()[0] == 0.2
+    assert df["source"].tolist() == ["gnomAD|ClinVar", "gnomAD|ClinVar"]
+    assert df["allele_frequency_per_ancestry"][0] == str(
+        {
+            "allele_frequency_global": 0.2,
+            "allele_frequency_african_african_american": 0.2,
+            "allele_frequency_admixed_american": 0.2,
+            "allele_frequency_ashkenazi_jewish": 0.2,
+            "allele_frequency_east_asian": 0.2,
+            "allele_frequency_european_finnish": 0.2,
+            "allele_frequency_remaining": 0.2,
+            "allele_frequency_south_asian": None,
+        }
+    )
+    assert pd.isna(df["allele_count_per_ancestry"][1])
+    assert pd.isna(df["clinvar_clinical_significance"][1])
+
+
+def test_runs_replace_variants_dataset(tmp_path):
+    dataset_path = get_variants_dataset_path(str(tmp_path))
+    test_dataset_path = get_variants_dataset_path(str(tmp_path), test=True)
+    assert test_dataset_path != dataset_path
+
+    variants = [make_variant("1-100-A-T", [2] * 8, [10] * 8)]
+    write_recommended_variants(
+        dataset_path,
+        "batch-1",
+        [format_recommended_variants("GENEA", "ENSG00000000001", "1", variants)],
+    )
+
+    # A later run puts the gene in a different batch
+    clear_recommended_variants(dataset_path)
+    write_recommended_variants(
+        dataset_path,
+        "batch-2",
+        [format_recommended_variants("GENEA", "ENSG00000000001", "1", variants)],
+    )
+
+    output_dir = tmp_path / "genes"
+    extract_gene_variants(dataset_path, ["GENEA"], str(output_dir))
+    df = pd.read_csv(output_dir / "GeniE_dashboard_variants-GENEA-ENSG00000000001.csv")
+    assert df["variant_gnomad_id"].tolist() == ["1-100-A-T"]
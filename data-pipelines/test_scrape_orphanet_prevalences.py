@@ -0,0 +1,165 @@
+import collections
+import http.server
+import threading
+
+import pytest
+
+from scrape_orphanet_prevalences import (
+    parse_orphanet_xml,
+    scrape_orphanet_for_genetic_prevalences,
+)
+
+
+ORPHANET_XML = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<JDBOR>
+  <DisorderList count="2">
+    <Disorder id="1">
+      <OrphaCode>586</OrphaCode>
+      <DisorderGeneAssociationList>
+        <DisorderGeneAssociation>
+          <Gene id="1">
+            <Symbol>CFTR</Symbol>
+            <ExternalReferenceList>
+              <ExternalReference>
+                <Source>HGNC</Source>
+                <Reference>1884</Reference>
+              </ExternalReference>
+              <ExternalReference>
+                <Source>Ensembl</Source>
+                <Reference>ENSG00000001626</Reference>
+              </ExternalReference>
+            </ExternalReferenceList>
+          </Gene>
+        </DisorderGeneAssociation>
+      </DisorderGeneAssociationList>
+    </Disorder>
+    <Disorder id="2">
+      <OrphaCode>1234</OrphaCode>
+      <DisorderGeneAssociationList>
+        <DisorderGeneAssociation>
+          <Gene id="2"><Symbol>GENEA</Symbol></Gene>
+        </DisorderGeneAssociation>
+        <DisorderGeneAssociation>
+          <Gene id="1"><Symbol>CFTR</Symbol></Gene>
+        </DisorderGeneAssociation>
+      </DisorderGeneAssociationList>
+    </Disorder>
+  </DisorderList>
+</JDBOR>
+"""
+
+PAGE = """
+<html><body>
+  <div><strong>Prevalence</strong>: <span>{prevalence}</span></div>
+</body></html>
+"""
+
+PREVALENCES = {"586": "1-9 / 100 000", "1234": "<1 / 1 000 000"}
+
+
+class OrphanetStubHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):  # pylint: disable=invalid-name
+        orpha_code = self.path.split("/")[-1]
+        self.server.requests[orpha_code] += 1
+
+        # Fail the first request for each page to exercise retries
+        if self.server.requests[orpha_code] == 1:
+            self.send_response(503)
+            self.end_headers()
+            return
+
+        if orpha_code not in PREVALENCES:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.end_headers()
+        self.wfile.write(
+            PAGE.format(prevalence=PREVALENCES[orpha_code]).encode("utf-8")
+        )
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture(name="orphanet_server")
+def fixture_orphanet_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), OrphanetStubHandler)
+    server.requests = collections.Counter()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_orphanet_xml(tmp_path):
+    xml_path = tmp_path / "orphanet.xml"
+    xml_path.write_text(ORPHANET_XML, encoding="latin-1")
+
+    assert parse_orphanet_xml(["GENEA", "CFTR", "GENEB"], str(xml_path)) == {
+        "GENEA": {"OrphaCodes": ["1234"], "ENSG_ID": ""},
+        # The Ensembl ID is taken from the gene's last disorder
+        "CFTR": {"OrphaCodes": ["586", "1234"], "ENSG_ID": ""},
+    }
+
+
+def get_genes():
+    return {
+        "CFTR": {"OrphaCodes": ["586"], "ENSG_ID": "ENSG00000001626"},
+        "GENEA": {"OrphaCodes": ["586", "1234", "9999"], "ENSG_ID": ""},
+    }
+
+
+def test_scrape_orphanet_for_genetic_prevalences(orphanet_server, tmp_path):
+    url = f"http://127.0.0.1:{orphanet_server.server_port}/{{orpha_code}}"
+
+    result = scrape_orphanet_for_genetic_prevalences(
+        get_genes(),
+        max_workers=2,
+        requests_per_second=100,
+        cache_dir=str(tmp_path / "cache"),
+        checkpoint_path=str(tmp_path / "checkpoint.jsonl"),
+        url=url,
+    )
+
+    assert result["CFTR"]["OrphaPrevalence"] == ["586:1-9 / 100 000"]
+    assert result["GENEA"]["OrphaPrevalence"] == [
+        "586:1-9 / 100 000",
+        "1234:<1 / 1 000 000",
+        "9999:",
+    ]
+    # Each OrphaCode is fetched once, after one retry
+    assert orphanet_server.requests == {"586": 2, "1234": 2, "9999": 2}
+
+    # Scraped OrphaCodes are read from the checkpoint
+    result = scrape_orphanet_for_genetic_prevalences(
+        get_genes(),
+        requests_per_second=100,
+        cache_dir=str(tmp_path / "cache"),
+        checkpoint_path=str(tmp_path / "checkpoint.jsonl"),
+        url=url,
+    )
+    assert result["GENEA"]["OrphaPrevalence"][1] == "1234:<1 / 1 000 000"
+    assert orphanet_server.requests == {"586": 2, "1234": 2, "9999": 2}
+
+    # Checkpoint entries expire with the cache
+    scrape_orphanet_for_genetic_prevalences(
+        get_genes(),
+        requests_per_second=100,
+        cache_ttl=0,
+        checkpoint_path=str(tmp_path / "checkpoint.jsonl"),
+        url=url,
+    )
+    assert orphanet_server.requests == {"586": 3, "1234": 3, "9999": 3}
+
+    # Cached pages are used without a checkpoint
+    scrape_orphanet_for_genetic_prevalences(
+        get_genes(),
+        requests_per_second=100,
+        cache_dir=str(tmp_path / "cache"),
+        url=url,
+    )
+    assert orphanet_server.requests == {"586": 3, "1234": 3, "9999": 4}
@@ -7,9 +7,12 @@ import {
   Breadcrumb,
   BreadcrumbItem,
   BreadcrumbLink,
+  Button,
   Center,
+  Flex,
   Heading,
   Link,
+  Select,
   Spinner,
   Stat,
   StatGroup,
@@ -18,6 +21,7 @@ import {
   Table,
   Tbody,
   Td,
+  Text,
   Th,
   Thead,
   Tr,
@@ -30,19 +34,75 @@ import { VariantListStatus } from "../../types";
 
 import DocumentTitle from "../DocumentTitle";
 
+interface ErrorGroup {
+  signature: string;
+  count: number;
+  variant_lists: { uuid: string; label: string }[];
+}
+
+type LatencyWindow = "1d" | "7d" | "30d";
+
+interface LatencyPercentiles {
+  p50: number;
+  p90: number;
+  p99: number;
+}
+
+interface GnomadVersionLatency {
+  num_variant_lists: number;
+  num_retried: number;
+  num_sampled: number;
+  queue_wait: LatencyPercentiles | null;
+  processing_time: LatencyPercentiles | null;
+}
+
 interface SystemStatus {
   variant_lists: {
     [key in VariantListStatus]: number;
   };
-  error_details: any;
+  latency: {
+    window: LatencyWindow;
+    sample_size: number;
+    by_gnomad_version: { [gnomadVersion: string]: GnomadVersionLatency };
+  };
+  errors: {
+    count: number;
+    page: number;
+    num_pages: number;
+    results: ErrorGroup[];
+  };
 }
 
+const formatDuration = (seconds: number) => {
+  if (seconds < 60) {
+    return `${Math.round(seconds)} s`;
+  }
+  if (seconds < 60 * 60) {
+    return `${(seconds / 60).toFixed(1)} min`;
+  }
+  return `${(seconds / (60 * 60)).toFixed(1)} h`;
+};
+
+const formatPercentiles = (percentiles: LatencyPercentiles | null) => {
+  if (!percentiles) {
+    return "-";
+  }
+  return [percentiles.p50, percentiles.p90, percentiles.p99]
+    .map(formatDuration)
+    .join(" / ");
+};
+
 interface SystemStatusViewProps {
   systemStatus: SystemStatus;
+  onChangeLatencyWindow: (latencyWindow: LatencyWindow) => void;
+  onChangeErrorsPage: (errorsPage: number) => void;
 }
 
 const SystemStatusView = (props: SystemStatusViewProps) => {
-  const { systemStatus } = props;
+  const { systemStatus, onChangeLatencyWindow, onChangeErrorsPage } = props;
+  const latencyByGnomadVersion = Object.entries(
+    systemStatus.latency.by_gnomad_version
+  );
 
   return (
     <>
@@ -61,30 +121,127 @@ const SystemStatusView = (props: SystemStatusViewProps) => {
           }
         )}
       </StatGroup>
+      <Box mt={12}>
+        <Flex alignItems="center" justifyContent="space-between">
+          <h1>Latency</h1>
+          <Text as="label" htmlFor="latency-window" whiteSpace="nowrap">
+            Lists finished in the last{" "}
+            <Select
+              id="latency-window"
+              value={systemStatus.latency.window}
+              onChange={(e) => {
+                onChangeLatencyWindow(e.target.value as LatencyWindow);
+              }}
+              display="inline-block"
+              width={120}
+            >
+              <option value="1d">day</option>
+              <option value="7d">7 days</option>
+              <option value="30d">30 days</option>
+            </Select>
+          </Text>
+        </Flex>
+        {latencyByGnomadVersion.length > 0 ? (
+          <>
+            <Table variant="striped" mt={8}>
+              <Thead>
+                <Tr>
+                  <Th scope="col">gnomAD version</Th>
+                  <Th scope="col" isNumeric>
+                    Lists
+                  </Th>
+                  <Th scope="col" isNumeric>
+                    Retried
+                  </Th>
+                  <Th scope="col">Queue wait (p50 / p90 / p99)</Th>
+                  <Th scope="col">Processing time (p50 / p90 / p99)</Th>
+                </Tr>
+              </Thead>
+              <Tbody>
+                {latencyByGnomadVersion.map(([gnomadVersion, latency]) => {
+                  return (
+                    <Tr key={gnomadVersion}>
+                      <Td>{gnomadVersion}</Td>
+                      <Td isNumeric>
+                        {latency.num_variant_lists.toLocaleString()}
+                      </Td>
+                      <Td isNumeric>{latency.num_retried.toLocaleString()}</Td>
+                      <Td>{formatPercentiles(latency.queue_wait)}</Td>
+                      <Td>{formatPercentiles(latency.processing_time)}</Td>
+                    </Tr>
+                  );
+                })}
+              </Tbody>
+            </Table>
+            <Text fontSize="sm" mt={2}>
+              Percentiles are computed from the{" "}
+              {systemStatus.latency.sample_size.toLocaleString()} most recently
+              finished lists.
+            </Text>
+          </>
+        ) : (
+          <Text mt={4}>No lists finished processing in this period.</Text>
+        )}
+      </Box>
       <Box mt={12}>
         <h1>Summary of errors</h1>
         <Table variant="striped" mt={8}>
           <Thead>
             <Tr>
-              <Th scope="col">List label</Th>
               <Th scope="col">Error</Th>
+              <Th scope="col" isNumeric>
+                Lists
+              </Th>
+              <Th scope="col">Recent lists</Th>
             </Tr>
           </Thead>
           <Tbody>
-            {systemStatus.error_details.map((list: any) => {
+            {systemStatus.errors.results.map((errorGroup) => {
               return (
-                <Tr key={list.uuid}>
+                <Tr key={errorGroup.signature}>
+                  <Td>{errorGroup.signature || "no error"}</Td>
+                  <Td isNumeric>{errorGroup.count.toLocaleString()}</Td>
                   <Td>
-                    <Link as={RRLink} to={`/variant-lists/${list.uuid}`}>
-                      {list.label}
-                    </Link>
+                    {errorGroup.variant_lists.map((list) => (
+                      <Box key={list.uuid}>
+                        <Link as={RRLink} to={`/variant-lists/${list.uuid}`}>
+                          {list.label}
+                        </Link>
+                      </Box>
+                    ))}
                   </Td>
-                  <Td>{list.error || "no error"}</Td>
                 </Tr>
               );
             })}
           </Tbody>
         </Table>
+        {systemStatus.errors.num_pages > 1 && (
+          <Flex alignItems="center" justifyContent="flex-end" mt={4}>
+            <Button
+              size="sm"
+              isDisabled={systemStatus.errors.page <= 1}
+              onClick={() => {
+                onChangeErrorsPage(systemStatus.errors.page - 1);
+              }}
+            >
+              Previous
+            </Button>
+            <Text mx={4}>
+              Page {systemStatus.errors.page} of {systemStatus.errors.num_pages}
+            </Text>
+            <Button
+              size="sm"
+              isDisabled={
+                systemStatus.errors.page >= systemStatus.errors.num_pages
+              }
+              onClick={() => {
+                onChangeErrorsPage(systemStatus.errors.page + 1);
+              }}
+            >
+              Next
+            </Button>
+          </Flex>
+        )}
       </Box>
     </>
   );
@@ -92,18 +249,20 @@ const SystemStatusView = (props: SystemStatusViewProps) => {
 
 const SystemStatusContainer = () => {
   const [systemStatus, setSystemStatus] = useState<SystemStatus | null>(null);
+  const [latencyWindow, setLatencyWindow] = useState<LatencyWindow>("7d");
+  const [errorsPage, setErrorsPage] = useState(1);
 
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState<Error | null>(null);
 
   useEffect(() => {
     setIsLoading(true);
-    get("/status/")
+    get("/status/", { window: latencyWindow, errors_page: errorsPage })
       .then(setSystemStatus, setError)
       .finally(() => {
         setIsLoading(false);
       });
-  }, []);
+  }, [latencyWindow, errorsPage]);
 
   if (isLoading) {
     return (
@@ -123,7 +282,13 @@ const SystemStatusContainer = () => {
     );
   }
 
-  return <SystemStatusView systemStatus={systemStatus!} />;
+  return (
+    <SystemStatusView
+      systemStatus={systemStatus!}
+      onChangeLatencyWindow={setLatencyWindow}
+      onChangeErrorsPage={setErrorsPage}
+    />
+  );
 };
 
 const SystemStatusPage = () => {
@@ -33,3 +33,7 @@ resource "google_project_service" "pubsub" {
 resource "google_project_service" "dataproc" {
   service = "dataproc.googleapis.com"
 }
+
+resource "google_project_service" "cloud_scheduler" {
+  service = "cloudscheduler.googleapis.com"
+}
@@ -72,3 +72,64 @@ resource "google_pubsub_subscription" "worker_requests_subscription" {
     ttl = ""
   }
 }
+
+# Large and bulk jobs are published to their own topics. The worker defers
+#   messages for a lane at its concurrency limit, so these subscriptions allow
+#   more delivery attempts before a message is dead lettered.
+#
+# All lanes are pushed to the same worker service, which runs one job at a time
+#   on at most one instance. Lanes then only set the order in which deferred
+#   jobs are retried; they do not keep large and bulk jobs from delaying
+#   interactive ones. Isolating lanes requires a worker service per lane, or
+#   the pull mode of the job queue (JOB_QUEUE_MODE = "pull"), where workers
+#   claim jobs in lane priority order.
+locals {
+  worker_request_lanes = ["large", "bulk"]
+}
+
+resource "google_pubsub_topic" "worker_requests_lane" {
+  for_each   = toset(local.worker_request_lanes)
+  name       = "worker-requests-${each.key}"
+  depends_on = [google_project_service.pubsub]
+}
+
+resource "google_pubsub_subscription_iam_member" "pubsub_service_agent_worker_requests_lane_subscriber" {
+  for_each     = toset(local.worker_request_lanes)
+  subscription = google_pubsub_subscription.worker_requests_lane_subscription[each.key].name
+  role         = "roles/pubsub.subscriber"
+  member       = "serviceAccount:service-${data.google_project.project.number}@gcp-sa-pubsub.iam.gserviceaccount.com"
+}
+
+resource "google_pubsub_subscription" "worker_requests_lane_subscription" {
+  for_each = toset(local.worker_request_lanes)
+  name     = "worker-requests-${each.key}-subscription"
+  topic    = google_pubsub_topic.worker_requests_lane[each.key].name
+
+  ack_deadline_seconds = 600
+
+  push_config {
+    push_endpoint = google_cloud_run_service.worker.status[0].url
+
+    oidc_token {
+      service_account_email = google_service_account.worker_pubsub_subscription.email
+    }
+
+    attributes = {
+      x-goog-version = "v1"
+    }
+  }
+
+  retry_policy {
+    minimum_backoff = "60s"
+    maximum_backoff = "600s"
+  }
+
+  dead_letter_policy {
+    dead_letter_topic     = google_pubsub_topic.failed_worker_requests.id
+    max_delivery_attempts = 100
+  }
+
+  expiration_policy {
+    ttl = ""
+  }
+}
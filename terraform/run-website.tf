@@ -27,6 +27,13 @@ resource "google_pubsub_topic_iam_member" "website_worker_requests_publisher" {
   member = "serviceAccount:${google_service_account.website.email}"
 }
 
+resource "google_pubsub_topic_iam_member" "website_worker_requests_lane_publisher" {
+  for_each = google_pubsub_topic.worker_requests_lane
+  topic    = each.value.name
+  role     = "roles/pubsub.publisher"
+  member   = "serviceAccount:${google_service_account.website.email}"
+}
+
 resource "google_cloud_run_service" "website" {
   name     = "website"
   location = var.gcp_region
@@ -128,6 +135,16 @@ resource "google_cloud_run_service" "website" {
           name  = "MAX_VARIANT_LISTS_PER_USER"
           value = "100"
         }
+
+        env {
+          name  = "SCHEDULER_SERVICE_ACCOUNT"
+          value = google_service_account.scheduler.email
+        }
+
+        env {
+          name  = "SCHEDULER_AUDIENCE"
+          value = "https://${var.domain}"
+        }
       }
     }
 
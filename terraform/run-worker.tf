@@ -123,6 +123,26 @@ resource "google_cloud_run_service" "worker" {
           value = "127.0.0.1"
         }
 
+        # The container is recycled after each job, so every job pays for the
+        # warm-up. Only the default gnomAD version is warmed up, so that jobs for
+        # it start warm without waiting on versions they do not use.
+        env {
+          name  = "WORKER_WARMUP_GNOMAD_VERSIONS"
+          value = "4.1.0"
+        }
+
+        # Requests are only routed to the worker once it has warmed up
+        startup_probe {
+          initial_delay_seconds = 10
+          period_seconds        = 10
+          timeout_seconds       = 5
+          failure_threshold     = 30
+
+          http_get {
+            path = "/ready/"
+          }
+        }
+
         resources {
           limits = {
             cpu    = "1"
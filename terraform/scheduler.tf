@@ -0,0 +1,59 @@
+resource "google_service_account" "scheduler" {
+  account_id  = "scheduler"
+  description = "Used by Cloud Scheduler to request scheduled tasks from the website"
+}
+
+// Messages for the worker are published when the request that writes them finishes.
+// This publishes messages that failed to publish then or that were written by
+// other processes, such as the worker and management commands.
+resource "google_cloud_scheduler_job" "dispatch_outbox" {
+  name             = "dispatch-outbox"
+  description      = "Publish messages left in the outbox"
+  schedule         = "* * * * *"
+  attempt_deadline = "120s"
+
+  depends_on = [
+    google_project_service.cloud_scheduler,
+  ]
+
+  retry_config {
+    retry_count = 0
+  }
+
+  http_target {
+    http_method = "POST"
+    uri         = "https://${var.domain}/api/tasks/dispatch-outbox/"
+
+    oidc_token {
+      service_account_email = google_service_account.scheduler.email
+      audience              = "https://${var.domain}"
+    }
+  }
+}
+
+// Workers renew the lease of the list they are processing while they run.
+// This requeues lists whose lease expired because their worker stopped.
+resource "google_cloud_scheduler_job" "requeue_stuck_variant_lists" {
+  name             = "requeue-stuck-variant-lists"
+  description      = "Requeue variant lists whose worker stopped while processing them"
+  schedule         = "*/5 * * * *"
+  attempt_deadline = "120s"
+
+  depends_on = [
+    google_project_service.cloud_scheduler,
+  ]
+
+  retry_config {
+    retry_count = 0
+  }
+
+  http_target {
+    http_method = "POST"
+    uri         = "https://${var.domain}/api/tasks/requeue-stuck-variant-lists/"
+
+    oidc_token {
+      service_account_email = google_service_account.scheduler.email
+      audience              = "https://${var.domain}"
+    }
+  }
+}
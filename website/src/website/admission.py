@@ -0,0 +1,170 @@
+"""
+Admission control for variant list processing.
+
+Tracks the backlog of variant lists waiting to be processed and how long recent
+jobs in each lane took. These are used to estimate when a job will complete and
+to reject new work with a 429 response while a user, or the site as a whole, has
+too large a backlog.
+"""
+
+import math
+from datetime import timedelta
+from statistics import median
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+
+from calculator.models import VariantList
+
+
+BACKLOG_STATUSES = (VariantList.Status.QUEUED, VariantList.Status.PROCESSING)
+
+# Used for lanes without any recently finished jobs
+DEFAULT_JOB_DURATIONS = {
+    VariantList.Lane.INTERACTIVE: timedelta(minutes=1),
+    VariantList.Lane.LARGE: timedelta(minutes=10),
+    VariantList.Lane.BULK: timedelta(minutes=10),
+}
+
+NUM_RECENT_JOBS = 50
+
+JOB_DURATIONS_CACHE_KEY = "job_durations"
+
+JOB_DURATIONS_CACHE_TIMEOUT_IN_SECONDS = 5 * 60
+
+
+def get_job_durations():
+    """Return the median duration of recently finished jobs in each lane."""
+    durations = cache.get(JOB_DURATIONS_CACHE_KEY)
+
+    if durations is None:
+        durations = {}
+        for lane in VariantList.Lane:
+            recent_jobs = (
+                VariantList.objects.filter(
+                    lane=lane, started_at__isnull=False, finished_at__isnull=False
+                )
+                .order_by("-finished_at")
+                .values_list("started_at", "finished_at")[:NUM_RECENT_JOBS]
+            )
+            if recent_jobs:
+                durations[lane.value] = median(
+                    finished_at - started_at for started_at, finished_at in recent_jobs
+                )
+
+        cache.set(
+            JOB_DURATIONS_CACHE_KEY, durations, JOB_DURATIONS_CACHE_TIMEOUT_IN_SECONDS
+        )
+
+    return {
+        lane: durations.get(lane.value, DEFAULT_JOB_DURATIONS[lane])
+        for lane in VariantList.Lane
+    }
+
+
+def get_backlog(variant_lists=None):
+    """
+    Return the number of variant lists queued or processing in each lane.
+
+    Lists whose worker stopped sending heartbeats are not counted, as they are
+    not being processed and will be requeued or marked as errored.
+    """
+    if variant_lists is None:
+        variant_lists = VariantList.objects.all()
+
+    backlog = {lane: 0 for lane in VariantList.Lane}
+    backlog.update(
+        (VariantList.Lane(lane), count)
+        for lane, count in variant_lists.filter(status__in=BACKLOG_STATUSES)
+        .exclude(
+            status=VariantList.Status.PROCESSING, lease_expires_at__lt=timezone.now()
+        )
+        .values("lane")
+        .annotate(count=Count("id"))
+        .values_list("lane", "count")
+    )
+    return backlog
+
+
+def estimate_processing_time(backlog, durations):
+    return (
+        sum((durations[lane] * count for lane, count in backlog.items()), timedelta())
+        / settings.WORKER_CONCURRENCY
+    )
+
+
+def estimate_completion_time(variant_list):
+    """
+    Estimate when a queued variant list will finish processing, from the jobs
+    that will be processed before it.
+    """
+    durations = get_job_durations()
+
+    # Jobs in higher priority lanes, jobs in progress in the list's lane, and
+    #   jobs queued before it in its lane
+    lanes_ahead = []
+    for lane in VariantList.Lane:
+        if lane == variant_list.lane:
+            break
+        lanes_ahead.append(lane)
+
+    jobs_ahead = VariantList.objects.exclude(id=variant_list.id).filter(
+        Q(lane__in=lanes_ahead)
+        | Q(lane=variant_list.lane, status=VariantList.Status.PROCESSING)
+        | Q(lane=variant_list.lane, updated_at__lte=variant_list.updated_at)
+    )
+
+    return (
+        timezone.now()
+        + estimate_processing_time(get_backlog(jobs_ahead), durations)
+        + durations[variant_list.lane]
+    )
+
+
+def get_retry_after(backlog, durations, limit):
+    """
+    Return the estimated number of seconds until enough of the backlog has been
+    processed to fall under the limit.
+
+    Returns None if there is no backlog to wait for, as when the limit is zero.
+    """
+    num_jobs = sum(backlog.values())
+    if num_jobs == 0:
+        return None
+
+    processing_time = estimate_processing_time(backlog, durations)
+    wait = processing_time * (num_jobs - limit + 1) / num_jobs
+    return max(math.ceil(wait.total_seconds()), 1)
+
+
+def check_admission(user):
+    """
+    Raise Throttled if the user or the site has too large a processing backlog.
+
+    Jobs in the bulk lane, such as reprocessing after a data release, are not
+    counted. They are processed after other jobs and so do not delay them.
+    """
+    durations = get_job_durations()
+    variant_lists = VariantList.objects.exclude(lane=VariantList.Lane.BULK)
+
+    if not user.is_staff:
+        user_backlog = get_backlog(variant_lists.filter(created_by=user))
+        if sum(user_backlog.values()) >= settings.MAX_QUEUED_VARIANT_LISTS_PER_USER:
+            raise Throttled(
+                wait=get_retry_after(
+                    user_backlog,
+                    durations,
+                    settings.MAX_QUEUED_VARIANT_LISTS_PER_USER,
+                ),
+                detail="You have too many variant lists waiting to be processed.",
+            )
+
+    backlog = get_backlog(variant_lists)
+    if sum(backlog.values()) >= settings.MAX_QUEUED_VARIANT_LISTS:
+        raise Throttled(
+            wait=get_retry_after(backlog, durations, settings.MAX_QUEUED_VARIANT_LISTS),
+            detail="Too many variant lists are waiting to be processed.",
+        )
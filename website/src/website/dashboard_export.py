@@ -0,0 +1,373 @@
+"""
+Bulk export of dashboard lists in the format of the pipeline's dashboard downloads.
+
+Rows are read from the database in chunks and encoded as they are produced, so
+memory use does not depend on the number of dashboard lists. Each completed
+export is also written to disk and reused until dashboard data changes.
+"""
+
+import csv
+import fcntl
+import io
+import os
+import uuid
+from contextlib import contextmanager
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+
+from calculator.models import DashboardList
+from website.dashboard_snapshot import get_dashboard_data_version
+
+
+CHUNK_SIZE = 500
+
+ANCESTRY_GROUPS = [
+    "total",
+    "african_african_american",
+    "admixed_american",
+    "ashkenazi_jewish",
+    "east_asian",
+    "european_finnish",
+    "middle_eastern",
+    "european_non_finnish",
+    "remaining",
+    "south_asian",
+]
+
+# (name in variant_calculations, column name in the download)
+ANCESTRY_STRATIFIED_FIELDS = [
+    ("total_allele_frequency", "allele_frequency"),
+    ("carrier_frequency", "carrier_frequency"),
+    ("prevalence", "genetic_prevalence"),
+]
+
+# (name in de_novo_variant_calculations inputs, column name in the download)
+DOMINANT_INPUT_FIELDS = [
+    ("oe_mis_prior", "oe_missense_prior"),
+    ("oe_mis", "oe_missense_gene"),
+    ("mu_mis", "MU_mis"),
+    ("oe_lof_prior", "oe_lof_prior"),
+    ("oe_lof", "oe_lof_gene"),
+    ("mu_lof", "MU_lof"),
+]
+
+DE_NOVO_INCIDENCE_COLUMN = "Estimated incidence of de novo variation"
+DE_NOVO_INCIDENCE_PER_100K_COLUMN = (
+    "Estimated incidence of de novo variation (per 100,000)"
+)
+VARIANT_COUNT_COLUMN = "# of P, LP and HC pLoF variants in gnomAD"
+
+TOP_TEN_VARIANT_FIELDS = [
+    "gnomad_id",
+    "vep_consequence",
+    "hgvsc",
+    "hgvsp",
+    "loftee",
+    "clinvar_clinical_significance",
+    "clinvar_variation_id",
+    "allele_count",
+    "allele_number",
+    "allele_frequency",
+    "source",
+    "flags",
+]
+
+INHERITANCE_TYPES = {
+    "AD": "Autosomal dominant",
+    "AR": "Autosomal recessive",
+    "SD": "Semidominant",
+}
+
+# Same columns, in the same order, as prepare_dashboard_download in
+#   data-pipelines/generate_recessive_dashboard_lists.py
+EXPORT_COLUMNS = [
+    "gene_id",
+    "gene_symbol",
+    "transcript_id",
+    "inheritance_type",
+    "gnomad_version",
+    "reference_genome",
+    "included_clinvar_variants",
+    "clinvar_version",
+    "date_created",
+    *(column for _, column in DOMINANT_INPUT_FIELDS),
+    DE_NOVO_INCIDENCE_COLUMN,
+    DE_NOVO_INCIDENCE_PER_100K_COLUMN,
+    VARIANT_COUNT_COLUMN,
+    *(
+        f"{column}_{ancestry}"
+        for _, column in ANCESTRY_STRATIFIED_FIELDS
+        for ancestry in ANCESTRY_GROUPS
+    ),
+    *(
+        f"variant_{i + 1}_{field}"
+        for i in range(10)
+        for field in TOP_TEN_VARIANT_FIELDS
+    ),
+]
+
+FLOAT_COLUMNS = {
+    *(column for _, column in DOMINANT_INPUT_FIELDS),
+    DE_NOVO_INCIDENCE_COLUMN,
+    DE_NOVO_INCIDENCE_PER_100K_COLUMN,
+    *(
+        f"{column}_{ancestry}"
+        for _, column in ANCESTRY_STRATIFIED_FIELDS
+        for ancestry in ANCESTRY_GROUPS
+    ),
+    *(f"variant_{i + 1}_allele_frequency" for i in range(10)),
+}
+
+INTEGER_COLUMNS = {
+    VARIANT_COUNT_COLUMN,
+    *(f"variant_{i + 1}_allele_count" for i in range(10)),
+    *(f"variant_{i + 1}_allele_number" for i in range(10)),
+}
+
+
+def expand_inheritance_type(inheritance_type):
+    return ", ".join(
+        INHERITANCE_TYPES.get(abbreviation.strip(), "")
+        for abbreviation in inheritance_type.split(",")
+    )
+
+
+def get_top_ten_variant_columns(top_ten_variants):
+    row = {}
+
+    for i, variant in enumerate(top_ten_variants[:10]):
+        prefix = f"variant_{i + 1}"
+        allele_count = variant["AC"][0]
+        allele_number = variant["AN"][0]
+
+        row.update(
+            {
+                f"{prefix}_gnomad_id": variant["id"],
+                f"{prefix}_vep_consequence": variant["major_consequence"],
+                f"{prefix}_hgvsc": variant["hgvsc"],
+                f"{prefix}_hgvsp": variant["hgvsp"],
+                f"{prefix}_loftee": variant["lof"],
+                f"{prefix}_clinvar_clinical_significance": (
+                    variant["clinical_significance"][0]
+                    if variant["clinical_significance"]
+                    else None
+                ),
+                f"{prefix}_clinvar_variation_id": variant["clinvar_variation_id"],
+                f"{prefix}_allele_count": int(allele_count),
+                f"{prefix}_allele_number": int(allele_number),
+                f"{prefix}_allele_frequency": (
+                    0 if allele_count == 0 else f"{allele_count / allele_number:.2e}"
+                ),
+                f"{prefix}_source": ", ".join(variant["source"]),
+                f"{prefix}_flags": ", ".join(variant["flags"]),
+            }
+        )
+
+    return row
+
+
+def get_export_row(dashboard_list):
+    metadata = dashboard_list.metadata or {}
+    calculations = dashboard_list.variant_calculations or {}
+
+    row = {
+        "gene_id": dashboard_list.gene_id,
+        "gene_symbol": metadata.get("gene_symbol"),
+        "transcript_id": metadata.get("transcript_id"),
+        "inheritance_type": expand_inheritance_type(dashboard_list.inheritance_type),
+        "gnomad_version": metadata.get("gnomad_version"),
+        "reference_genome": metadata.get("reference_genome"),
+        "included_clinvar_variants": ", ".join(
+            metadata.get("include_clinvar_clinical_significance", [])
+        ),
+        "clinvar_version": metadata.get("clinvar_version", ""),
+        "date_created": dashboard_list.created_at.isoformat(),
+        VARIANT_COUNT_COLUMN: calculations.get("variant_count"),
+    }
+
+    for calculations_name, column in ANCESTRY_STRATIFIED_FIELDS:
+        values = calculations.get(calculations_name) or [0] * len(ANCESTRY_GROUPS)
+        for ancestry, value in zip(ANCESTRY_GROUPS, values):
+            row[f"{column}_{ancestry}"] = value
+
+    if dashboard_list.dominant_dashboard_list:
+        de_novo_calculations = (
+            dashboard_list.dominant_dashboard_list.de_novo_variant_calculations or {}
+        )
+        inputs = de_novo_calculations.get("inputs", {})
+        for input_name, column in DOMINANT_INPUT_FIELDS:
+            row[column] = inputs.get(input_name)
+
+        total_de_novo_incidence = de_novo_calculations.get("total_de_novo_incidence")
+        row[DE_NOVO_INCIDENCE_COLUMN] = total_de_novo_incidence
+        if total_de_novo_incidence is not None:
+            row[DE_NOVO_INCIDENCE_PER_100K_COLUMN] = total_de_novo_incidence * 100_000
+
+    row.update(get_top_ten_variant_columns(dashboard_list.top_ten_variants or []))
+
+    return row
+
+
+def iter_export_rows():
+    dashboard_lists = (
+        DashboardList.objects.select_related("dominant_dashboard_list")
+        .only(
+            "gene_id",
+            "created_at",
+            "metadata",
+            "variant_calculations",
+            "inheritance_type",
+            "top_ten_variants",
+            "dominant_dashboard_list__de_novo_variant_calculations",
+        )
+        .order_by("gene_id")
+    )
+
+    for dashboard_list in dashboard_lists.iterator(chunk_size=CHUNK_SIZE):
+        yield get_export_row(dashboard_list)
+
+
+class Echo:
+    """A file-like object that returns what is written to it instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv_export():
+    writer = csv.DictWriter(Echo(), fieldnames=EXPORT_COLUMNS, restval="")
+
+    yield writer.writeheader()
+    for row in iter_export_rows():
+        yield writer.writerow(row)
+
+
+def get_parquet_schema():
+    def get_column_type(column):
+        if column in FLOAT_COLUMNS:
+            return pa.float64()
+        if column in INTEGER_COLUMNS:
+            return pa.int64()
+        return pa.string()
+
+    return pa.schema([(column, get_column_type(column)) for column in EXPORT_COLUMNS])
+
+
+def get_parquet_value(column, value):
+    if value is None or value == "":
+        return None
+    if column in FLOAT_COLUMNS:
+        return float(value)
+    if column in INTEGER_COLUMNS:
+        return int(value)
+    return str(value)
+
+
+def iter_parquet_export():
+    schema = get_parquet_schema()
+    buffer = io.BytesIO()
+
+    def drain_buffer():
+        content = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return content
+
+    with pq.ParquetWriter(buffer, schema, compression="zstd") as writer:
+        rows = []
+        for row in iter_export_rows():
+            rows.append(
+                {
+                    column: get_parquet_value(column, row.get(column))
+                    for column in EXPORT_COLUMNS
+                }
+            )
+
+            # write one row group per chunk of dashboard lists
+            if len(rows) == CHUNK_SIZE:
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                rows = []
+                yield drain_buffer()
+
+        if rows:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+
+    yield drain_buffer()
+
+
+EXPORT_FORMATS = {
+    "csv": {
+        "content_type": "text/csv",
+        "generate": iter_csv_export,
+    },
+    "parquet": {
+        "content_type": "application/vnd.apache.parquet",
+        "generate": iter_parquet_export,
+    },
+}
+
+
+def get_export_cache_path(export_format):
+    os.makedirs(settings.DASHBOARD_EXPORT_CACHE_DIR, exist_ok=True)
+    return os.path.join(
+        settings.DASHBOARD_EXPORT_CACHE_DIR,
+        f"dashboard-lists-{get_dashboard_data_version()}.{export_format}",
+    )
+
+
+@contextmanager
+def lock_export_cache():
+    """Hold a lock on the export cache, shared with other processes on this machine."""
+    lock_path = os.path.join(settings.DASHBOARD_EXPORT_CACHE_DIR, ".lock")
+    with open(lock_path, "wb") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def remove_stale_exports(export_format):
+    """
+    Remove exports of data versions other than the current one.
+
+    The current version is read again, rather than taken from the export that
+    was just written, so that an export written by a concurrent request for
+    newer data is kept. Must be called while holding the export cache lock.
+    """
+    current_path = get_export_cache_path(export_format)
+    for filename in os.listdir(settings.DASHBOARD_EXPORT_CACHE_DIR):
+        path = os.path.join(settings.DASHBOARD_EXPORT_CACHE_DIR, filename)
+        if (
+            filename.startswith("dashboard-lists-")
+            and filename.endswith(f".{export_format}")
+            and path != current_path
+        ):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def iter_and_cache_export(export_format, path):
+    """
+    Yields the export while writing it to a temporary file, which replaces the
+    cached export once the whole export has been generated.
+    """
+    temporary_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+    try:
+        with open(temporary_path, "wb") as f:
+            for chunk in EXPORT_FORMATS[export_format]["generate"]():
+                content = chunk.encode() if isinstance(chunk, str) else chunk
+                f.write(content)
+                yield content
+
+        with lock_export_cache():
+            os.replace(temporary_path, path)
+            remove_stale_exports(export_format)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
@@ -0,0 +1,170 @@
+"""
+Pre-rendered, pre-compressed snapshot of the dashboard lists summary.
+
+Serializing every dashboard list (with its representative and dominant lists) is
+expensive, so the summary is rendered once into JSON bytes, compressed once per
+supported content encoding, and cached under the version of the dashboard data it
+was rendered from.
+"""
+
+import gzip
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Prefetch
+from rest_framework.renderers import JSONRenderer
+
+from calculator.models import (
+    DashboardList,
+    DominantDashboardList,
+    VariantList,
+    VariantListAccessPermission,
+    VariantListAnnotation,
+)
+from calculator.serializers import DashboardListsSummarySerializer
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+# Bump this when the format of the summary changes so that snapshots stored
+#   in a shared cache by a previous release are not served.
+SNAPSHOT_FORMAT_VERSION = 1
+
+SNAPSHOT_CACHE_KEY_PREFIX = f"dashboard_snapshot_v{SNAPSHOT_FORMAT_VERSION}"
+
+SNAPSHOT_TIMEOUT_IN_SECONDS = 6 * 60 * 60
+
+
+def get_dashboard_lists_queryset():
+    return (
+        DashboardList.objects.select_related("representative_variant_list")
+        .prefetch_related(
+            Prefetch(
+                "representative_variant_list__annotations",
+                queryset=VariantListAnnotation.objects.filter(user__isnull=True),
+                to_attr="shared_annotations_list",
+            ),
+            Prefetch(
+                "representative_variant_list__access_permissions",
+                queryset=VariantListAccessPermission.objects.filter(
+                    level=VariantListAccessPermission.Level.OWNER
+                ).select_related("user"),
+                to_attr="prefetched_owners",
+            ),
+        )
+        .all()
+    )
+
+
+def build_dashboard_snapshot():
+    queryset = get_dashboard_lists_queryset().order_by("-created_at")
+    data = DashboardListsSummarySerializer(queryset, many=True).data
+    content = JSONRenderer().render(data)
+
+    version = hashlib.sha256(content).hexdigest()[:32]
+
+    encodings = {
+        "identity": content,
+        "gzip": gzip.compress(content, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        encodings["br"] = brotli.compress(content, quality=11)
+
+    return {"version": version, "encodings": encodings}
+
+
+def get_dashboard_data_version():
+    """
+    Return a version of the data rendered in the dashboard summary and exports.
+
+    The version is derived from the database, so that it changes for writes made
+    by any process, including the worker and QuerySet updates, as long as they
+    set updated_at. Row counts catch deletes and the latest updated_at catches
+    changes. Variant lists, annotations and permissions only count if they
+    belong to a dashboard list's representative variant list.
+    """
+    representative_variant_lists = VariantList.objects.filter(
+        representative_variant_list__isnull=False
+    )
+
+    def get_table_state(queryset):
+        state = queryset.aggregate(
+            count=Count("id", distinct=True), updated_at=Max("updated_at")
+        )
+        return [state["count"], state["updated_at"] and state["updated_at"].isoformat()]
+
+    state = [
+        get_table_state(DashboardList.objects.all()),
+        get_table_state(DominantDashboardList.objects.all()),
+        get_table_state(representative_variant_lists),
+        get_table_state(
+            VariantListAnnotation.objects.filter(
+                user__isnull=True, variant_list__in=representative_variant_lists
+            )
+        ),
+        get_table_state(
+            VariantListAccessPermission.objects.filter(
+                level=VariantListAccessPermission.Level.OWNER,
+                variant_list__in=representative_variant_lists,
+            )
+        ),
+    ]
+
+    return hashlib.sha256(json.dumps(state).encode()).hexdigest()[:32]
+
+
+def get_dashboard_snapshot(refresh=False):
+    cache_key = f"{SNAPSHOT_CACHE_KEY_PREFIX}_{get_dashboard_data_version()}"
+    snapshot = None if refresh else cache.get(cache_key)
+
+    if snapshot is None:
+        snapshot = build_dashboard_snapshot()
+        cache.set(cache_key, snapshot, timeout=SNAPSHOT_TIMEOUT_IN_SECONDS)
+
+    return snapshot
+
+
+def get_snapshot_etag(snapshot, encoding):
+    if encoding == "identity":
+        return f'"{snapshot["version"]}"'
+
+    return f'"{snapshot["version"]}-{encoding}"'
+
+
+def get_accepted_encodings(accept_encoding):
+    """Return the quality value of each encoding listed in an Accept-Encoding header."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        encoding, *params = part.split(";")
+        encoding = encoding.strip().lower()
+        if not encoding:
+            continue
+
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        accepted[encoding] = quality
+
+    return accepted
+
+
+def select_encoding(snapshot, accept_encoding):
+    accepted = get_accepted_encodings(accept_encoding)
+
+    for encoding in ("br", "gzip"):
+        # Encodings not listed are accepted with the quality of "*", if given
+        quality = accepted.get(encoding, accepted.get("*", 0))
+        if quality > 0 and encoding in snapshot["encodings"]:
+            return encoding
+
+    return "identity"
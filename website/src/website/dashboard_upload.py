@@ -0,0 +1,74 @@
+"""
+Read rows from dashboard list files uploaded by staff.
+
+The data pipelines write these files as CSV and as Parquet. In CSV files, nested
+fields are stored as JSON strings, and columns are read by position, as they
+always have been. In Parquet files, nested fields are stored as typed struct and
+list columns, which are read as dicts and lists without parsing JSON, and
+columns are read by name.
+"""
+
+import csv
+import io
+import json
+
+import pyarrow.parquet as pq
+
+
+PARQUET_MAGIC = b"PAR1"
+
+
+def is_parquet_file(uploaded_file):
+    uploaded_file.seek(0)
+    magic = uploaded_file.read(len(PARQUET_MAGIC))
+    uploaded_file.seek(0)
+    return magic == PARQUET_MAGIC
+
+
+def _read_parquet_value(value, column_type):
+    # Empty values in the pipelines' dataframes are written as nulls, which are
+    #   read as empty strings like empty CSV fields, or as empty nested values
+    if value is None:
+        return column_type()
+
+    # Dict fields that a value did not have are written as nulls
+    if column_type is dict:
+        return {key: field for key, field in value.items() if field is not None}
+
+    return value
+
+
+def _read_parquet_rows(uploaded_file, columns, nested_columns):
+    table = pq.read_table(io.BytesIO(uploaded_file.read()), columns=columns)
+    for row in table.to_pylist():
+        yield {
+            column: _read_parquet_value(value, nested_columns.get(column, str))
+            for column, value in row.items()
+        }
+
+
+def _read_csv_rows(uploaded_file, columns, nested_columns):
+    reader = csv.reader(uploaded_file.read().decode("utf-8").splitlines())
+    # ignore the header row
+    if next(reader, None) is None:
+        return
+
+    for values in reader:
+        row = dict(zip(columns, values))
+        for column, column_type in nested_columns.items():
+            row[column] = json.loads(row[column]) if row[column] else column_type()
+        yield row
+
+
+def read_uploaded_rows(uploaded_file, columns, nested_columns):
+    """
+    Yield rows of an uploaded CSV or Parquet file as dicts keyed by column name.
+
+    columns lists the file's columns in order. nested_columns maps the names of
+    columns holding objects or arrays to their type, which is used as the value
+    of empty fields.
+    """
+    if is_parquet_file(uploaded_file):
+        return _read_parquet_rows(uploaded_file, columns, nested_columns)
+
+    return _read_csv_rows(uploaded_file, columns, nested_columns)
@@ -0,0 +1,51 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+RANGE_LOOKUPS = ("gt", "gte", "lt", "lte")
+
+
+class RangeFilter(BaseFilterBackend):
+    """
+    Filters numeric fields listed in the view's `range_filter_fields` with
+    query parameters of the form `<field>__<lookup>`, e.g.
+    `?estimated_genetic_prevalence__gt=1e-5`.
+    """
+
+    def get_filter_params(self, request, view):
+        fields = getattr(view, "range_filter_fields", [])
+        return {
+            f"{field}__{lookup}": request.query_params[f"{field}__{lookup}"]
+            for field in fields
+            for lookup in RANGE_LOOKUPS
+            if f"{field}__{lookup}" in request.query_params
+        }
+
+    def filter_queryset(self, request, queryset, view):
+        filters = {}
+        for param, value in self.get_filter_params(request, view).items():
+            try:
+                filters[param] = float(value)
+            except ValueError as e:
+                raise ValidationError({param: "Must be a number."}) from e
+
+        if filters:
+            queryset = queryset.filter(**filters)
+
+        return queryset
+
+
+class ChoiceFilter(BaseFilterBackend):
+    """
+    Filters fields listed in the view's `choice_filter_fields` by exact match.
+    A parameter can be repeated to match any of several values, e.g.
+    `?inheritance_type=AR&inheritance_type=AD`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        for field in getattr(view, "choice_filter_fields", []):
+            values = request.query_params.getlist(field)
+            if values:
+                queryset = queryset.filter(**{f"{field}__in": values})
+
+        return queryset
@@ -0,0 +1,68 @@
+from django.db.models import FloatField, IntegerField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+
+# Annotation paged on in place of a nullable field
+CURSOR_POSITION_FIELD = "cursor_position"
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Keyset pagination that only applies when the client asks for it with
+    `?page_size=<n>`, so existing clients keep receiving the full list.
+
+    Rows with equal values for the field being paged on are ordered by ID, and
+    rows without a value for it are returned last.
+    """
+
+    page_size = None
+    page_size_query_param = "page_size"
+    max_page_size = 500
+    ordering = ("-created_at", "id")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.get_page_size(request) is None:
+            return None
+
+        # A cursor can not point at a NULL value, so rows are paged on the field
+        #   with NULLs replaced by a value that is ordered after all others
+        ordering = super().get_ordering(request, queryset, view)
+        field_name = ordering[0].lstrip("-")
+        model_field = (
+            queryset.model._meta.get_field(  # pylint: disable=protected-access
+                field_name
+            )
+        )
+        if model_field.null:
+            if not isinstance(model_field, (FloatField, IntegerField)):
+                raise ValidationError(
+                    f"Paginated results can not be ordered by {field_name}"
+                )
+
+            last_value = float("-inf") if ordering[0].startswith("-") else float("inf")
+            queryset = queryset.annotate(
+                **{
+                    CURSOR_POSITION_FIELD: Coalesce(
+                        field_name, Value(last_value), output_field=FloatField()
+                    )
+                }
+            )
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+
+        if CURSOR_POSITION_FIELD in queryset.query.annotations:
+            ordering[0] = (
+                f"-{CURSOR_POSITION_FIELD}"
+                if ordering[0].startswith("-")
+                else CURSOR_POSITION_FIELD
+            )
+
+        if "id" not in ordering and "-id" not in ordering:
+            ordering.append("id")
+
+        return tuple(ordering)
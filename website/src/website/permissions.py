@@ -1,4 +1,7 @@
-from rest_framework.permissions import DjangoObjectPermissions
+from django.conf import settings
+from google.auth.transport import requests
+from google.oauth2 import id_token
+from rest_framework.permissions import BasePermission, DjangoObjectPermissions
 
 
 class ViewObjectPermissions(DjangoObjectPermissions):
@@ -10,3 +13,30 @@ class ViewObjectPermissions(DjangoObjectPermissions):
         "PATCH": ["%(app_label)s.change_%(model_name)s"],
         "DELETE": ["%(app_label)s.delete_%(model_name)s"],
     }
+
+
+class IsScheduler(BasePermission):
+    """
+    Allow requests from Cloud Scheduler, which are authenticated with an OIDC
+    token for the scheduler's service account.
+    """
+
+    def has_permission(self, request, view):
+        if not settings.SCHEDULER_SERVICE_ACCOUNT or not settings.SCHEDULER_AUDIENCE:
+            return False
+
+        auth_type, _, token = request.headers.get("Authorization", "").partition(" ")
+        if auth_type != "Bearer" or not token:
+            return False
+
+        try:
+            idinfo = id_token.verify_oauth2_token(
+                token, requests.Request(), settings.SCHEDULER_AUDIENCE
+            )
+        except ValueError:
+            return False
+
+        return (
+            idinfo.get("email") == settings.SCHEDULER_SERVICE_ACCOUNT
+            and idinfo.get("email_verified") is True
+        )
@@ -1,28 +1,292 @@
 import json
+import logging
+from datetime import timedelta
+from functools import partial
 
 from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
 from google.cloud import pubsub_v1
 
+from calculator.models import OutboxMessage, VariantList
 
-class Publisher:
+
+logger = logging.getLogger(__name__)
+
+
+# Each lane has its own topic and subscription, so that large and bulk jobs can
+#   be delivered with lower concurrency than interactive jobs.
+LANE_TOPICS = {
+    VariantList.Lane.INTERACTIVE: "worker-requests",
+    VariantList.Lane.LARGE: "worker-requests-large",
+    VariantList.Lane.BULK: "worker-requests-bulk",
+}
+
+
+def get_topic(message):
+    return LANE_TOPICS.get(
+        message.get("lane"), LANE_TOPICS[VariantList.Lane.INTERACTIVE]
+    )
+
+
+class PubSubBroker:
     client = None
-    topic_path = None
 
-    def send_to_worker(self, message, timeout=30):
+    def _start_publishing(self, messages):
         if not self.client:
             self.client = pubsub_v1.PublisherClient()
 
-        if not self.topic_path:
-            if not settings.GCP_PROJECT:
-                raise RuntimeError("Missing required configuration: GCP_PROJECT")
+        if not settings.GCP_PROJECT:
+            raise RuntimeError("Missing required configuration: GCP_PROJECT")
+
+        return [
+            self.client.publish(
+                self.client.topic_path(  # pylint: disable=no-member
+                    settings.GCP_PROJECT, get_topic(message)
+                ),
+                json.dumps(message).encode("utf-8"),
+            )
+            for message in messages
+        ]
+
+    def publish(self, messages, timeout=30):
+        """
+        Publish messages to the topics for their lanes.
+
+        Returns a list with the ID of each published message or the exception
+        raised while publishing it.
+        """
+        # Start all publishes before waiting on any of them so that the batch
+        #   costs one round trip instead of one per message
+        futures = self._start_publishing(messages)
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result(timeout))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                results.append(e)
+
+        return results
+
+    def publish_in_background(self, messages, callback):
+        """
+        Publish messages to the topics for their lanes without waiting for them.
+
+        callback is called with the index of each message and its ID or the
+        exception raised while publishing it, once it has been published.
+        """
+        for index, future in enumerate(self._start_publishing(messages)):
+            future.add_done_callback(partial(_call_with_result, callback, index))
+
+
+def _call_with_result(callback, index, future):
+    try:
+        result = future.result()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        result = e
+
+    try:
+        callback(index, result)
+    finally:
+        # Callbacks run in the client's threads, which Django does not close
+        #   database connections for
+        connections.close_all()
+
+
+class InMemoryBroker:
+    """Stand-in for Pub/Sub that keeps published messages in a list."""
+
+    def __init__(self):
+        self.published_messages = []
+
+    def publish(self, messages, timeout=30):  # pylint: disable=unused-argument
+        self.published_messages.extend(messages)
+        return list(
+            range(
+                len(self.published_messages) - len(messages),
+                len(self.published_messages),
+            )
+        )
+
+    def publish_in_background(self, messages, callback):
+        for index, result in enumerate(self.publish(messages)):
+            callback(index, result)
+
+
+BROKERS = {
+    "pubsub": PubSubBroker,
+    "memory": InMemoryBroker,
+}
+
+
+class Publisher:
+    broker = None
+
+    def get_broker(self):
+        if not self.broker:
+            self.broker = BROKERS[settings.WORKER_BROKER]()
+
+        return self.broker
+
+    def send_to_worker(self, message):
+        """
+        Add a message for the worker to the outbox.
+
+        The message is saved in the current transaction, so it is only published
+        if the change that requires it is committed. It is published in the
+        background once the transaction commits, so that the request does not
+        wait for Pub/Sub. Messages that fail to publish then are retried by the
+        scheduled dispatch of the outbox.
+        """
+        outbox_message = OutboxMessage.objects.create(message=message)
+        # A failure here must not fail the request, as its change is committed
+        transaction.on_commit(
+            partial(self.publish_in_background, [outbox_message.id]),
+            robust=True,
+        )
+        return outbox_message
 
-            self.topic_path = self.client.topic_path(  # pylint: disable=no-member
-                settings.GCP_PROJECT, "worker-requests"
+    def _claim_due_messages(self, batch_size, timeout, outbox_message_ids=None):
+        with transaction.atomic():
+            # Skip messages being claimed by another process
+            outbox_messages = OutboxMessage.objects.select_for_update(
+                skip_locked=True
+            ).filter(available_at__lte=timezone.now())
+            if outbox_message_ids is not None:
+                outbox_messages = outbox_messages.filter(id__in=outbox_message_ids)
+
+            outbox_messages = list(outbox_messages.order_by("id")[:batch_size])
+
+            if not outbox_messages:
+                return []
+
+            # Claim the messages until the publish has timed out, so that row
+            #   locks are not held during network calls. If this process stops
+            #   before recording the result, the messages are published again
+            #   after the claim expires.
+            OutboxMessage.objects.filter(
+                id__in=[outbox_message.id for outbox_message in outbox_messages]
+            ).update(
+                available_at=timezone.now()
+                + timedelta(seconds=timeout)
+                + get_retry_delay(1)
             )
 
-        encoded_message = json.dumps(message).encode("utf-8")
-        future = self.client.publish(self.topic_path, encoded_message)
-        return future.result(timeout)
+        return outbox_messages
+
+    def _record_results(self, outbox_messages, results):
+        """
+        Remove published messages from the outbox and schedule retries of
+        messages that failed to publish.
+
+        Returns the number of messages published.
+        """
+        published_messages = []
+        failed_messages = []
+        for outbox_message, result in zip(outbox_messages, results):
+            if isinstance(result, Exception):
+                outbox_message.attempts += 1
+                outbox_message.available_at = timezone.now() + get_retry_delay(
+                    outbox_message.attempts
+                )
+                outbox_message.last_error = str(result)
+                failed_messages.append(outbox_message)
+            else:
+                published_messages.append(outbox_message)
+
+        # Remove published messages even if others in the batch failed, so that
+        #   they are not published again
+        OutboxMessage.objects.filter(
+            id__in=[outbox_message.id for outbox_message in published_messages]
+        ).delete()
+
+        if failed_messages:
+            logger.warning(
+                "Failed to publish %d of %d outbox messages: %s",
+                len(failed_messages),
+                len(outbox_messages),
+                failed_messages[0].last_error,
+            )
+            OutboxMessage.objects.bulk_update(
+                failed_messages, ["attempts", "available_at", "last_error"]
+            )
+
+        return len(published_messages)
+
+    def dispatch_outbox(self, batch_size=None, timeout=30, outbox_message_ids=None):
+        """
+        Publish a batch of messages that are due from the outbox, or only the
+        given messages if they are due.
+
+        Returns the number of messages published.
+        """
+        batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+
+        outbox_messages = self._claim_due_messages(
+            batch_size, timeout, outbox_message_ids
+        )
+        if not outbox_messages:
+            return 0
+
+        try:
+            results = self.get_broker().publish(
+                [outbox_message.message for outbox_message in outbox_messages],
+                timeout,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            results = [e] * len(outbox_messages)
+
+        return self._record_results(outbox_messages, results)
+
+    def publish_in_background(self, outbox_message_ids, timeout=30):
+        """
+        Publish the given messages from the outbox if they are due, without
+        waiting for them to be published.
+
+        Each message is removed from the outbox, or scheduled for a retry, once
+        its publish has finished. The claim on the messages expires after the
+        timeout, after which the scheduled dispatch publishes them if they are
+        still in the outbox.
+        """
+        outbox_messages = self._claim_due_messages(
+            len(outbox_message_ids), timeout, outbox_message_ids
+        )
+        if not outbox_messages:
+            return
+
+        def record_result(index, result):
+            self._record_results([outbox_messages[index]], [result])
+
+        try:
+            self.get_broker().publish_in_background(
+                [outbox_message.message for outbox_message in outbox_messages],
+                record_result,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._record_results(outbox_messages, [e] * len(outbox_messages))
+
+    def dispatch_due_messages(self):
+        """
+        Publish all messages that are due from the outbox, in batches.
+
+        Returns the number of messages published.
+        """
+        num_published = 0
+        while True:
+            num_published_in_batch = self.dispatch_outbox()
+            num_published += num_published_in_batch
+            # Stop after a batch that was not full or in which some messages failed
+            if num_published_in_batch < settings.OUTBOX_BATCH_SIZE:
+                return num_published
+
+
+def get_retry_delay(attempts):
+    return timedelta(
+        seconds=min(
+            settings.OUTBOX_RETRY_BASE_DELAY_IN_SECONDS * 2 ** (attempts - 1),
+            settings.OUTBOX_RETRY_MAX_DELAY_IN_SECONDS,
+        )
+    )
 
 
 publisher = Publisher()
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 import json
 import os
+import tempfile
 from pathlib import Path
 
 from django.core.management.utils import get_random_secret_key
@@ -215,8 +216,43 @@ GCP_PROJECT = os.getenv("GCP_PROJECT")
 
 GOOGLE_AUTH_CLIENT_ID = os.getenv("GOOGLE_AUTH_CLIENT_ID")
 
+# Scheduled tasks are requested by Cloud Scheduler with an OIDC token for this
+#   service account and audience
+SCHEDULER_SERVICE_ACCOUNT = os.getenv("SCHEDULER_SERVICE_ACCOUNT")
+
+SCHEDULER_AUDIENCE = os.getenv("SCHEDULER_AUDIENCE")
+
 MAX_VARIANT_LISTS_PER_USER = int(os.getenv("MAX_VARIANT_LISTS_PER_USER", "25"))
 
+# Requests to process variant lists are rejected with a 429 response while a user,
+#   or all users together, have this many variant lists waiting to be processed.
+MAX_QUEUED_VARIANT_LISTS_PER_USER = int(
+    os.getenv("MAX_QUEUED_VARIANT_LISTS_PER_USER", "5")
+)
+
+MAX_QUEUED_VARIANT_LISTS = int(os.getenv("MAX_QUEUED_VARIANT_LISTS", "100"))
+
+# Number of variant lists that workers process at once, used to estimate when
+#   processing will complete
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "1"))
+
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")
 
 SLACK_USER_ID = os.getenv("SLACK_USER_ID")
+
+# Messages for the worker are written to an outbox and published after the request's
+#   transaction commits. Messages that could not be published then, or that were written
+#   by other processes, are published by a scheduled task (see SCHEDULER_SERVICE_ACCOUNT).
+#   WORKER_BROKER is "pubsub" or "memory" (for running without Pub/Sub).
+WORKER_BROKER = os.getenv("WORKER_BROKER", "pubsub")
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "100"))
+
+OUTBOX_RETRY_BASE_DELAY_IN_SECONDS = 2
+
+OUTBOX_RETRY_MAX_DELAY_IN_SECONDS = 5 * 60
+
+DASHBOARD_EXPORT_CACHE_DIR = os.getenv(
+    "DASHBOARD_EXPORT_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "dashboard-exports"),
+)
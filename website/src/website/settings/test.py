@@ -10,3 +10,5 @@ SECURE_SSL_REDIRECT = False
 SESSION_COOKIE_SECURE = False
 
 CSRF_COOKIE_SECURE = False
+
+WORKER_BROKER = "memory"
@@ -3,6 +3,11 @@ from django.urls import path
 from website.views.app_config import get_app_config
 from website.views.auth import signin, signout, whoami
 from website.views.frontend import FrontendView
+from website.views.gene_search_views import GeneSearchView
+from website.views.scheduled_task_views import (
+    dispatch_outbox_view,
+    requeue_stuck_variant_lists_view,
+)
 from website.views.system_status_views import system_status_view
 from website.views.user_views import UsersList, UserDetail
 from website.views.variant_list_views import (
@@ -17,6 +22,7 @@ from website.views.variant_list_views import (
 )
 from website.views.dashboard_list_views import (
     DashboardListsBulkDeleteView,
+    DashboardListsExportView,
     DashboardListsView,
     DashboardListView,
     DashboardListsLoadView,
@@ -57,6 +63,12 @@ urlpatterns = [
     path("api/auth/signout/", signout, name="signout"),
     path("api/auth/whoami/", whoami, name="whoami"),
     path("api/status/", system_status_view, name="system_status"),
+    path("api/tasks/dispatch-outbox/", dispatch_outbox_view, name="dispatch_outbox"),
+    path(
+        "api/tasks/requeue-stuck-variant-lists/",
+        requeue_stuck_variant_lists_view,
+        name="requeue_stuck_variant_lists",
+    ),
     path("api/users/", UsersList.as_view(), name="users"),
     path("api/users/<int:id>/", UserDetail.as_view(), name="user"),
     path("api/variant-lists/", VariantListsSummaryView.as_view(), name="variant-lists"),
@@ -78,6 +90,11 @@ urlpatterns = [
         DashboardListsBulkDeleteView.as_view(),
         name="bulk-delete-dashboard-lists",
     ),
+    path(
+        "api/dashboard-lists/export",
+        DashboardListsExportView.as_view(),
+        name="export-dashboard-lists",
+    ),
     path(
         "api/dashboard-lists/",
         DashboardListsView.as_view(),
@@ -88,6 +105,7 @@ urlpatterns = [
         DashboardListView.as_view(),
         name="dashboard-list-detail;",
     ),
+    path("api/gene-search/", GeneSearchView.as_view(), name="gene-search"),
     path(
         "api/dashboard-incidence/<str:gene_id>/",
         DominantDashboardListView.as_view(),
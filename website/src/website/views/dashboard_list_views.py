@@ -1,5 +1,4 @@
 import csv
-import json
 from datetime import datetime
 
 from rest_framework import status
@@ -15,31 +14,64 @@ from rest_framework.permissions import (
     IsAuthenticatedOrReadOnly,
     IsAdminUser,
 )
+from rest_framework.renderers import BaseRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from django.core.cache import cache
-from django.db.models import Prefetch
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.cache import patch_vary_headers
 from django.utils.decorators import method_decorator
-from django.views.decorators.gzip import gzip_page
+from django.utils.http import parse_etags
 from django.views.decorators.cache import cache_control
 
 from calculator.models import (
     DashboardList,
     VariantList,
     DominantDashboardList,
-    VariantListAnnotation,
-    VariantListAccessPermission,
 )
 from calculator.serializers import (
     NewDashboardListSerializer,
     DashboardListSerializer,
     DashboardListsSummarySerializer,
 )
+from website.dashboard_upload import read_uploaded_rows
+from website.dashboard_export import (
+    EXPORT_FORMATS,
+    get_export_cache_path,
+    iter_and_cache_export,
+)
+from website.filters import ChoiceFilter, RangeFilter
+from website.pagination import OptionalCursorPagination
+from website.dashboard_snapshot import (
+    get_dashboard_lists_queryset,
+    get_dashboard_snapshot,
+    get_snapshot_etag,
+    select_encoding,
+)
 
 # set csv field size limit to half of a megabyte
 csv.field_size_limit(512 * 1024)  # 512 KB in bytes
 
-SIX_HOURS_IN_SECONDS = 6 * 60 * 60
+# Columns of the dashboard list models files written by the data pipelines
+DASHBOARD_LIST_COLUMNS = [
+    "gene_id",
+    "label",
+    "notes",
+    "date_created",
+    "metadata",
+    "variant_calculations",
+    "top_ten_variants",
+    "genetic_prevalence_orphanet",
+    "genetic_prevalence_genereviews",
+    "genetic_prevalence_other",
+    "genetic_incidence_other",
+    "type",
+]
 
 
 class DashboardListsLoadView(CreateAPIView):
@@ -54,29 +86,38 @@ class DashboardListsLoadView(CreateAPIView):
             )
 
         try:
-            decoded_file = csv_file.read().decode("utf-8").splitlines()
-            reader = csv.reader(decoded_file)
-            next(reader)  # ignore the header row
+            rows = read_uploaded_rows(
+                csv_file,
+                DASHBOARD_LIST_COLUMNS,
+                {
+                    "metadata": dict,
+                    "variant_calculations": dict,
+                    "top_ten_variants": list,
+                },
+            )
 
-            for row in reader:
-                gene_id = row[0]
+            for row in rows:
+                gene_id = row["gene_id"]
 
-                metadata = json.loads(row[4])
-                variant_calculations = json.loads(row[5])
+                metadata = row["metadata"]
 
                 row_dict = {
-                    "gene_id": row[0],
-                    "label": row[1],
-                    "notes": row[2],
-                    "created_at": datetime.strptime(row[3], "%Y-%m-%dT%H:%M:%S.%f"),
+                    "gene_id": row["gene_id"],
+                    "label": row["label"],
+                    "notes": row["notes"],
+                    "created_at": datetime.strptime(
+                        row["date_created"], "%Y-%m-%dT%H:%M:%S.%f"
+                    ),
                     "metadata": metadata,
-                    "variant_calculations": variant_calculations,
-                    "top_ten_variants": json.loads(row[6]),
-                    "genetic_prevalence_orphanet": row[7],
-                    "genetic_prevalence_genereviews": row[8],
-                    "genetic_prevalence_other": row[9],
-                    "genetic_incidence_other": row[10],
-                    "inheritance_type": row[11],
+                    "variant_calculations": row["variant_calculations"],
+                    "top_ten_variants": row["top_ten_variants"],
+                    "genetic_prevalence_orphanet": row["genetic_prevalence_orphanet"],
+                    "genetic_prevalence_genereviews": row[
+                        "genetic_prevalence_genereviews"
+                    ],
+                    "genetic_prevalence_other": row["genetic_prevalence_other"],
+                    "genetic_incidence_other": row["genetic_incidence_other"],
+                    "inheritance_type": row["type"],
                 }
 
                 if DashboardList.objects.filter(gene_id=gene_id).count() > 0:
@@ -217,53 +258,125 @@ class DashboardListsBulkDeleteView(CreateAPIView):
             )
 
 
-@method_decorator(gzip_page, name="dispatch")
-@method_decorator(
-    cache_control(public=True, max_age=SIX_HOURS_IN_SECONDS), name="dispatch"
-)
+class EncodedJsonResponse(HttpResponse):
+    """An HTTP response with JSON content that has already been encoded."""
+
+    def __init__(self, content, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content, **kwargs)
+
+
+# Clients must revalidate on each request, which is cheap for the summary
+#   because it is answered with 304 Not Modified while its ETag matches
+@method_decorator(cache_control(public=True, no_cache=True), name="dispatch")
 class DashboardListsView(ListAPIView):
-    queryset = (
-        DashboardList.objects.select_related(
-            "representative_variant_list",
-            "dominant_dashboard_list",
-        )
-        .prefetch_related(
-            Prefetch(
-                "representative_variant_list__annotations",
-                queryset=VariantListAnnotation.objects.filter(user__isnull=True),
-                to_attr="shared_annotations_list",
-            ),
-            Prefetch(
-                "representative_variant_list__access_permissions",
-                queryset=VariantListAccessPermission.objects.filter(
-                    level=VariantListAccessPermission.Level.OWNER
-                ).select_related("user"),
-                to_attr="prefetched_owners",
-            ),
-        )
-        .all()
-    )
     permission_classes = (IsAuthenticatedOrReadOnly,)
-    filter_backends = [OrderingFilter]
-    ordering_fields = ["label", "created_at"]
-    ordering = ["-created_at"]
     serializer_class = DashboardListsSummarySerializer
 
-    def list(self, request, *args, **kwargs):
-        CACHE_KEY = "dashboard_cache"
+    filter_backends = [ChoiceFilter, RangeFilter, OrderingFilter]
+    choice_filter_fields = ["inheritance_type"]
+    range_filter_fields = [
+        "aggregate_allele_frequency",
+        "estimated_genetic_prevalence",
+        "estimated_de_novo_incidence",
+    ]
+    ordering_fields = ["label", "created_at", *range_filter_fields]
+    ordering = ["-created_at", "id"]
+    pagination_class = OptionalCursorPagination
 
-        if request.user.is_staff and request.query_params.get("refresh") == "true":
-            cache.delete(CACHE_KEY)
+    def get_queryset(self):
+        return get_dashboard_lists_queryset()
+
+    def is_snapshot_request(self, request):
+        query_params = set(request.query_params) - {"refresh"}
+        return not query_params
 
-        data = cache.get(CACHE_KEY)
+    def list(self, request, *args, **kwargs):
+        # Sorted, filtered and paginated requests are answered from the
+        #   indexed summary columns
+        if not self.is_snapshot_request(request):
+            return super().list(request, *args, **kwargs)
+
+        # The summary is served from a pre-rendered, pre-compressed snapshot
+        #   which is rebuilt whenever dashboard data changes
+        snapshot = get_dashboard_snapshot(
+            refresh=request.user.is_staff
+            and request.query_params.get("refresh") == "true"
+        )
 
+        encoding = select_encoding(
+            snapshot, request.META.get("HTTP_ACCEPT_ENCODING", "")
+        )
+        etag = get_snapshot_etag(snapshot, encoding)
+
+        if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if "*" in if_none_match or any(
+            get_snapshot_etag(snapshot, e) in if_none_match
+            for e in snapshot["encodings"]
+        ):
+            response = HttpResponseNotModified()
+        else:
+            response = EncodedJsonResponse(snapshot["encodings"][encoding])
+            if encoding != "identity":
+                response["Content-Encoding"] = encoding
+
+        response["ETag"] = etag
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+
+class ExportRenderer(BaseRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Exports are streamed without going through the renderer, so only
+        #   errors such as throttled requests are rendered, as their message
         if data is None:
-            queryset = self.filter_queryset(self.get_queryset())
-            serializer = self.get_serializer(queryset, many=True)
-            data = serializer.data
-            cache.set(CACHE_KEY, data, timeout=SIX_HOURS_IN_SECONDS)
+            return b""
+
+        if isinstance(data, dict) and "detail" in data:
+            data = data["detail"]
+
+        return str(data).encode("utf-8")
+
+
+class CSVRenderer(ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class ParquetRenderer(ExportRenderer):
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    charset = None
+
 
-        return Response(data)
+class DashboardListsExportView(APIView):
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+
+    # Only used to select the export format from the format query parameter or
+    #   Accept header, the export is streamed without going through a renderer
+    renderer_classes = (CSVRenderer, ParquetRenderer)
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        export_format = request.accepted_renderer.format
+        path = get_export_cache_path(export_format)
+        filename = f"dashboard-lists.{export_format}"
+
+        try:
+            return FileResponse(
+                open(path, "rb"),  # pylint: disable=consider-using-with
+                as_attachment=True,
+                filename=filename,
+                content_type=EXPORT_FORMATS[export_format]["content_type"],
+            )
+        except FileNotFoundError:
+            pass
+
+        response = StreamingHttpResponse(
+            iter_and_cache_export(export_format, path),
+            content_type=EXPORT_FORMATS[export_format]["content_type"],
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
 
 
 class DashboardListView(RetrieveUpdateDestroyAPIView):
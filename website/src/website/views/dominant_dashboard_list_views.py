@@ -1,5 +1,4 @@
 import csv
-import json
 from datetime import datetime
 
 from rest_framework import status
@@ -31,9 +30,20 @@ from calculator.serializers import (
     NewDashboardListSerializer,
 )
 
+from website.dashboard_upload import read_uploaded_rows
+
 # set csv field size limit to half of a megabyte
 csv.field_size_limit(512 * 1024)  # 512 KB in bytes
 
+# Columns of the dominant dashboard list models files written by the data pipelines
+DOMINANT_DASHBOARD_LIST_COLUMNS = [
+    "gene_id",
+    "date_created",
+    "metadata",
+    "de_novo_variant_calculations",
+    "type",
+]
+
 
 class DominantDashboardListsLoadView(CreateAPIView):
     permission_classes = (IsAuthenticated, IsAdminUser)
@@ -50,22 +60,25 @@ class DominantDashboardListsLoadView(CreateAPIView):
             )
 
         try:
-            decoded_file = csv_file.read().decode("utf-8").splitlines()
-            reader = csv.reader(decoded_file)
-            next(reader)
+            rows = read_uploaded_rows(
+                csv_file,
+                DOMINANT_DASHBOARD_LIST_COLUMNS,
+                {"metadata": dict, "de_novo_variant_calculations": dict},
+            )
 
-            for row in reader:
-                gene_id = row[0]
+            for row in rows:
+                gene_id = row["gene_id"]
 
-                metadata = json.loads(row[2])
-                de_novo_variant_calculations = json.loads(row[3])
+                metadata = row["metadata"]
 
                 row_dict = {
-                    "gene_id": row[0],
-                    "date_created": datetime.strptime(row[1], "%Y-%m-%dT%H:%M:%S.%f"),
+                    "gene_id": row["gene_id"],
+                    "date_created": datetime.strptime(
+                        row["date_created"], "%Y-%m-%dT%H:%M:%S.%f"
+                    ),
                     "metadata": metadata,
-                    "de_novo_variant_calculations": de_novo_variant_calculations,
-                    "inheritance_type": row[4],
+                    "de_novo_variant_calculations": row["de_novo_variant_calculations"],
+                    "inheritance_type": row["type"],
                 }
 
                 if DominantDashboardList.objects.filter(gene_id=gene_id).count() > 0:
@@ -130,7 +143,7 @@ class DominantDashboardListsLoadView(CreateAPIView):
                             "genetic_prevalence_genereviews": "",
                             "genetic_prevalence_other": "",
                             "genetic_incidence_other": "",
-                            "inheritance_type": row[4],
+                            "inheritance_type": row["type"],
                         }
 
                         dashboard_serializer = NewDashboardListSerializer(
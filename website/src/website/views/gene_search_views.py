@@ -0,0 +1,97 @@
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.functions import Length
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticatedOrReadOnly
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from calculator.models import DashboardList, GeneSearchTerm, VariantList
+from calculator.serializers import PublicVariantListSummarySerializer
+
+
+DEFAULT_NUM_RESULTS = 10
+MAX_NUM_RESULTS = 50
+
+# rank exact matches first, then matches on more specific kinds of terms
+KIND_RANKS = [
+    GeneSearchTerm.Kind.SYMBOL,
+    GeneSearchTerm.Kind.GENE_ID,
+    GeneSearchTerm.Kind.ALIAS,
+    GeneSearchTerm.Kind.LABEL,
+]
+
+
+def search_gene_search_terms(query, list_field, num_results):
+    matches = (
+        GeneSearchTerm.objects.filter(
+            term__startswith=query, **{f"{list_field}__isnull": False}
+        )
+        .annotate(
+            exact_rank=Case(
+                When(term=query, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            ),
+            kind_rank=Case(
+                *(When(kind=kind, then=Value(i)) for i, kind in enumerate(KIND_RANKS)),
+                output_field=IntegerField(),
+            ),
+        )
+        .order_by("exact_rank", "kind_rank", Length("term"), "term")
+        # each list has at most a few matching terms
+        .values_list(f"{list_field}_id", flat=True)[: num_results * len(KIND_RANKS)]
+    )
+
+    # preserve rank order while removing lists matched by more than one term
+    return list(dict.fromkeys(matches))[:num_results]
+
+
+class GeneSearchView(APIView):
+    permission_classes = (IsAuthenticatedOrReadOnly,)
+
+    def get(self, request, *args, **kwargs):  # pylint: disable=unused-argument
+        query = request.query_params.get("q", "").strip().lower()
+        if not query:
+            raise ValidationError({"q": "This parameter is required."})
+
+        try:
+            num_results = min(
+                int(request.query_params.get("limit", DEFAULT_NUM_RESULTS)),
+                MAX_NUM_RESULTS,
+            )
+        except ValueError as e:
+            raise ValidationError({"limit": "Must be an integer."}) from e
+
+        if num_results < 1:
+            raise ValidationError({"limit": "Must be a positive integer."})
+
+        dashboard_list_ids = search_gene_search_terms(
+            query, "dashboard_list", num_results
+        )
+        dashboard_lists = DashboardList.objects.only(
+            "gene_id", "label", "metadata", "inheritance_type"
+        ).in_bulk(dashboard_list_ids)
+
+        variant_list_ids = search_gene_search_terms(query, "variant_list", num_results)
+        variant_lists = (
+            VariantList.objects.select_related("representative_status_updated_by")
+            .defer("variants", "structural_variants")
+            .in_bulk(variant_list_ids)
+        )
+
+        return Response(
+            {
+                "dashboard_lists": [
+                    {
+                        "gene_id": dashboard_lists[pk].gene_id,
+                        "gene_symbol": dashboard_lists[pk].metadata.get("gene_symbol"),
+                        "label": dashboard_lists[pk].label,
+                        "inheritance_type": dashboard_lists[pk].inheritance_type,
+                    }
+                    for pk in dashboard_list_ids
+                ],
+                "variant_lists": PublicVariantListSummarySerializer(
+                    [variant_lists[pk] for pk in variant_list_ids], many=True
+                ).data,
+            }
+        )
@@ -0,0 +1,31 @@
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
+from rest_framework.response import Response
+
+from calculator.management.commands.requeue_stuck_variant_lists import (
+    requeue_stuck_variant_lists,
+)
+
+from website.permissions import IsScheduler
+from website.pubsub import publisher
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([IsScheduler])
+def dispatch_outbox_view(request):  # pylint: disable=unused-argument
+    """Publish messages left in the outbox, such as those that failed to publish after their request."""
+    num_published = publisher.dispatch_due_messages()
+    return Response({"num_published": num_published})
+
+
+@api_view(["POST"])
+@authentication_classes([])
+@permission_classes([IsScheduler])
+def requeue_stuck_variant_lists_view(request):  # pylint: disable=unused-argument
+    """Requeue variant lists whose worker stopped while processing them."""
+    num_requeued, num_errored = requeue_stuck_variant_lists()
+    return Response({"num_requeued": num_requeued, "num_errored": num_errored})
@@ -1,11 +1,36 @@
-from django.db.models import Count
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.paginator import Paginator
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 
 from calculator.models import VariantList
 
 
+LATENCY_WINDOWS = {
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
+LATENCY_PERCENTILES = (50, 90, 99)
+
+# latency percentiles are computed from at most this many of the most recently
+#   finished lists, so that the page does not load every list in a long window
+LATENCY_SAMPLE_SIZE = 10_000
+
+ERROR_GROUPS_PAGE_SIZE = 20
+
+# number of variant lists listed for each group of errors
+ERROR_GROUP_NUM_EXAMPLES = 5
+
+
 def get_num_variant_lists_by_status():
     num_variant_lists_by_status = {status.label: 0 for status in VariantList.Status}
 
@@ -21,26 +46,132 @@ def get_num_variant_lists_by_status():
     return num_variant_lists_by_status
 
 
-def get_error_details():
+def get_percentile(sorted_values, percentile):
+    index = max(math.ceil(percentile / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def get_percentiles(durations):
+    sorted_values = sorted(duration.total_seconds() for duration in durations)
+    if not sorted_values:
+        return None
+
+    return {
+        f"p{percentile}": get_percentile(sorted_values, percentile)
+        for percentile in LATENCY_PERCENTILES
+    }
+
+
+def get_latency_stats(window):
+    """
+    Return percentiles of the time that lists waited in the queue and the time
+    that processing took, for lists that finished processing within the window,
+    grouped by gnomAD version.
+
+    Numbers of lists are counted in the database. Percentiles are computed from
+    the LATENCY_SAMPLE_SIZE most recently finished lists.
+    """
+    finished_variant_lists = VariantList.objects.filter(
+        finished_at__gte=timezone.now() - LATENCY_WINDOWS[window],
+        started_at__isnull=False,
+    )
+
+    counts = {
+        result["metadata__gnomad_version"]: result
+        for result in finished_variant_lists.values("metadata__gnomad_version")
+        .annotate(
+            num_variant_lists=Count("id"),
+            num_retried=Count("id", filter=Q(processing_attempts__gt=1)),
+        )
+        .order_by()
+    }
+
+    sampled_variant_lists = finished_variant_lists.order_by("-finished_at").values_list(
+        "metadata__gnomad_version", "queued_at", "started_at", "finished_at"
+    )[:LATENCY_SAMPLE_SIZE]
+
+    latencies = defaultdict(lambda: {"queue_wait": [], "processing_time": []})
+    for gnomad_version, queued_at, started_at, finished_at in sampled_variant_lists:
+        if queued_at is not None:
+            latencies[gnomad_version]["queue_wait"].append(started_at - queued_at)
+        latencies[gnomad_version]["processing_time"].append(finished_at - started_at)
+
+    return {
+        gnomad_version: {
+            "num_variant_lists": version_counts["num_variant_lists"],
+            "num_retried": version_counts["num_retried"],
+            "num_sampled": len(latencies[gnomad_version]["processing_time"]),
+            "queue_wait": get_percentiles(latencies[gnomad_version]["queue_wait"]),
+            "processing_time": get_percentiles(
+                latencies[gnomad_version]["processing_time"]
+            ),
+        }
+        for gnomad_version, version_counts in sorted(
+            counts.items(), key=lambda item: item[0] or ""
+        )
+    }
+
+
+def get_error_groups(page_number):
+    """
+    Return a page of errors, grouped by their signature, with the number of lists
+    that failed with each error. Tracebacks are not loaded.
+    """
     errored_variant_lists = VariantList.objects.filter(status=VariantList.Status.ERROR)
-    lists_with_errors = []
-    for vlist in errored_variant_lists:
-        error = vlist.error if vlist.error is not None else ""
-        lists_with_errors.append(
+
+    error_groups = (
+        errored_variant_lists.values("error_signature")
+        .annotate(count=Count("id"))
+        .order_by("-count", "error_signature")
+    )
+
+    page = Paginator(error_groups, ERROR_GROUPS_PAGE_SIZE).get_page(page_number)
+
+    return {
+        "count": page.paginator.count,
+        "page": page.number,
+        "num_pages": page.paginator.num_pages,
+        "results": [
             {
-                "error": error,
-                "uuid": vlist.uuid,
-                "label": vlist.label,
+                "signature": error_group["error_signature"],
+                "count": error_group["count"],
+                "variant_lists": list(
+                    errored_variant_lists.filter(
+                        error_signature=error_group["error_signature"]
+                    )
+                    .order_by("-updated_at")
+                    .values("uuid", "label")[:ERROR_GROUP_NUM_EXAMPLES]
+                ),
             }
-        )
-    return lists_with_errors
+            for error_group in page
+        ],
+    }
+
+
+def get_job_stats():
+    job_stats = VariantList.objects.aggregate(
+        coalesced=Sum("num_coalesced_jobs"), dropped=Sum("num_dropped_jobs")
+    )
+    return {key: value or 0 for key, value in job_stats.items()}
 
 
 @api_view(["GET"])
 @permission_classes([IsAdminUser])
-def system_status_view(request):  # pylint: disable=unused-argument
+def system_status_view(request):
+    window = request.query_params.get("window", "7d")
+    if window not in LATENCY_WINDOWS:
+        raise ValidationError(
+            f"Invalid window, must be one of {', '.join(LATENCY_WINDOWS)}"
+        )
+
     status = {
         "variant_lists": get_num_variant_lists_by_status(),
-        "error_details": get_error_details(),
+        "latency": {
+            "window": window,
+            "sample_size": LATENCY_SAMPLE_SIZE,
+            "by_gnomad_version": get_latency_stats(window),
+        },
+        "errors": get_error_groups(request.query_params.get("errors_page", 1)),
+        "jobs": get_job_stats(),
     }
     return Response(status)
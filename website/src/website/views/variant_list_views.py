@@ -2,6 +2,7 @@ import os
 import requests
 from requests.exceptions import RequestException
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
 from django.core.validators import URLValidator
 from django.core.exceptions import ValidationError as DjangoCoreValidationError
@@ -20,6 +21,7 @@ from rest_framework.permissions import (
     IsAuthenticated,
     IsAuthenticatedOrReadOnly,
 )
+from rest_framework import status
 from rest_framework.response import Response
 
 from calculator.models import (
@@ -38,6 +40,7 @@ from calculator.serializers import (
     is_variant_id,
     is_structural_variant_id,
 )
+from website.admission import check_admission, estimate_completion_time
 from website.permissions import ViewObjectPermissions
 from website.pubsub import publisher
 
@@ -71,8 +74,21 @@ class VariantListsSummaryView(ListCreateAPIView):
                 "You have created the maximum number of variant lists. Delete one to create another."
             )
 
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+
+        data = {
+            **serializer.data,
+            "estimated_completion_time": estimate_completion_time(serializer.instance),
+        }
+        headers = self.get_success_headers(data)
+        return Response(data, status=status.HTTP_201_CREATED, headers=headers)
+
     def perform_create(self, serializer):
         self.check_list_limit(self.request.user)
+        check_admission(self.request.user)
 
         variants = serializer.validated_data.get("variants", [])
         for variant in variants:
@@ -91,16 +107,15 @@ class VariantListsSummaryView(ListCreateAPIView):
                     f"All structural variants must be of a valid ID, malformed ID: {structural_variant['id']}"
                 )
 
-        variant_list = serializer.save(created_by=self.request.user)
-        VariantListAccessPermission.objects.create(
-            variant_list=variant_list,
-            user=self.request.user,
-            level=VariantListAccessPermission.Level.OWNER,
-        )
+        with transaction.atomic():
+            variant_list = serializer.save(created_by=self.request.user)
+            VariantListAccessPermission.objects.create(
+                variant_list=variant_list,
+                user=self.request.user,
+                level=VariantListAccessPermission.Level.OWNER,
+            )
 
-        publisher.send_to_worker(
-            {"type": "process_variant_list", "args": {"uuid": str(variant_list.uuid)}}
-        )
+            publisher.send_to_worker(variant_list.request_processing())
 
     def get_success_headers(self, data):
         try:
@@ -201,24 +216,48 @@ class VariantListProcessView(GenericAPIView):
     permission_classes = (IsAuthenticated,)
 
     def post(self, request, *args, **kwargs):  # pylint: disable=unused-argument
-        instance = self.get_object()
+        variant_list = self.get_object()
         if not self.request.user.is_staff and not self.request.user.has_perm(
-            "calculator.change_variantlist", instance
+            "calculator.change_variantlist", variant_list
         ):
             raise PermissionDenied
 
-        variant_list = self.get_object()
-
-        publisher.send_to_worker(
-            {"type": "process_variant_list", "args": {"uuid": str(variant_list.uuid)}}
+        updated_fields = {}
+        if variant_list.metadata["gnomad_version"] == "4.0.0":
+            updated_fields["metadata"] = {
+                **variant_list.metadata,
+                "gnomad_version": "4.1.0",
+            }
+
+        # Bulk reprocessing by staff goes to a low priority lane so that it does
+        #   not delay interactive jobs
+        lane = (
+            VariantList.Lane.BULK
+            if self.request.user.is_staff and request.data.get("bulk")
+            else None
         )
 
-        variant_list.status = VariantList.Status.QUEUED
-        if variant_list.metadata["gnomad_version"] == "4.0.0":
-            variant_list.metadata["gnomad_version"] = "4.1.0"
-        variant_list.save()
+        check_admission(self.request.user)
 
-        return Response({})
+        with transaction.atomic():
+            lease = (
+                VariantList.objects.select_for_update()
+                .only("status", "lease_expires_at")
+                .get(id=variant_list.id)
+            )
+            if lease.has_active_lease():
+                # Queuing the list now would let another worker claim it while
+                #   this run is in progress. The worker processing it requeues it
+                #   when the run finishes.
+                variant_list.request_processing_again(lane=lane, **updated_fields)
+            else:
+                variant_list.set_status(VariantList.Status.QUEUED, **updated_fields)
+
+                publisher.send_to_worker(variant_list.request_processing(lane=lane))
+
+        return Response(
+            {"estimated_completion_time": estimate_completion_time(variant_list)}
+        )
 
 
 class VariantListVariantsViewObjectPermissions(DjangoObjectPermissions):
@@ -280,29 +319,35 @@ class VariantListVariantsView(GenericAPIView):
                 f"Variants cannot be changed while variant list is {VariantList.Status(variant_list.status).label.lower()}"
             )
 
-        variant_list.variants = [
-            *variant_list.variants,
-            *[{"id": variant_id} for variant_id in added_variants],
-        ]
-
-        variant_list.structural_variants = [
-            *variant_list.structural_variants,
-            *[
-                {"id": structural_variant_id}
-                for structural_variant_id in added_structural_variants
+        updated_fields = {
+            "variants": [
+                *variant_list.variants,
+                *[{"id": variant_id} for variant_id in added_variants],
             ],
-        ]
-
-        variant_list.status = VariantList.Status.QUEUED
+            "structural_variants": [
+                *variant_list.structural_variants,
+                *[
+                    {"id": structural_variant_id}
+                    for structural_variant_id in added_structural_variants
+                ],
+            ],
+        }
         if variant_list.metadata["gnomad_version"] == "4.0.0":
-            variant_list.metadata["gnomad_version"] = "4.1.0"
-        variant_list.save()
+            updated_fields["metadata"] = {
+                **variant_list.metadata,
+                "gnomad_version": "4.1.0",
+            }
 
-        publisher.send_to_worker(
-            {"type": "process_variant_list", "args": {"uuid": str(variant_list.uuid)}}
-        )
+        check_admission(self.request.user)
 
-        return Response({})
+        with transaction.atomic():
+            variant_list.set_status(VariantList.Status.QUEUED, **updated_fields)
+
+            publisher.send_to_worker(variant_list.request_processing())
+
+        return Response(
+            {"estimated_completion_time": estimate_completion_time(variant_list)}
+        )
 
 
 class VariantListAnnotationViewObjectPermissions(DjangoObjectPermissions):
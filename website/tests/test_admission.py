@@ -0,0 +1,121 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.exceptions import Throttled
+
+from calculator.models import VariantList
+from website.admission import (
+    DEFAULT_JOB_DURATIONS,
+    check_admission,
+    estimate_completion_time,
+    get_backlog,
+    get_job_durations,
+)
+
+
+User = get_user_model()
+
+
+def create_variant_list(lane=VariantList.Lane.INTERACTIVE, **kwargs):
+    return VariantList.objects.create(
+        label="List",
+        type=VariantList.Type.CUSTOM,
+        metadata={"version": "2", "gnomad_version": "4.1.0"},
+        variants=[{"id": "1-55516888-G-GA"}],
+        lane=lane,
+        **kwargs,
+    )
+
+
+@pytest.mark.django_db
+class TestAdmission:
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_job_durations_are_medians_of_recent_jobs(self):
+        now = timezone.now()
+        for minutes in (2, 4, 30):
+            create_variant_list(
+                status=VariantList.Status.READY,
+                started_at=now - timedelta(minutes=minutes),
+                finished_at=now,
+            )
+
+        durations = get_job_durations()
+        assert durations[VariantList.Lane.INTERACTIVE] == timedelta(minutes=4)
+        assert (
+            durations[VariantList.Lane.LARGE]
+            == DEFAULT_JOB_DURATIONS[VariantList.Lane.LARGE]
+        )
+
+    def test_backlog_counts_queued_and_processing_lists_per_lane(self):
+        create_variant_list()
+        create_variant_list(status=VariantList.Status.PROCESSING)
+        create_variant_list(status=VariantList.Status.READY)
+        create_variant_list(lane=VariantList.Lane.BULK)
+
+        assert get_backlog() == {
+            VariantList.Lane.INTERACTIVE: 2,
+            VariantList.Lane.LARGE: 0,
+            VariantList.Lane.BULK: 1,
+        }
+
+    def test_backlog_does_not_count_lists_with_expired_leases(self):
+        create_variant_list(
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            lease_expires_at=timezone.now() + timedelta(minutes=1),
+        )
+        create_variant_list(
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-2",
+            lease_expires_at=timezone.now() - timedelta(minutes=1),
+        )
+
+        assert get_backlog()[VariantList.Lane.INTERACTIVE] == 1
+
+    def test_admission_does_not_count_bulk_jobs(self, settings):
+        settings.MAX_QUEUED_VARIANT_LISTS = 2
+        user = User.objects.create(username="user")
+
+        create_variant_list()
+        create_variant_list(lane=VariantList.Lane.BULK)
+        create_variant_list(lane=VariantList.Lane.BULK)
+
+        check_admission(user)
+
+        create_variant_list(lane=VariantList.Lane.LARGE)
+        with pytest.raises(Throttled):
+            check_admission(user)
+
+    def test_admission_with_zero_limit_and_no_backlog_is_throttled(self, settings):
+        settings.MAX_QUEUED_VARIANT_LISTS_PER_USER = 0
+        user = User.objects.create(username="user")
+
+        with pytest.raises(Throttled) as exc_info:
+            check_admission(user)
+
+        assert exc_info.value.wait is None
+
+    def test_estimated_completion_time_includes_jobs_ahead(self, settings):
+        settings.WORKER_CONCURRENCY = 1
+
+        create_variant_list()
+        create_variant_list(lane=VariantList.Lane.LARGE)
+        # lower priority lanes are processed after the list
+        create_variant_list(lane=VariantList.Lane.BULK)
+        variant_list = create_variant_list(lane=VariantList.Lane.LARGE)
+
+        expected_completion_time = timezone.now() + (
+            DEFAULT_JOB_DURATIONS[VariantList.Lane.INTERACTIVE]
+            + 2 * DEFAULT_JOB_DURATIONS[VariantList.Lane.LARGE]
+        )
+        assert abs(
+            estimate_completion_time(variant_list) - expected_completion_time
+        ) < timedelta(seconds=5)
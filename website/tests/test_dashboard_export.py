@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+from website import dashboard_export
+from website.dashboard_export import get_export_cache_path, iter_and_cache_export
+
+
+@pytest.mark.django_db
+class TestExportCache:
+    @pytest.fixture(autouse=True)
+    def export_cache_dir(self, settings, tmp_path):
+        settings.DASHBOARD_EXPORT_CACHE_DIR = str(tmp_path)
+
+    def test_keeps_export_of_newer_data_written_by_another_request(self, monkeypatch):
+        monkeypatch.setattr(dashboard_export, "get_dashboard_data_version", lambda: "1")
+        path = get_export_cache_path("csv")
+        old_path = os.path.join(os.path.dirname(path), "dashboard-lists-0.csv")
+        with open(old_path, "w", encoding="utf-8") as f:
+            f.write("stale")
+
+        export = iter_and_cache_export("csv", path)
+        next(export)
+
+        # while this export is generated, the data changes and another request
+        #   writes an export of the new data
+        monkeypatch.setattr(dashboard_export, "get_dashboard_data_version", lambda: "2")
+        newer_path = get_export_cache_path("csv")
+        with open(newer_path, "w", encoding="utf-8") as f:
+            f.write("newer")
+
+        list(export)
+
+        assert os.path.exists(newer_path)
+        assert not os.path.exists(old_path)
+        # this export is already stale, so it is removed too
+        assert not os.path.exists(path)
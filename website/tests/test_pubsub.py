@@ -0,0 +1,203 @@
+from datetime import timedelta
+from unittest.mock import Mock
+
+import pytest
+from django.utils import timezone
+
+from calculator.models import OutboxMessage
+from website.pubsub import InMemoryBroker, PubSubBroker, Publisher
+
+
+@pytest.mark.django_db
+class TestPublisher:
+    def test_send_to_worker_adds_message_to_outbox(self):
+        publisher = Publisher()
+        publisher.send_to_worker({"type": "process_variant_list", "args": {}})
+
+        assert list(OutboxMessage.objects.values_list("message", flat=True)) == [
+            {"type": "process_variant_list", "args": {}}
+        ]
+
+    def test_send_to_worker_publishes_message_after_commit(
+        self, django_capture_on_commit_callbacks
+    ):
+        publisher = Publisher()
+        publisher.broker = InMemoryBroker()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            publisher.send_to_worker({"type": "process_variant_list", "args": {}})
+            assert not publisher.broker.published_messages
+
+        assert publisher.broker.published_messages == [
+            {"type": "process_variant_list", "args": {}}
+        ]
+        assert not OutboxMessage.objects.exists()
+
+    def test_send_to_worker_keeps_message_that_failed_to_publish_after_commit(
+        self, django_capture_on_commit_callbacks
+    ):
+        publisher = Publisher()
+        publisher.broker = Mock()
+        publisher.broker.publish_in_background.side_effect = (
+            lambda messages, callback: callback(0, RuntimeError("Timed out"))
+        )
+
+        with django_capture_on_commit_callbacks(execute=True):
+            publisher.send_to_worker({"type": "process_variant_list", "args": {}})
+
+        # left for the scheduled dispatch of the outbox
+        outbox_message = OutboxMessage.objects.get()
+        assert outbox_message.attempts == 1
+        assert outbox_message.last_error == "Timed out"
+        assert outbox_message.available_at > timezone.now()
+
+    def test_dispatch_outbox_publishes_messages_in_order(self):
+        publisher = Publisher()
+        publisher.broker = InMemoryBroker()
+
+        for i in range(3):
+            publisher.send_to_worker({"type": "process_variant_list", "args": {"i": i}})
+
+        assert publisher.dispatch_outbox(batch_size=2) == 2
+        assert publisher.dispatch_outbox(batch_size=2) == 1
+        assert publisher.dispatch_outbox(batch_size=2) == 0
+
+        published_messages = publisher.broker.published_messages
+        assert [message["args"]["i"] for message in published_messages] == [0, 1, 2]
+        assert not OutboxMessage.objects.exists()
+
+    def test_dispatch_outbox_backs_off_after_failed_publish(self):
+        publisher = Publisher()
+        publisher.broker = Mock()
+        publisher.broker.publish.side_effect = RuntimeError("Broker unavailable")
+
+        publisher.send_to_worker({"type": "process_variant_list", "args": {}})
+
+        assert publisher.dispatch_outbox() == 0
+
+        outbox_message = OutboxMessage.objects.get()
+        assert outbox_message.attempts == 1
+        assert outbox_message.last_error == "Broker unavailable"
+        assert outbox_message.available_at > timezone.now()
+
+        # not retried before the backoff has passed
+        assert publisher.dispatch_outbox() == 0
+        assert publisher.broker.publish.call_count == 1
+
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        publisher.broker = InMemoryBroker()
+        assert publisher.dispatch_outbox() == 1
+        assert not OutboxMessage.objects.exists()
+
+    def test_dispatch_outbox_only_retries_messages_that_failed_to_publish(self):
+        publisher = Publisher()
+        publisher.broker = Mock()
+        publisher.broker.publish.return_value = ["1", RuntimeError("Timed out"), "3"]
+
+        for i in range(3):
+            publisher.send_to_worker({"type": "process_variant_list", "args": {"i": i}})
+
+        assert publisher.dispatch_outbox() == 2
+
+        outbox_message = OutboxMessage.objects.get()
+        assert outbox_message.message["args"]["i"] == 1
+        assert outbox_message.attempts == 1
+        assert outbox_message.last_error == "Timed out"
+
+    def test_dispatch_outbox_skips_messages_claimed_by_another_dispatcher(self):
+        publisher = Publisher()
+        publisher.broker = InMemoryBroker()
+
+        outbox_message = publisher.send_to_worker(
+            {"type": "process_variant_list", "args": {}}
+        )
+
+        # claimed by a dispatcher that stopped before recording the result
+        publisher.broker.publish = Mock(side_effect=SystemExit)
+        with pytest.raises(SystemExit):
+            publisher.dispatch_outbox()
+
+        publisher.broker = InMemoryBroker()
+        assert publisher.dispatch_outbox() == 0
+
+        # published again once the claim has expired
+        OutboxMessage.objects.update(available_at=timezone.now() - timedelta(seconds=1))
+        assert publisher.dispatch_outbox(outbox_message_ids=[outbox_message.id]) == 1
+        assert not OutboxMessage.objects.exists()
+
+
+class TestPubSubBroker:
+    def test_publishes_messages_to_topic_for_lane(self, settings):
+        settings.GCP_PROJECT = "test-project"
+
+        broker = PubSubBroker()
+        broker.client = Mock()
+        broker.client.topic_path.side_effect = (
+            lambda project, topic: f"projects/{project}/topics/{topic}"
+        )
+
+        broker.publish(
+            [
+                {"type": "process_variant_list", "lane": "i", "args": {}},
+                {"type": "process_variant_list", "lane": "b", "args": {}},
+                {"type": "process_variant_list", "args": {}},
+            ]
+        )
+
+        assert [call.args[0] for call in broker.client.publish.call_args_list] == [
+            "projects/test-project/topics/worker-requests",
+            "projects/test-project/topics/worker-requests-bulk",
+            "projects/test-project/topics/worker-requests",
+        ]
+
+    def test_returns_errors_of_failed_publishes(self, settings):
+        settings.GCP_PROJECT = "test-project"
+
+        broker = PubSubBroker()
+        broker.client = Mock()
+        failed_future = Mock()
+        failed_future.result.side_effect = TimeoutError("Timed out")
+        published_future = Mock()
+        published_future.result.return_value = "message-id"
+        broker.client.publish.side_effect = [failed_future, published_future]
+
+        results = broker.publish(
+            [
+                {"type": "process_variant_list", "args": {}},
+                {"type": "process_variant_list", "args": {}},
+            ]
+        )
+
+        assert isinstance(results[0], TimeoutError)
+        assert results[1] == "message-id"
+
+    def test_publishes_messages_in_background(self, settings):
+        settings.GCP_PROJECT = "test-project"
+
+        broker = PubSubBroker()
+        broker.client = Mock()
+        failed_future = Mock()
+        failed_future.result.side_effect = TimeoutError("Timed out")
+        published_future = Mock()
+        published_future.result.return_value = "message-id"
+        broker.client.publish.side_effect = [failed_future, published_future]
+
+        callback = Mock()
+        broker.publish_in_background(
+            [
+                {"type": "process_variant_list", "args": {}},
+                {"type": "process_variant_list", "args": {}},
+            ],
+            callback,
+        )
+
+        # does not wait for the publishes
+        failed_future.result.assert_not_called()
+        published_future.result.assert_not_called()
+
+        published_future.add_done_callback.call_args.args[0](published_future)
+        failed_future.add_done_callback.call_args.args[0](failed_future)
+
+        assert callback.call_args_list[0].args == (1, "message-id")
+        assert callback.call_args_list[1].args[0] == 0
+        assert isinstance(callback.call_args_list[1].args[1], TimeoutError)
@@ -1,7 +1,17 @@
 # pylint: disable=too-many-lines
+import csv
+import gzip
+import importlib.util
+import io
+import json
+from pathlib import Path
+
+import pyarrow.parquet as pq
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from tests.views.mock_dashboard_model import RAW_CSV_DASHBOARD_MODEL_STRING
@@ -15,6 +25,14 @@ from calculator.models import (
 User = get_user_model()
 
 
+def load_data_pipelines_module(name):
+    path = Path(__file__).resolve().parents[3] / "data-pipelines" / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 @pytest.mark.django_db
 class TestDashboardListsLoadView:
     @pytest.fixture(autouse=True)
@@ -193,6 +211,60 @@ class TestDashboardListsLoadView:
             dashboard_list.representative_variant_list != rejected_representative_list
         )
 
+    def test_dashboard_load_accepts_parquet_files_written_by_pipelines(self, tmp_path):
+        pd = pytest.importorskip("pandas")
+        dashboard_files = load_data_pipelines_module("dashboard_files")
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="staffuser"))
+
+        gene_id_base = "ENSG00000187634"
+        df = pd.read_csv(
+            io.StringIO(
+                RAW_CSV_DASHBOARD_MODEL_STRING.replace("{gene_id_base}", gene_id_base)
+            )
+        )
+        # Genes without Orphanet data are left empty when prevalences are merged
+        df["genetic_prevalence_orphanet"] = float("nan")
+
+        parquet_path = tmp_path / "models.parquet"
+        dashboard_files.write_dashboard_file(df, parquet_path)
+
+        # Nested fields are stored as typed columns rather than JSON strings
+        schema = pq.read_schema(parquet_path)
+        assert schema.field("metadata").type == dashboard_files.METADATA_TYPE
+        assert (
+            schema.field("top_ten_variants").type.value_type
+            == dashboard_files.TOP_TEN_VARIANT_TYPE
+        )
+
+        mock_file = SimpleUploadedFile(
+            "test_load.parquet",
+            parquet_path.read_bytes(),
+            content_type="application/vnd.apache.parquet",
+        )
+
+        response = client.post(
+            "/api/dashboard-lists/load",
+            data={"csv_file": mock_file},
+            format="multipart",
+        )
+
+        assert response.status_code == 200
+
+        dashboard_list = DashboardList.objects.get(gene_id=gene_id_base)
+        assert dashboard_list.label == df["label"][0]
+        assert dashboard_list.genetic_prevalence_orphanet == ""
+
+        metadata = json.loads(df["metadata"][0])
+        assert {
+            key: metadata[key] for key in dashboard_list.metadata
+        } == dashboard_list.metadata
+        assert dashboard_list.variant_calculations == json.loads(
+            df["variant_calculations"][0]
+        )
+        assert dashboard_list.top_ten_variants == json.loads(df["top_ten_variants"][0])
+
     def test_dashboard_load_prefers_approved_representative_variant_list_with_conservative_in_the_title(
         self,
     ):
@@ -377,6 +449,8 @@ class TestDashboardListsBulkDeleteView:
 class TestDashboardListsView:
     @pytest.fixture(autouse=True)
     def db_setup(self):
+        cache.clear()
+
         User.objects.create(username="User 1")
         User.objects.create(username="staffuser", is_staff=True)
 
@@ -439,6 +513,218 @@ class TestDashboardListsView:
 
         assert response.status_code == 200
 
+    def test_getting_dashboard_lists_returns_an_etag(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/")
+        assert response.status_code == 200
+        assert response["ETag"]
+        assert response.json()[0]["gene_id"] == "ENSG00000094914"
+
+    def test_getting_dashboard_lists_with_a_matching_etag_returns_not_modified(self):
+        client = APIClient()
+        etag = client.get("/api/dashboard-lists/")["ETag"]
+
+        response = client.get("/api/dashboard-lists/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_getting_dashboard_lists_returns_precompressed_content(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/", HTTP_ACCEPT_ENCODING="gzip")
+        assert response.status_code == 200
+        assert response["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response["Vary"]
+        assert json.loads(gzip.decompress(response.content))[0]["gene_symbol"] == (
+            "AAAS"
+        )
+
+    def test_dashboard_lists_etag_changes_when_a_dashboard_list_changes(self):
+        client = APIClient()
+        etag = client.get("/api/dashboard-lists/")["ETag"]
+
+        DashboardList.objects.filter(gene_id="ENSG00000094914").first().delete()
+
+        response = client.get("/api/dashboard-lists/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response.json() == []
+
+    def test_dashboard_lists_etag_changes_when_a_dashboard_list_is_updated_in_the_database(
+        self,
+    ):
+        client = APIClient()
+        etag = client.get("/api/dashboard-lists/")["ETag"]
+
+        # as written by another process, without signals reaching this one
+        DashboardList.objects.filter(gene_id="ENSG00000094914").update(
+            inheritance_type="AD", updated_at=timezone.now()
+        )
+
+        response = client.get("/api/dashboard-lists/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+        assert response.json()[0]["inheritance_type"] == "AD"
+
+    def test_dashboard_lists_etag_does_not_change_for_other_variant_lists(self):
+        client = APIClient()
+        etag = client.get("/api/dashboard-lists/")["ETag"]
+
+        VariantList.objects.create(
+            label="List 1",
+            type=VariantList.Type.CUSTOM,
+            metadata={"gnomad_version": "4.1.0"},
+            variants=[],
+        )
+
+        response = client.get("/api/dashboard-lists/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_dashboard_lists_must_be_revalidated(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/")
+        assert "no-cache" in response["Cache-Control"]
+        assert "max-age" not in response["Cache-Control"]
+
+    @pytest.mark.parametrize(
+        "accept_encoding",
+        ["gzip;q=0", "gzip; q=0.0", "gzip;q=0.000, identity", "*;q=0"],
+    )
+    def test_dashboard_lists_are_not_compressed_with_refused_encodings(
+        self, accept_encoding
+    ):
+        client = APIClient()
+        response = client.get(
+            "/api/dashboard-lists/", HTTP_ACCEPT_ENCODING=accept_encoding
+        )
+        assert response.status_code == 200
+        assert "Content-Encoding" not in response
+        assert response.json()[0]["gene_symbol"] == "AAAS"
+
+    def create_dashboard_lists_with_summary_numbers(self):
+        for gene_id, symbol, inheritance_type, prevalence in [
+            ("ENSG00000000001", "GENEA", "AR", 2e-5),
+            ("ENSG00000000002", "GENEB", "AR", 5e-6),
+            ("ENSG00000000003", "GENEC", "AD", 3e-4),
+        ]:
+            DashboardList.objects.create(
+                gene_id=gene_id,
+                label=f"{symbol} - Dashboard",
+                created_at="2024-05-14T21:49:36.005507Z",
+                metadata={"gene_id": f"{gene_id}.1", "gene_symbol": symbol},
+                variant_calculations={
+                    "prevalence": [prevalence],
+                    "carrier_frequency": [prevalence * 2],
+                },
+                inheritance_type=inheritance_type,
+            )
+
+    def test_dashboard_lists_can_be_ordered_by_summary_numbers(self):
+        self.create_dashboard_lists_with_summary_numbers()
+
+        client = APIClient()
+        response = client.get(
+            "/api/dashboard-lists/", {"ordering": "-estimated_genetic_prevalence"}
+        )
+        assert response.status_code == 200
+        assert [
+            dashboard_list["gene_symbol"] for dashboard_list in response.json()
+        ] == [
+            "GENEC",
+            "GENEA",
+            "GENEB",
+            "AAAS",
+        ]
+
+    def test_dashboard_lists_can_be_filtered_by_summary_number_ranges(self):
+        self.create_dashboard_lists_with_summary_numbers()
+
+        client = APIClient()
+        response = client.get(
+            "/api/dashboard-lists/",
+            {
+                "estimated_genetic_prevalence__gt": "1e-5",
+                "aggregate_allele_frequency__lte": "1e-4",
+            },
+        )
+        assert response.status_code == 200
+        assert [
+            dashboard_list["gene_symbol"] for dashboard_list in response.json()
+        ] == ["GENEA"]
+
+    def test_dashboard_list_range_filters_must_be_numbers(self):
+        client = APIClient()
+        response = client.get(
+            "/api/dashboard-lists/", {"estimated_genetic_prevalence__gt": "high"}
+        )
+        assert response.status_code == 400
+
+    def test_dashboard_lists_can_be_filtered_by_inheritance_type(self):
+        self.create_dashboard_lists_with_summary_numbers()
+
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/", {"inheritance_type": "AD"})
+        assert response.status_code == 200
+        assert [
+            dashboard_list["gene_symbol"] for dashboard_list in response.json()
+        ] == ["GENEC"]
+
+    def test_dashboard_lists_can_be_paginated(self):
+        self.create_dashboard_lists_with_summary_numbers()
+
+        client = APIClient()
+        response = client.get(
+            "/api/dashboard-lists/",
+            {"ordering": "estimated_genetic_prevalence", "page_size": 2},
+        )
+        assert response.status_code == 200
+        first_page = response.json()
+        assert [
+            dashboard_list["gene_symbol"] for dashboard_list in first_page["results"]
+        ] == ["AAAS", "GENEB"]
+
+        response = client.get(first_page["next"])
+        assert response.status_code == 200
+        second_page = response.json()
+        assert [
+            dashboard_list["gene_symbol"] for dashboard_list in second_page["results"]
+        ] == ["GENEA", "GENEC"]
+        assert second_page["next"] is None
+
+    def test_paginated_dashboard_lists_include_lists_without_a_value(self):
+        self.create_dashboard_lists_with_summary_numbers()
+        for gene_id, incidence in [
+            ("ENSG00000000001", 1e-6),
+            ("ENSG00000000003", 4e-6),
+        ]:
+            DashboardList.objects.filter(gene_id=gene_id).update(
+                estimated_de_novo_incidence=incidence
+            )
+
+        client = APIClient()
+        pages = []
+        url = "/api/dashboard-lists/"
+        params = {"ordering": "-estimated_de_novo_incidence", "page_size": 1}
+        while url:
+            response = client.get(url, params)
+            assert response.status_code == 200
+            pages.append(
+                [
+                    dashboard_list["gene_symbol"]
+                    for dashboard_list in response.json()["results"]
+                ]
+            )
+            url = response.json()["next"]
+            params = None
+
+        # Lists without a value are last, in a stable order
+        assert pages == [["GENEC"], ["GENEA"], ["AAAS"], ["GENEB"]]
+
+        response = client.get(response.json()["previous"])
+        assert [
+            dashboard_list["gene_symbol"]
+            for dashboard_list in response.json()["results"]
+        ] == ["AAAS"]
+
     def test_getting_a_single_dashboard_list_does_not_require_authentication(self):
         client = APIClient()
         response = client.get("/api/dashboard-lists/ENSG00000094914/")
@@ -456,6 +742,108 @@ class TestDashboardListsView:
         assert response.status_code == 200
 
 
+@pytest.mark.django_db
+class TestDashboardListsExportView:
+    @pytest.fixture(autouse=True)
+    def db_setup(self, settings, tmp_path):
+        cache.clear()
+        settings.DASHBOARD_EXPORT_CACHE_DIR = str(tmp_path)
+
+        for gene_id, symbol in [
+            ("ENSG00000000002", "GENEB"),
+            ("ENSG00000000001", "GENEA"),
+        ]:
+            DashboardList.objects.create(
+                gene_id=gene_id,
+                label=f"{symbol} - Dashboard",
+                created_at="2024-05-14T21:49:36.005507Z",
+                metadata={
+                    "gnomad_version": "4.1.0",
+                    "reference_genome": "GRCh38",
+                    "gene_id": f"{gene_id}.1",
+                    "gene_symbol": symbol,
+                    "transcript_id": "ENST00000000001.1",
+                    "clinvar_version": "2024-04-21",
+                    "include_clinvar_clinical_significance": [
+                        "pathogenic_or_likely_pathogenic"
+                    ],
+                },
+                variant_calculations={
+                    "prevalence": [1e-5] * 10,
+                    "carrier_frequency": [4e-3] * 10,
+                    "total_allele_frequency": [2e-3] * 10,
+                    "variant_count": 3,
+                },
+                inheritance_type="AR",
+                top_ten_variants=[
+                    {
+                        "id": "1-55051215-G-GA",
+                        "major_consequence": "frameshift_variant",
+                        "hgvsc": "c.1A>G",
+                        "hgvsp": "p.Met1?",
+                        "lof": "HC",
+                        "clinical_significance": ["Pathogenic"],
+                        "clinvar_variation_id": "12345",
+                        "AC": [4],
+                        "AN": [1000],
+                        "source": ["gnomAD", "ClinVar"],
+                        "flags": [],
+                    }
+                ],
+            )
+
+    def test_exporting_dashboard_lists_does_not_require_authentication(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/export", {"format": "csv"})
+        assert response.status_code == 200
+
+    def test_export_errors_are_rendered_as_messages(self):
+        client = APIClient()
+        response = client.post("/api/dashboard-lists/export?format=csv")
+        assert response.status_code == 403
+        assert response.content == b"Authentication credentials were not provided."
+
+    def test_exporting_dashboard_lists_as_csv(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/export", {"format": "csv"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+        assert response.streaming
+
+        rows = list(
+            csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode()))
+        )
+        assert [row["gene_symbol"] for row in rows] == ["GENEA", "GENEB"]
+        assert rows[0]["inheritance_type"] == "Autosomal recessive"
+        assert rows[0]["genetic_prevalence_total"] == "1e-05"
+        assert rows[0]["variant_1_allele_frequency"] == "4.00e-03"
+        assert rows[0]["variant_1_source"] == "gnomAD, ClinVar"
+
+    def test_exporting_dashboard_lists_as_parquet(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/export", {"format": "parquet"})
+        assert response.status_code == 200
+
+        table = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+        assert table.column("gene_symbol").to_pylist() == ["GENEA", "GENEB"]
+        assert table.column("variant_1_allele_count").to_pylist() == [4, 4]
+
+    def test_dashboard_lists_export_is_cached_until_data_changes(self):
+        client = APIClient()
+        response = client.get("/api/dashboard-lists/export", {"format": "csv"})
+        b"".join(response.streaming_content)
+
+        response = client.get("/api/dashboard-lists/export", {"format": "csv"})
+        assert b"GENEB" in b"".join(response.streaming_content)
+        assert response["Content-Disposition"].startswith("attachment")
+        response.close()
+
+        DashboardList.objects.get(gene_id="ENSG00000000002").delete()
+
+        response = client.get("/api/dashboard-lists/export", {"format": "csv"})
+        assert b"GENEB" not in b"".join(response.streaming_content)
+
+
 @pytest.mark.django_db
 class TestDashboardListView:
     @pytest.fixture(autouse=True)
@@ -0,0 +1,110 @@
+import pytest
+from rest_framework.test import APIClient
+
+from calculator.models import DashboardList, GeneSearchTerm, VariantList
+
+
+@pytest.mark.django_db
+class TestGeneSearchView:
+    @pytest.fixture(autouse=True)
+    def db_setup(self):
+        for gene_id, symbol, alias_symbols in [
+            ("ENSG00000169174", "PCSK9", ["FH3", "NARC1"]),
+            ("ENSG00000124216", "SNAI1", []),
+            ("ENSG00000099194", "SCD", ["FADS5"]),
+        ]:
+            DashboardList.objects.create(
+                gene_id=gene_id,
+                label=f"{symbol} - Dashboard",
+                created_at="2024-05-14T21:49:36.005507Z",
+                metadata={
+                    "gene_id": f"{gene_id}.1",
+                    "gene_symbol": symbol,
+                    "alias_symbols": alias_symbols,
+                },
+                inheritance_type="AR",
+            )
+
+        VariantList.objects.create(
+            label="PCSK9 public list",
+            type=VariantList.Type.CUSTOM,
+            metadata={
+                "version": "2",
+                "gnomad_version": "4.1.0",
+                "gene_id": "ENSG00000169174.1",
+                "gene_symbol": "PCSK9",
+            },
+            is_public=True,
+        )
+
+        VariantList.objects.create(
+            label="PCSK9 private list",
+            type=VariantList.Type.CUSTOM,
+            metadata={
+                "version": "2",
+                "gnomad_version": "4.1.0",
+                "gene_id": "ENSG00000169174.1",
+                "gene_symbol": "PCSK9",
+            },
+        )
+
+    def test_gene_search_does_not_require_authentication(self):
+        client = APIClient()
+        response = client.get("/api/gene-search/", {"q": "pcsk"})
+        assert response.status_code == 200
+
+    def test_gene_search_requires_a_query(self):
+        client = APIClient()
+        response = client.get("/api/gene-search/")
+        assert response.status_code == 400
+
+    @pytest.mark.parametrize(
+        "query,expected_gene_symbols",
+        [
+            ("PCSK9", ["PCSK9"]),
+            ("pcs", ["PCSK9"]),
+            ("narc", ["PCSK9"]),
+            ("ENSG00000124216", ["SNAI1"]),
+            ("s", ["SCD", "SNAI1"]),
+            ("fads5", ["SCD"]),
+            ("BRCA", []),
+        ],
+    )
+    def test_gene_search_matches_prefixes_case_insensitively(
+        self, query, expected_gene_symbols
+    ):
+        client = APIClient()
+        response = client.get("/api/gene-search/", {"q": query})
+        assert response.status_code == 200
+        assert [
+            dashboard_list["gene_symbol"]
+            for dashboard_list in response.json()["dashboard_lists"]
+        ] == expected_gene_symbols
+
+    def test_gene_search_returns_only_public_variant_lists(self):
+        client = APIClient()
+        response = client.get("/api/gene-search/", {"q": "pcsk9"})
+        assert [
+            variant_list["label"] for variant_list in response.json()["variant_lists"]
+        ] == ["PCSK9 public list"]
+
+    def test_gene_search_limits_number_of_results(self):
+        client = APIClient()
+        response = client.get("/api/gene-search/", {"q": "s", "limit": 1})
+        assert [
+            dashboard_list["gene_symbol"]
+            for dashboard_list in response.json()["dashboard_lists"]
+        ] == ["SCD"]
+
+    def test_gene_search_index_is_updated_when_lists_change(self):
+        dashboard_list = DashboardList.objects.get(gene_id="ENSG00000124216")
+        dashboard_list.label = "Renamed - Dashboard"
+        dashboard_list.save()
+
+        variant_list = VariantList.objects.get(label="PCSK9 public list")
+        variant_list.is_public = False
+        variant_list.save()
+
+        assert not GeneSearchTerm.objects.filter(term="snai1 - dashboard").exists()
+        assert GeneSearchTerm.objects.filter(term="renamed - dashboard").exists()
+        assert not GeneSearchTerm.objects.filter(variant_list=variant_list).exists()
@@ -0,0 +1,101 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from calculator.models import OutboxMessage, VariantList
+
+SCHEDULER_TOKEN_INFO = {
+    "email": "scheduler@test-project.iam.gserviceaccount.com",
+    "email_verified": True,
+}
+
+
+@pytest.mark.django_db
+class TestDispatchOutbox:
+    @pytest.fixture(autouse=True)
+    def scheduler_settings(self, settings):
+        settings.SCHEDULER_SERVICE_ACCOUNT = (
+            "scheduler@test-project.iam.gserviceaccount.com"
+        )
+        settings.SCHEDULER_AUDIENCE = "https://example.com"
+
+    def test_requires_scheduler_token(self):
+        OutboxMessage.objects.create(message={"type": "process_variant_list"})
+
+        client = APIClient()
+        response = client.post("/api/tasks/dispatch-outbox/")
+        assert response.status_code == 403
+
+        with patch(
+            "website.permissions.id_token.verify_oauth2_token",
+            return_value={"email": "someone@example.com", "email_verified": True},
+        ):
+            response = client.post(
+                "/api/tasks/dispatch-outbox/", HTTP_AUTHORIZATION="Bearer token"
+            )
+            assert response.status_code == 403
+
+        assert OutboxMessage.objects.count() == 1
+
+    def test_publishes_outbox_messages(self):
+        OutboxMessage.objects.create(message={"type": "process_variant_list"})
+
+        client = APIClient()
+        with patch(
+            "website.permissions.id_token.verify_oauth2_token",
+            return_value=SCHEDULER_TOKEN_INFO,
+        ):
+            response = client.post(
+                "/api/tasks/dispatch-outbox/", HTTP_AUTHORIZATION="Bearer token"
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"num_published": 1}
+        assert not OutboxMessage.objects.exists()
+
+
+@pytest.mark.django_db
+class TestRequeueStuckVariantLists:
+    @pytest.fixture(autouse=True)
+    def scheduler_settings(self, settings):
+        settings.SCHEDULER_SERVICE_ACCOUNT = (
+            "scheduler@test-project.iam.gserviceaccount.com"
+        )
+        settings.SCHEDULER_AUDIENCE = "https://example.com"
+
+    def test_requires_scheduler_token(self):
+        client = APIClient()
+        response = client.post("/api/tasks/requeue-stuck-variant-lists/")
+        assert response.status_code == 403
+
+    def test_requeues_stuck_variant_lists(self):
+        variant_list = VariantList.objects.create(
+            label="Stuck",
+            type=VariantList.Type.CUSTOM,
+            metadata={"version": "2", "gnomad_version": "4.1.0"},
+            variants=["1-55516888-G-GA"],
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            lease_expires_at=timezone.now() - timedelta(minutes=1),
+            processing_attempts=1,
+        )
+
+        client = APIClient()
+        with patch(
+            "website.permissions.id_token.verify_oauth2_token",
+            return_value=SCHEDULER_TOKEN_INFO,
+        ):
+            response = client.post(
+                "/api/tasks/requeue-stuck-variant-lists/",
+                HTTP_AUTHORIZATION="Bearer token",
+            )
+
+        assert response.status_code == 200
+        assert response.json() == {"num_requeued": 1, "num_errored": 0}
+
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.QUEUED
+        assert OutboxMessage.objects.count() == 1
@@ -1,5 +1,8 @@
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from calculator.models import VariantList
@@ -58,3 +61,118 @@ class TestGetSystemStatus:
             "Ready": 2,
             "Error": 1,
         }
+
+    def test_returns_number_of_coalesced_and_dropped_jobs(self):
+        VariantList.objects.filter(status=VariantList.Status.READY).update(
+            num_coalesced_jobs=2, num_dropped_jobs=1
+        )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="staffmember"))
+        status = client.get("/api/status/").json()
+
+        assert status["jobs"] == {"coalesced": 4, "dropped": 2}
+
+    def test_returns_latency_percentiles_by_gnomad_version(self):
+        now = timezone.now()
+        for minutes in (1, 2, 3):
+            VariantList.objects.create(
+                label="Finished list",
+                type=VariantList.Type.CUSTOM,
+                metadata={"version": "2", "gnomad_version": "4.1.0"},
+                variants=[{"id": "1-55516888-G-GA"}],
+                status=VariantList.Status.READY,
+                queued_at=now - timedelta(minutes=minutes + 10),
+                started_at=now - timedelta(minutes=minutes),
+                finished_at=now,
+            )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="staffmember"))
+        status = client.get("/api/status/", {"window": "1d"}).json()
+
+        assert status["latency"] == {
+            "window": "1d",
+            "sample_size": 10_000,
+            "by_gnomad_version": {
+                "4.1.0": {
+                    "num_variant_lists": 3,
+                    "num_retried": 0,
+                    "num_sampled": 3,
+                    "queue_wait": {"p50": 600, "p90": 600, "p99": 600},
+                    "processing_time": {"p50": 120, "p90": 180, "p99": 180},
+                }
+            },
+        }
+
+    def test_computes_latency_percentiles_from_most_recent_lists(self, monkeypatch):
+        monkeypatch.setattr("website.views.system_status_views.LATENCY_SAMPLE_SIZE", 2)
+
+        now = timezone.now()
+        for minutes in (1, 2, 3):
+            VariantList.objects.create(
+                label="Finished list",
+                type=VariantList.Type.CUSTOM,
+                metadata={"version": "2", "gnomad_version": "4.1.0"},
+                variants=[{"id": "1-55516888-G-GA"}],
+                status=VariantList.Status.READY,
+                started_at=now - timedelta(minutes=minutes * 10),
+                finished_at=now - timedelta(minutes=minutes),
+                processing_attempts=minutes,
+            )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="staffmember"))
+        status = client.get("/api/status/", {"window": "1d"}).json()
+
+        latency = status["latency"]["by_gnomad_version"]["4.1.0"]
+        assert latency["num_variant_lists"] == 3
+        assert latency["num_retried"] == 2
+        assert latency["num_sampled"] == 2
+        assert latency["queue_wait"] is None
+        assert latency["processing_time"] == {"p50": 540, "p90": 1080, "p99": 1080}
+
+    def test_rejects_invalid_latency_window(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="staffmember"))
+        response = client.get("/api/status/", {"window": "1y"})
+        assert response.status_code == 400
+
+    def test_returns_errors_grouped_by_signature(self):
+        VariantList.objects.filter(status=VariantList.Status.ERROR).delete()
+
+        for i in range(3):
+            VariantList.objects.create(
+                label=f"Failed list {i}",
+                type=VariantList.Type.CUSTOM,
+                metadata={"version": "2", "gnomad_version": "4.1.0"},
+                variants=[{"id": "1-55516888-G-GA"}],
+                status=VariantList.Status.ERROR,
+                error=(
+                    "Traceback (most recent call last):\n"
+                    f'  File "/app/worker/tasks.py", line {100 + i}, in process\n'
+                    f"KeyError: 'variant-{i}'"
+                ),
+            )
+
+        VariantList.objects.create(
+            label="Other failed list",
+            type=VariantList.Type.CUSTOM,
+            metadata={"version": "2", "gnomad_version": "4.1.0"},
+            variants=[{"id": "1-55516888-G-GA"}],
+            status=VariantList.Status.ERROR,
+            error="RuntimeError: Connection refused",
+        )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="staffmember"))
+        errors = client.get("/api/status/").json()["errors"]
+
+        assert errors["count"] == 2
+        assert [
+            (group["signature"], group["count"]) for group in errors["results"]
+        ] == [
+            ("tasks.py in process: KeyError: '...'", 3),
+            ("RuntimeError: Connection refused", 1),
+        ]
+        assert len(errors["results"][0]["variant_lists"]) == 3
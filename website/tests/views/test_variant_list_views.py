@@ -1,7 +1,12 @@
 # pylint: disable=too-many-lines
+from datetime import timedelta
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 
 from calculator.models import (
@@ -216,7 +221,11 @@ class TestCreateVariantList:
         variant_list = VariantList.objects.get(uuid=response["uuid"])
 
         send_to_worker.assert_called_once_with(
-            {"type": "process_variant_list", "args": {"uuid": str(variant_list.uuid)}}
+            {
+                "type": "process_variant_list",
+                "lane": "i",
+                "args": {"uuid": str(variant_list.uuid), "generation": 1},
+            }
         )
 
     @pytest.mark.django_db
@@ -297,6 +306,86 @@ class TestCreateVariantList:
         assert response.status_code == 201
         assert VariantList.objects.count() == 4
 
+    @pytest.mark.django_db
+    def test_response_includes_estimated_completion_time(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="testuser"))
+        response = client.post(
+            "/api/variant-lists/",
+            {
+                "label": "A variant list",
+                "type": VariantList.Type.CUSTOM,
+                "metadata": {
+                    "gnomad_version": "2.1.1",
+                },
+                "variants": [{"id": "1-55516888-G-GA"}],
+            },
+            format="json",
+        )
+
+        assert response.status_code == 201
+        assert response.json()["estimated_completion_time"]
+
+    @pytest.mark.django_db
+    @override_settings(MAX_QUEUED_VARIANT_LISTS_PER_USER=2)
+    def test_user_is_allowed_a_limited_number_of_queued_variant_lists(self):
+        client = APIClient()
+        testuser = User.objects.get(username="testuser")
+        client.force_authenticate(testuser)
+
+        def create_variant_list():
+            return client.post(
+                "/api/variant-lists/",
+                {
+                    "label": "A variant list",
+                    "type": VariantList.Type.CUSTOM,
+                    "metadata": {
+                        "gnomad_version": "2.1.1",
+                    },
+                    "variants": [{"id": "1-55516888-G-GA"}],
+                },
+                format="json",
+            )
+
+        for _ in range(2):
+            assert create_variant_list().status_code == 201
+
+        response = create_variant_list()
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        assert VariantList.objects.count() == 2
+
+        VariantList.objects.update(status=VariantList.Status.READY)
+        assert create_variant_list().status_code == 201
+
+    @pytest.mark.django_db
+    @override_settings(MAX_QUEUED_VARIANT_LISTS=1)
+    def test_variant_lists_are_rejected_when_queue_is_full(self):
+        VariantList.objects.create(
+            label="Queued list",
+            type=VariantList.Type.CUSTOM,
+            metadata={"version": "2", "gnomad_version": "4.1.0"},
+            variants=[{"id": "1-55516888-G-GA"}],
+        )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="testuser"))
+        response = client.post(
+            "/api/variant-lists/",
+            {
+                "label": "A variant list",
+                "type": VariantList.Type.CUSTOM,
+                "metadata": {
+                    "gnomad_version": "2.1.1",
+                },
+                "variants": [{"id": "1-55516888-G-GA"}],
+            },
+            format="json",
+        )
+
+        assert response.status_code == 429
+        assert response.has_header("Retry-After")
+
 
 @pytest.mark.django_db
 class TestGetVariantList:
@@ -920,9 +1009,55 @@ class TestProcessVariantList:
         client.post(f"/api/variant-lists/{variant_list.uuid}/process/")
 
         send_to_worker.assert_called_once_with(
-            {"type": "process_variant_list", "args": {"uuid": str(variant_list.uuid)}}
+            {
+                "type": "process_variant_list",
+                "lane": "i",
+                "args": {"uuid": str(variant_list.uuid), "generation": 1},
+            }
         )
 
+    def test_process_variant_list_does_not_requeue_list_being_processed(
+        self, send_to_worker
+    ):
+        variant_list = VariantList.objects.get(id=1)
+        VariantList.objects.filter(id=variant_list.id).update(
+            status=VariantList.Status.PROCESSING,
+            lease_owner="worker-1",
+            lease_expires_at=timezone.now() + timedelta(minutes=5),
+            job_generation=1,
+            started_generation=1,
+        )
+
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="owner"))
+        response = client.post(f"/api/variant-lists/{variant_list.uuid}/process/")
+        assert response.status_code == 200
+
+        # The worker processing the list requeues it when it sees the new generation
+        send_to_worker.assert_not_called()
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.PROCESSING
+        assert variant_list.lease_owner == "worker-1"
+        assert variant_list.job_generation == 2
+
+    def test_process_variant_list_does_not_rewrite_variants(self):
+        variant_list = VariantList.objects.get(id=1)
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username="owner"))
+
+        with CaptureQueriesContext(connection) as queries:
+            client.post(f"/api/variant-lists/{variant_list.uuid}/process/")
+
+        updates = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "calculator_variantlist"')
+        ]
+        assert updates
+        for update in updates:
+            assert '"variants"' not in update
+            assert '"structural_variants"' not in update
+
     def test_process_variant_list_marks_variant_list_as_queued(self):
         variant_list = VariantList.objects.get(id=1)
         assert variant_list.status == VariantList.Status.READY
@@ -934,6 +1069,23 @@ class TestProcessVariantList:
         variant_list.refresh_from_db()
         assert variant_list.status == VariantList.Status.QUEUED
 
+    @pytest.mark.parametrize(
+        "user,expected_lane", [("staffmember", "b"), ("owner", "i")]
+    )
+    def test_staff_can_reprocess_variant_list_in_bulk_lane(
+        self, user, expected_lane, send_to_worker
+    ):
+        variant_list = VariantList.objects.get(id=1)
+        client = APIClient()
+        client.force_authenticate(User.objects.get(username=user))
+        client.post(
+            f"/api/variant-lists/{variant_list.uuid}/process/",
+            {"bulk": True},
+            format="json",
+        )
+
+        assert send_to_worker.call_args.args[0]["lane"] == expected_lane
+
 
 @pytest.mark.django_db
 class TestVariantListVariantsView:
@@ -1075,7 +1227,11 @@ class TestVariantListVariantsView:
         )
 
         send_to_worker.assert_called_once_with(
-            {"type": "process_variant_list", "args": {"uuid": str(variant_list.uuid)}}
+            {
+                "type": "process_variant_list",
+                "lane": "i",
+                "args": {"uuid": str(variant_list.uuid), "generation": 1},
+            }
         )
 
     def test_variant_list_variants_marks_variant_list_as_queued(self):
@@ -11,6 +11,7 @@ class WorkerConfig(AppConfig):
             initialize_hail,
             exit_after_job_finished,
         )
+        from .warmup import start_warm_up  # pylint: disable=import-outside-toplevel
 
         # Always terminate the current worker after a job
         #   Current working theory about many queue'd requests causing crashes is
@@ -19,3 +20,4 @@ class WorkerConfig(AppConfig):
         request_finished.connect(exit_after_job_finished)
 
         initialize_hail()
+        start_warm_up()
@@ -0,0 +1,167 @@
+"""
+Database backed job queue.
+
+Workers claim queued variant lists with SELECT ... FOR UPDATE SKIP LOCKED, so any
+number of workers can pull from the queue without claiming the same list twice.
+A claimed list is leased to the worker, which extends the lease with heartbeats
+while it processes the list.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Func, IntegerField, Value
+from django.db.models.functions import Coalesce
+
+from calculator.models import VariantList
+
+from .lanes import LANE_PRIORITY, get_num_free_slots
+from .leases import LeaseHeartbeat, get_lease_expiration, get_worker_id, release_lease
+from .tasks import run_variant_list_job
+
+
+logger = logging.getLogger(__name__)
+
+
+# Columns read when claiming jobs. Variants, which can be several megabytes, are
+#   counted by the database and only loaded once the job is processed, so that
+#   the claim does not read them while holding row locks.
+CLAIM_FIELDS = (
+    "id",
+    "uuid",
+    "type",
+    "status",
+    "lane",
+    "metadata",
+    "processing_attempts",
+    "job_generation",
+    "started_generation",
+    "lease_owner",
+    "lease_expires_at",
+    "updated_at",
+)
+
+
+class JSONArrayLength(Func):
+    function = "json_array_length"
+    output_field = IntegerField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, function="jsonb_array_length", **extra_context
+        )
+
+
+def is_small_job(variant_list):
+    """Check whether a list claimed with its number of variants annotated is small."""
+    metadata = variant_list.metadata or {}
+    if metadata.get("include_gnomad_plof") or metadata.get(
+        "include_clinvar_clinical_significance"
+    ):
+        return False
+
+    return variant_list.num_variants <= settings.JOB_QUEUE_SMALL_JOB_MAX_VARIANTS
+
+
+def claim_jobs(worker_id, max_jobs=None, lanes=None):
+    """
+    Claim the oldest queued variant list from the highest priority lane that has
+    queued jobs and is not at its concurrency limit. If it is a small job, also
+    claim other small jobs queued in that lane, up to max_jobs in total.
+
+    lanes restricts the lanes that jobs are claimed from.
+    """
+    max_jobs = max_jobs or settings.JOB_QUEUE_MAX_JOBS_PER_CLAIM
+
+    with transaction.atomic():
+        candidates = []
+        for lane in LANE_PRIORITY:
+            if lanes and lane not in lanes:
+                continue
+
+            num_free_slots = get_num_free_slots(lane)
+            if num_free_slots == 0:
+                continue
+
+            candidates = list(
+                VariantList.objects.select_for_update(skip_locked=True)
+                .filter(status=VariantList.Status.QUEUED, lane=lane)
+                .only(*CLAIM_FIELDS)
+                .annotate(
+                    num_variants=Coalesce(JSONArrayLength("variants"), Value(0))
+                    + Coalesce(JSONArrayLength("structural_variants"), Value(0))
+                )
+                .order_by("updated_at", "id")[
+                    : min(max_jobs, num_free_slots or max_jobs)
+                ]
+            )
+            if candidates:
+                break
+
+        if not candidates:
+            return []
+
+        claimed = [candidates[0]]
+        if is_small_job(candidates[0]):
+            claimed.extend(
+                candidate for candidate in candidates[1:] if is_small_job(candidate)
+            )
+
+        lease_expires_at = get_lease_expiration()
+        VariantList.objects.filter(
+            id__in=[variant_list.id for variant_list in claimed]
+        ).update(
+            status=VariantList.Status.PROCESSING,
+            lease_owner=worker_id,
+            lease_expires_at=lease_expires_at,
+            processing_attempts=F("processing_attempts") + 1,
+            started_generation=F("job_generation"),
+        )
+
+    for variant_list in claimed:
+        variant_list.status = VariantList.Status.PROCESSING
+        variant_list.lease_owner = worker_id
+        variant_list.lease_expires_at = lease_expires_at
+        variant_list.started_generation = variant_list.job_generation
+
+    return claimed
+
+
+def run_queued_jobs(worker_id=None, max_jobs=None, lanes=None):
+    """
+    Claim and process one batch of queued variant lists.
+
+    Returns the number of variant lists processed.
+    """
+    worker_id = worker_id or get_worker_id()
+
+    variant_lists = claim_jobs(worker_id, max_jobs=max_jobs, lanes=lanes)
+    if not variant_lists:
+        return 0
+
+    logger.info(
+        "Claimed %d variant list(s): %s",
+        len(variant_lists),
+        ", ".join(str(variant_list.uuid) for variant_list in variant_lists),
+    )
+
+    # Index of the next job to start. Jobs before it have been started.
+    next_job_index = 0
+    with LeaseHeartbeat(
+        worker_id, [variant_list.id for variant_list in variant_lists]
+    ) as heartbeat:
+        try:
+            while next_job_index < len(variant_lists):
+                variant_list = variant_lists[next_job_index]
+                next_job_index += 1
+                run_variant_list_job(variant_list)
+                heartbeat.remove(variant_list.id)
+                release_lease(worker_id, variant_list)
+        finally:
+            # Return jobs that were not started to the queue if this worker has
+            #   to stop. A job that was started keeps its lease, which expires.
+            for variant_list in variant_lists[next_job_index:]:
+                release_lease(worker_id, variant_list, requeue=True)
+
+    return len(variant_lists)
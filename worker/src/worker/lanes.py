@@ -0,0 +1,81 @@
+"""
+Concurrency limits for job lanes.
+
+Variant lists are routed to a lane by the estimated cost of processing them.
+Interactive jobs are always started first and are not limited. Large and bulk
+jobs are limited to a number of jobs in progress across all workers, so that
+they cannot take up every worker while interactive jobs are waiting.
+"""
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from calculator.models import VariantList
+
+
+# Lanes in the order that queued jobs are claimed in
+LANE_PRIORITY = (
+    VariantList.Lane.INTERACTIVE,
+    VariantList.Lane.LARGE,
+    VariantList.Lane.BULK,
+)
+
+
+# Namespace of the advisory locks taken on limited lanes
+LANE_LOCK_NAMESPACE = 34
+
+
+class LaneAtCapacityError(Exception):
+    pass
+
+
+def get_lane_concurrency_limit(lane):
+    return {
+        VariantList.Lane.LARGE: settings.JOB_QUEUE_MAX_LARGE_JOBS,
+        VariantList.Lane.BULK: settings.JOB_QUEUE_MAX_BULK_JOBS,
+    }.get(lane)
+
+
+def get_num_running_jobs(lane, exclude_id=None):
+    running_jobs = VariantList.objects.filter(
+        lane=lane,
+        status=VariantList.Status.PROCESSING,
+        lease_expires_at__gt=timezone.now(),
+    )
+    if exclude_id is not None:
+        running_jobs = running_jobs.exclude(id=exclude_id)
+
+    return running_jobs.count()
+
+
+def lock_lane(lane):
+    """
+    Take a lock on a lane until the current transaction ends.
+
+    Running jobs are counted and new jobs started while holding the lock, so that
+    workers starting jobs at the same time cannot each see the same free slot
+    and exceed the lane's limit. Other databases, such as SQLite in tests, are
+    expected to serialize these transactions themselves.
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(%s, %s)", [LANE_LOCK_NAMESPACE, ord(lane)]
+            )
+
+
+def get_num_free_slots(lane, exclude_id=None):
+    """
+    Return the number of jobs that can be started in a lane, or None if the lane
+    is not limited.
+
+    Must be called in the transaction that starts the jobs, which holds the
+    lane's lock until it ends.
+    """
+    limit = get_lane_concurrency_limit(lane)
+    if limit is None:
+        return None
+
+    lock_lane(lane)
+    return max(limit - get_num_running_jobs(lane, exclude_id=exclude_id), 0)
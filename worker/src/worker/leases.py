@@ -0,0 +1,86 @@
+"""
+Leases on variant lists being processed by a worker.
+
+A worker holds a lease on each variant list it is processing and extends it with
+periodic heartbeats. A PROCESSING list whose lease has expired was abandoned by
+its worker and can be requeued.
+"""
+
+import logging
+import os
+import socket
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from calculator.models import VariantList
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def get_lease_expiration():
+    return timezone.now() + timedelta(seconds=settings.JOB_QUEUE_LEASE_IN_SECONDS)
+
+
+def extend_leases(worker_id, variant_list_ids):
+    return VariantList.objects.filter(
+        id__in=variant_list_ids, lease_owner=worker_id
+    ).update(lease_expires_at=get_lease_expiration())
+
+
+def release_lease(worker_id, variant_list, requeue=False):
+    updates = {"lease_owner": None, "lease_expires_at": None}
+    if requeue:
+        # processing was never started, so this does not count as an attempt
+        updates["status"] = VariantList.Status.QUEUED
+        updates["processing_attempts"] = F("processing_attempts") - 1
+
+    VariantList.objects.filter(id=variant_list.id, lease_owner=worker_id).update(
+        **updates
+    )
+
+
+class LeaseHeartbeat:
+    """Extends the leases on a set of variant lists until stopped."""
+
+    def __init__(self, worker_id, variant_list_ids):
+        self.worker_id = worker_id
+        self.variant_list_ids = set(variant_list_ids)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="job-queue-heartbeat", daemon=True
+        )
+
+    def _run(self):
+        try:
+            while not self._stopped.wait(
+                settings.JOB_QUEUE_HEARTBEAT_INTERVAL_IN_SECONDS
+            ):
+                try:
+                    extend_leases(self.worker_id, list(self.variant_list_ids))
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception("Failed to extend job leases")
+        finally:
+            # Each thread has its own database connection, which Django only
+            #   closes for request threads
+            connection.close()
+
+    def remove(self, variant_list_id):
+        self.variant_list_ids.discard(variant_list_id)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._stopped.set()
+        self._thread.join()
@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from calculator.models import VariantList
+from worker.job_queue import get_worker_id, run_queued_jobs
+from worker.warmup import is_ready, wait_for_warm_up
+
+
+class Command(BaseCommand):
+    help = "Claim and process queued variant lists from the database job queue"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit after processing one batch of jobs (or finding none)",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Maximum number of small jobs to claim at once",
+        )
+        parser.add_argument(
+            "--lane",
+            action="append",
+            dest="lanes",
+            choices=[lane.label.lower() for lane in VariantList.Lane],
+            help="Only process jobs in this lane (can be repeated)",
+        )
+
+    def handle(self, *args, **options):
+        worker_id = get_worker_id()
+
+        lanes = None
+        if options["lanes"]:
+            lanes = [
+                lane
+                for lane in VariantList.Lane
+                if lane.label.lower() in options["lanes"]
+            ]
+
+        # Claim jobs only once warm, so that they do not wait for warm-up
+        wait_for_warm_up()
+        if not is_ready():
+            self.stderr.write("Warm-up failed, processing jobs without it")
+
+        self.stdout.write(f"Processing job queue as {worker_id}")
+
+        while True:
+            num_processed = run_queued_jobs(
+                worker_id, max_jobs=options["max_jobs"], lanes=lanes
+            )
+
+            if options["once"]:
+                break
+
+            if not num_processed:
+                time.sleep(settings.JOB_QUEUE_POLL_INTERVAL_IN_SECONDS)
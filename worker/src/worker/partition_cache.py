@@ -0,0 +1,485 @@
+"""
+Local disk cache of Hail table partitions.
+
+Reference tables are stored in object storage, so every job fetches the
+partitions that it reads from the bucket, even for genes that are requested
+often. The cache keeps a sparse copy of each table on local disk. A table's
+metadata and globals are copied in full when the table is first opened, and its
+row partitions and their indexes are copied when a job first reads from them.
+Hail only reads the partitions that overlap the intervals a table is filtered
+to, so filtering the local copy to intervals whose partitions have been fetched
+never reads from the bucket.
+
+Partitions are evicted in least recently used order once the cache grows past
+its size limit. Hail reads tables lazily, so partitions handed out while a job
+is running are pinned until the job finishes, and are not evicted while a later
+table read in the same job is being prepared. The local copy of a table is
+discarded if the table's metadata in the bucket has changed since it was copied.
+
+Files are copied from the bucket without holding the cache's lock, so jobs that
+only read cached partitions are not blocked by another job's copies.
+"""
+
+import collections
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import uuid
+
+import hailtop.fs as hfs
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# Files that identify a version of a table. The local copy of a table is
+#   discarded if any of them differ from the table in the bucket.
+TABLE_METADATA_FILES = ["metadata.json.gz", "rows/metadata.json.gz"]
+
+# Directories holding row partitions and their indexes, which are copied lazily
+PARTITION_DIRECTORIES = ["rows/parts", "index"]
+
+FINGERPRINT_FILE = ".fingerprint"
+
+
+def join_path(*parts):
+    return "/".join(part.rstrip("/") for part in parts)
+
+
+def get_basename(path):
+    return path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def get_directory_size(path):
+    return sum(
+        os.path.getsize(os.path.join(directory, filename))
+        for directory, _, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+class CachedTable:
+    def __init__(self, path, local_path, rows_spec, partition_sizes):
+        self.path = path
+        self.local_path = local_path
+        self.partition_files = rows_spec["_partFiles"]
+        self.has_index = rows_spec.get("_indexSpec") is not None
+        self.partition_sizes = partition_sizes
+
+        # Partitions are sorted by key, so contigs appear in the range bounds in
+        #   the reference genome's order. Contigs that do not appear in the range
+        #   bounds have no rows in the table.
+        self.contig_order = {}
+        self.partition_bounds = []
+        for bounds in rows_spec["_jRangeBounds"]:
+            start = self._get_locus_key(bounds["start"])
+            end = self._get_locus_key(bounds["end"])
+            self.partition_bounds.append((start, end))
+
+    def _get_locus_key(self, key):
+        contig = key["locus"]["contig"]
+        if contig not in self.contig_order:
+            self.contig_order[contig] = len(self.contig_order)
+
+        return (self.contig_order[contig], key["locus"]["position"])
+
+    def get_partitions(self, intervals):
+        """
+        Return the names of partitions that may contain rows in the given intervals.
+
+        Intervals are (contig, start, end) tuples, inclusive of both ends.
+        """
+        partitions = set()
+        for contig, start, end in intervals:
+            if contig not in self.contig_order:
+                continue
+
+            interval_start = (self.contig_order[contig], start)
+            interval_end = (self.contig_order[contig], end)
+
+            # Range bounds include the alleles, which are ignored here, so both
+            #   ends are treated as included.
+            partitions.update(
+                partition_file
+                for partition_file, (partition_start, partition_end) in zip(
+                    self.partition_files, self.partition_bounds
+                )
+                if partition_start <= interval_end and interval_start <= partition_end
+            )
+
+        return sorted(partitions)
+
+
+class PartitionCache:
+    """
+    Size bounded cache of table partitions on local disk.
+
+    The file system used to read tables defaults to hailtop.fs. Anything with
+    the same open, ls, and copy functions can be used instead, such as a stand-in
+    for the bucket that reads from a local directory.
+    """
+
+    def __init__(self, cache_path, max_size, fs=hfs):
+        self.cache_path = cache_path
+        self.max_size = max_size
+        self.fs = fs
+
+        self._tables = {}
+        # (local table path, partition file) -> size of partition and its index
+        self._partitions = collections.OrderedDict()
+        self._size = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes_fetched": 0}
+        # Number of running jobs that have been handed each partition
+        self._pin_counts = collections.Counter()
+        self._lock = threading.Lock()
+        # Serialize copies of the same table's metadata or the same partition,
+        #   without blocking copies of other files
+        self._copy_locks = collections.defaultdict(threading.Lock)
+        self._job = threading.local()
+
+        os.makedirs(self.cache_path, exist_ok=True)
+        self._load_partitions()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                "num_partitions": len(self._partitions),
+                "size": self._size,
+                "max_size": self.max_size,
+            }
+
+    @contextlib.contextmanager
+    def pin_partitions(self):
+        """
+        Pin partitions handed out to the current thread until the block exits.
+
+        A job should read all of its tables within this block, so that a table
+        read later in the job cannot evict partitions that the job's pending
+        Hail pipeline will read.
+        """
+        pins = set()
+        self._job.pins = pins
+        try:
+            yield
+        finally:
+            self._job.pins = None
+            with self._lock:
+                self._unpin(pins)
+                self._evict_partitions()
+
+    def get_table_path(self, path, intervals):
+        """
+        Fetch the partitions of a table that overlap the given intervals.
+
+        Returns the path to the local copy of the table, which should only be
+        read after being filtered to the same intervals.
+        """
+        table = self._get_table(path)
+        partitions = table.get_partitions(intervals)
+
+        # Outside of pin_partitions, partitions are only pinned for this call
+        job_pins = getattr(self._job, "pins", None)
+        pins = job_pins if job_pins is not None else set()
+
+        missing_partitions = []
+        with self._lock:
+            for partition_file in partitions:
+                key = (table.local_path, partition_file)
+                self._pin(key, pins)
+                if key in self._partitions and self._has_expected_size(
+                    table, partition_file
+                ):
+                    self._partitions.move_to_end(key)
+                    # Recently used partitions are kept when the worker restarts
+                    os.utime(self._get_partition_paths(*key)[0])
+                    self._stats["hits"] += 1
+                else:
+                    missing_partitions.append(partition_file)
+
+        try:
+            for partition_file in missing_partitions:
+                self._fetch_partition(table, partition_file)
+        finally:
+            with self._lock:
+                if job_pins is None:
+                    self._unpin(pins)
+                self._evict_partitions(keep=pins)
+
+        return table.local_path
+
+    def _pin(self, key, pins):
+        if key not in pins:
+            pins.add(key)
+            self._pin_counts[key] += 1
+
+    def _unpin(self, pins):
+        for key in pins:
+            self._pin_counts[key] -= 1
+            if self._pin_counts[key] <= 0:
+                del self._pin_counts[key]
+
+    def _get_local_path(self, path):
+        path_hash = hashlib.sha256(path.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_path, f"{path_hash}-{get_basename(path)}")
+
+    def _read_remote_file(self, path):
+        with self.fs.open(path, "rb") as f:
+            return f.read()
+
+    def _get_table(self, path):
+        with self._lock:
+            if path in self._tables:
+                return self._tables[path]
+            copy_lock = self._copy_locks[path]
+
+        with copy_lock:
+            with self._lock:
+                if path in self._tables:
+                    return self._tables[path]
+
+            table = self._open_table(path)
+            with self._lock:
+                self._tables[path] = table
+
+            return table
+
+    def _open_table(self, path):
+        local_path = self._get_local_path(path)
+
+        fingerprint = hashlib.sha256()
+        for metadata_file in TABLE_METADATA_FILES:
+            fingerprint.update(self._read_remote_file(join_path(path, metadata_file)))
+        fingerprint = fingerprint.hexdigest()
+
+        try:
+            with open(
+                os.path.join(local_path, FINGERPRINT_FILE), "r", encoding="utf-8"
+            ) as f:
+                local_fingerprint = f.read()
+        except FileNotFoundError:
+            local_fingerprint = None
+
+        if local_fingerprint != fingerprint:
+            if local_fingerprint is not None:
+                logger.info("Discarding outdated local copy of %s", path)
+
+            logger.info("Copying metadata for %s", path)
+            self._remove_table(local_path)
+            self._copy_table_metadata(path, local_path, fingerprint)
+
+        with gzip.open(os.path.join(local_path, "rows", "metadata.json.gz")) as f:
+            rows_spec = json.load(f)
+
+        partition_sizes = {
+            get_basename(entry.path): entry.size
+            for entry in self.fs.ls(join_path(path, "rows/parts"))
+        }
+
+        return CachedTable(path, local_path, rows_spec, partition_sizes)
+
+    def _copy_table_metadata(self, path, local_path, fingerprint):
+        tmp_path = f"{local_path}.{uuid.uuid4().hex}.tmp"
+
+        def copy_directory(remote_directory, relative_path):
+            os.makedirs(os.path.join(tmp_path, relative_path), exist_ok=True)
+            for entry in self.fs.ls(remote_directory):
+                entry_relative_path = os.path.join(
+                    relative_path, get_basename(entry.path)
+                )
+                if entry_relative_path in PARTITION_DIRECTORIES:
+                    os.makedirs(os.path.join(tmp_path, entry_relative_path))
+                elif entry.is_dir():
+                    copy_directory(entry.path, entry_relative_path)
+                else:
+                    self.fs.copy(
+                        entry.path, os.path.join(tmp_path, entry_relative_path)
+                    )
+
+        try:
+            copy_directory(path, "")
+            with open(
+                os.path.join(tmp_path, FINGERPRINT_FILE), "w", encoding="utf-8"
+            ) as f:
+                f.write(fingerprint)
+
+            os.replace(tmp_path, local_path)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    def _remove_table(self, local_path):
+        with self._lock:
+            for key in [key for key in self._partitions if key[0] == local_path]:
+                self._size -= self._partitions.pop(key)
+
+        shutil.rmtree(local_path, ignore_errors=True)
+
+    def _get_partition_paths(self, local_path, partition_file):
+        return (
+            os.path.join(local_path, "rows", "parts", partition_file),
+            os.path.join(local_path, "index", f"{partition_file}.idx"),
+        )
+
+    def _has_expected_size(self, table, partition_file):
+        """
+        Check that a partition on disk has the size listed in the bucket.
+
+        This detects truncated or missing copies. It does not validate the
+        contents of the partition.
+        """
+        partition_path, _ = self._get_partition_paths(table.local_path, partition_file)
+        try:
+            return (
+                os.path.getsize(partition_path) == table.partition_sizes[partition_file]
+            )
+        except OSError:
+            return False
+
+    def _fetch_partition(self, table, partition_file):
+        key = (table.local_path, partition_file)
+        with self._lock:
+            copy_lock = self._copy_locks[key]
+
+        with copy_lock:
+            with self._lock:
+                # Another job may have copied the partition while this one waited
+                if key in self._partitions and self._has_expected_size(
+                    table, partition_file
+                ):
+                    self._partitions.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return
+
+                self._stats["misses"] += 1
+
+            self._copy_partition(table, partition_file)
+
+    def _copy_partition(self, table, partition_file):
+        key = (table.local_path, partition_file)
+        partition_path, index_path = self._get_partition_paths(
+            table.local_path, partition_file
+        )
+        tmp_suffix = f".{uuid.uuid4().hex}.tmp"
+
+        try:
+            self.fs.copy(
+                join_path(table.path, "rows/parts", partition_file),
+                partition_path + tmp_suffix,
+            )
+            if os.path.getsize(partition_path + tmp_suffix) != (
+                table.partition_sizes[partition_file]
+            ):
+                raise IOError(
+                    f"Incomplete copy of {table.path} partition {partition_file}"
+                )
+
+            if table.has_index:
+                remote_index_path = join_path(
+                    table.path, "index", f"{partition_file}.idx"
+                )
+                os.makedirs(index_path + tmp_suffix)
+                for entry in self.fs.ls(remote_index_path):
+                    self.fs.copy(
+                        entry.path,
+                        os.path.join(index_path + tmp_suffix, get_basename(entry.path)),
+                    )
+
+            with self._lock:
+                if key in self._partitions:
+                    self._remove_partition(key)
+
+                if table.has_index:
+                    shutil.rmtree(index_path, ignore_errors=True)
+                    os.replace(index_path + tmp_suffix, index_path)
+
+                # The partition is moved into place last, so that a partition
+                #   file is only present once its index is.
+                os.replace(partition_path + tmp_suffix, partition_path)
+
+                size = os.path.getsize(partition_path) + get_directory_size(index_path)
+                self._partitions[key] = size
+                self._size += size
+                self._stats["bytes_fetched"] += size
+        finally:
+            if os.path.exists(partition_path + tmp_suffix):
+                os.remove(partition_path + tmp_suffix)
+            shutil.rmtree(index_path + tmp_suffix, ignore_errors=True)
+
+    def _remove_partition(self, key):
+        self._size -= self._partitions.pop(key)
+
+        partition_path, index_path = self._get_partition_paths(*key)
+        if os.path.exists(partition_path):
+            os.remove(partition_path)
+        shutil.rmtree(index_path, ignore_errors=True)
+
+    def _evict_partitions(self, keep=frozenset()):
+        for key in list(self._partitions):
+            if self._size <= self.max_size:
+                break
+
+            if key not in keep and key not in self._pin_counts:
+                self._remove_partition(key)
+                self._stats["evictions"] += 1
+
+    def _load_partitions(self):
+        """Add partitions copied by earlier processes to the cache, oldest first."""
+        partitions = []
+        for table_directory in os.listdir(self.cache_path):
+            local_path = os.path.join(self.cache_path, table_directory)
+            if table_directory.endswith(".tmp") or not os.path.exists(
+                os.path.join(local_path, FINGERPRINT_FILE)
+            ):
+                # Left behind by an interrupted copy
+                shutil.rmtree(local_path, ignore_errors=True)
+                continue
+
+            parts_path = os.path.join(local_path, "rows", "parts")
+            for partition_file in os.listdir(parts_path):
+                partition_path, index_path = self._get_partition_paths(
+                    local_path, partition_file
+                )
+                if partition_file.endswith(".tmp"):
+                    os.remove(partition_path)
+                    continue
+
+                partitions.append(
+                    (
+                        os.path.getmtime(partition_path),
+                        (local_path, partition_file),
+                        os.path.getsize(partition_path)
+                        + get_directory_size(index_path),
+                    )
+                )
+
+        for _, key, size in sorted(partitions):
+            self._partitions[key] = size
+            self._size += size
+
+
+@functools.lru_cache(maxsize=None)
+def get_partition_cache():
+    """Return this process's partition cache, or None if the cache is disabled."""
+    if not settings.WORKER_PARTITION_CACHE_PATH:
+        return None
+
+    return PartitionCache(
+        settings.WORKER_PARTITION_CACHE_PATH,
+        int(settings.WORKER_PARTITION_CACHE_MAX_SIZE_IN_GB * 1024**3),
+    )
+
+
+def pin_job_partitions():
+    """Pin cached partitions handed out to the current job until it finishes."""
+    partition_cache = get_partition_cache()
+    if not partition_cache:
+        return contextlib.nullcontext()
+
+    return partition_cache.pin_partitions()
@@ -194,3 +194,57 @@ HAIL_LOG_PATH = os.getenv("HAIL_LOG_PATH", os.devnull)
 GNOMAD_DATA_PATH = os.environ["GNOMAD_DATA_PATH"].rstrip("/")
 
 CLINVAR_DATA_PATH = os.environ["CLINVAR_DATA_PATH"].rstrip("/")
+
+# gnomAD versions to run a warm-up pipeline for when the worker starts. The
+#   worker reports itself as ready once the warm-up has finished.
+WORKER_WARMUP_GNOMAD_VERSIONS = [
+    gnomad_version.strip()
+    for gnomad_version in os.getenv("WORKER_WARMUP_GNOMAD_VERSIONS", "").split(",")
+    if gnomad_version.strip()
+]
+
+# gnomAD versions to read serving tables for. Serving tables are built by the
+#   prepare_serving_variants pipeline and have ClinVar and LoF curation results
+#   already joined.
+WORKER_SERVING_TABLE_GNOMAD_VERSIONS = [
+    gnomad_version.strip()
+    for gnomad_version in os.getenv("WORKER_SERVING_TABLE_GNOMAD_VERSIONS", "").split(
+        ","
+    )
+    if gnomad_version.strip()
+]
+
+# Directory on local disk to cache partitions of the gnomAD and ClinVar tables in.
+#   Tables are read directly from GNOMAD_DATA_PATH and CLINVAR_DATA_PATH if unset.
+WORKER_PARTITION_CACHE_PATH = os.getenv("WORKER_PARTITION_CACHE_PATH")
+
+WORKER_PARTITION_CACHE_MAX_SIZE_IN_GB = float(
+    os.getenv("WORKER_PARTITION_CACHE_MAX_SIZE_IN_GB", "20")
+)
+
+# "push" processes the variant list named in each Pub/Sub message. "pull" treats
+#   messages only as a signal to claim queued variant lists from the database.
+JOB_QUEUE_MODE = os.getenv("JOB_QUEUE_MODE", "push")
+
+JOB_QUEUE_LEASE_IN_SECONDS = int(os.getenv("JOB_QUEUE_LEASE_IN_SECONDS", "300"))
+
+JOB_QUEUE_HEARTBEAT_INTERVAL_IN_SECONDS = int(
+    os.getenv("JOB_QUEUE_HEARTBEAT_INTERVAL_IN_SECONDS", "60")
+)
+
+JOB_QUEUE_POLL_INTERVAL_IN_SECONDS = int(
+    os.getenv("JOB_QUEUE_POLL_INTERVAL_IN_SECONDS", "10")
+)
+
+# Several small jobs may be claimed and processed together
+JOB_QUEUE_MAX_JOBS_PER_CLAIM = int(os.getenv("JOB_QUEUE_MAX_JOBS_PER_CLAIM", "5"))
+
+JOB_QUEUE_SMALL_JOB_MAX_VARIANTS = int(
+    os.getenv("JOB_QUEUE_SMALL_JOB_MAX_VARIANTS", "100")
+)
+
+# Maximum number of jobs processed at once in the large and bulk lanes, across all
+#   workers. Interactive jobs are not limited.
+JOB_QUEUE_MAX_LARGE_JOBS = int(os.getenv("JOB_QUEUE_MAX_LARGE_JOBS", "2"))
+
+JOB_QUEUE_MAX_BULK_JOBS = int(os.getenv("JOB_QUEUE_MAX_BULK_JOBS", "1"))
@@ -6,15 +6,24 @@ import time
 import traceback
 import uuid
 import signal
+import threading
 
 import hail as hl
 import requests
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
 import requests
 
 
-from calculator.models import VariantList, DashboardList
+from calculator.constants import GNOMAD_REFERENCE_GENOMES
+from calculator.models import VariantList, DashboardList, OutboxMessage
+
+from .lanes import LaneAtCapacityError, get_num_free_slots
+from .leases import LeaseHeartbeat, get_lease_expiration, get_worker_id
+from .partition_cache import get_partition_cache, pin_job_partitions
 from calculator.serializers import (
     VariantListSerializer,
     DashboardListSerializer,
@@ -28,6 +37,15 @@ EXIT_SEQUENCE_STARTED = False
 logger = logging.getLogger(__name__)
 
 
+CLINVAR_FIELDS = [
+    "clinvar_variation_id",
+    "clinical_significance",
+    "clinical_significance_category",
+    "conflicting_clinical_significance_categories",
+    "gold_stars",
+]
+
+
 PLOF_VEP_CONSEQUENCE_TERMS = hl.set(
     [
         "transcript_ablation",
@@ -90,6 +108,169 @@ STRUCTURAL_VARIANT_FIELDS = [
 ]
 
 
+class TableRegistry:
+    """
+    Hail tables opened by this process.
+
+    Each table is read once per process and shared by every job, along with its
+    evaluated globals, so that jobs after the first do not read table metadata
+    from remote storage again. A table's reference genome is read when the table
+    is opened and checked against what callers expect.
+    """
+
+    def __init__(self):
+        self._tables = {}
+        self._reference_genomes = {}
+        self._globals = {}
+        self._lock = threading.Lock()
+
+    def get_table(self, path, reference_genome=None):
+        with self._lock:
+            if path not in self._tables:
+                table = hl.read_table(path)
+                self._tables[path] = table
+                self._reference_genomes[path] = (
+                    table.locus.dtype.reference_genome.name
+                    if "locus" in table.row
+                    else None
+                )
+
+            table = self._tables[path]
+
+        if reference_genome is not None:
+            assert (
+                self._reference_genomes[path] == reference_genome
+            ), f"{path} uses {self._reference_genomes[path]}, not {reference_genome}"
+
+        return table
+
+    def get_table_in_intervals(self, path, intervals, reference_genome=None):
+        """
+        Return a table filtered to the given (contig, start, end) intervals.
+
+        If the partition cache is enabled, the partitions overlapping the intervals
+        are read from local disk.
+        """
+        partition_cache = get_partition_cache()
+        if partition_cache:
+            path = partition_cache.get_table_path(path, intervals)
+
+        table = self.get_table(path, reference_genome)
+        return hl.filter_intervals(
+            table,
+            [
+                hl.locus_interval(
+                    contig,
+                    start,
+                    end,
+                    includes_end=True,
+                    reference_genome=self._reference_genomes[path],
+                )
+                for contig, start, end in intervals
+            ],
+        )
+
+    def get_globals(self, path):
+        table = self.get_table(path)
+        with self._lock:
+            if path not in self._globals:
+                self._globals[path] = hl.eval(table.globals)
+
+            return self._globals[path]
+
+    def clear(self):
+        with self._lock:
+            self._tables.clear()
+            self._reference_genomes.clear()
+            self._globals.clear()
+
+
+tables = TableRegistry()
+
+
+def get_gnomad_variants_path(gnomad_version):
+    return f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_variants.ht"
+
+
+def get_clinvar_variants_path(reference_genome):
+    return f"{settings.CLINVAR_DATA_PATH}/ClinVar_{reference_genome}_variants.ht"
+
+
+def get_serving_variants_path(gnomad_version):
+    return f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_serving_variants.ht"
+
+
+def uses_serving_variants(gnomad_version):
+    """
+    Whether to read a gnomAD version's serving table, which has ClinVar and LoF
+    curation results already joined, instead of joining them for each job.
+    """
+    return gnomad_version in settings.WORKER_SERVING_TABLE_GNOMAD_VERSIONS
+
+
+def get_gnomad_variants(gnomad_version, intervals):
+    return tables.get_table_in_intervals(
+        get_gnomad_variants_path(gnomad_version),
+        intervals,
+        GNOMAD_REFERENCE_GENOMES.get(gnomad_version),
+    )
+
+
+def get_clinvar_variants(reference_genome, intervals):
+    return tables.get_table_in_intervals(
+        get_clinvar_variants_path(reference_genome), intervals, reference_genome
+    )
+
+
+def get_serving_variants(gnomad_version, intervals):
+    return tables.get_table_in_intervals(
+        get_serving_variants_path(gnomad_version),
+        intervals,
+        GNOMAD_REFERENCE_GENOMES.get(gnomad_version),
+    )
+
+
+def get_transcript_consequences_path(gnomad_version):
+    return f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_transcript_consequences.ht"
+
+
+def get_transcript_consequences(gnomad_version, transcript_id):
+    """
+    Return the consequences of variants in a transcript, keyed by locus and alleles.
+
+    The transcript consequences table is keyed by transcript ID first, so this
+    reads only the rows for the transcript.
+    """
+    table = tables.get_table(
+        get_transcript_consequences_path(gnomad_version),
+        GNOMAD_REFERENCE_GENOMES.get(gnomad_version),
+    )
+    table = hl.filter_intervals(
+        table,
+        [
+            hl.interval(
+                hl.struct(transcript_id=transcript_id),
+                hl.struct(transcript_id=transcript_id),
+                includes_start=True,
+                includes_end=True,
+            )
+        ],
+    )
+
+    return table.key_by("locus", "alleles").drop("transcript_id")
+
+
+def get_gnomad_populations(gnomad_version):
+    if uses_serving_variants(gnomad_version):
+        return tables.get_globals(get_serving_variants_path(gnomad_version)).populations
+
+    return tables.get_globals(get_gnomad_variants_path(gnomad_version)).populations
+
+
+def get_clinvar_release_date(reference_genome):
+    return tables.get_globals(get_clinvar_variants_path(reference_genome)).release_date
+
+
 def log_container_identity():
     marker_file = "/tmp/container_id"
 
@@ -135,10 +316,27 @@ def is_hail_working():
         return False
 
 
+_request_state = threading.local()
+
+
+def keep_container_after_request():
+    """
+    Do not recycle the container after the current request.
+
+    Only for requests that do not run a job, such as readiness checks. Recycling
+    after those would stop a new container before it receives any jobs.
+    """
+    _request_state.keep_container = True
+
+
 def exit_after_job_finished(sender, **kwargs):  # pylint: disable=unused-argument
     global IS_SHUTTING_DOWN
     global EXIT_SEQUENCE_STARTED
 
+    if getattr(_request_state, "keep_container", False):
+        _request_state.keep_container = False
+        return
+
     if EXIT_SEQUENCE_STARTED:
         return
 
@@ -299,6 +497,31 @@ def fetch_transcript(transcript_id, gnomad_version):
     raise Exception("Failed to fetch transcript.")
 
 
+def get_transcript_interval(transcript, reference_genome):
+    contig = transcript["chrom"]
+    if reference_genome == "GRCh38":
+        contig = f"chr{contig}"
+
+    return (contig, transcript["start"], transcript["stop"])
+
+
+def get_variant_list_intervals(variant_list, gnomad_version):
+    """
+    Return (contig, start, end) intervals containing each variant in a list.
+
+    Reference tables are filtered to these intervals before being joined, so that
+    only the partitions containing the list's variants are read.
+    """
+    chrom_prefix = "" if gnomad_version == "2.1.1" else "chr"
+
+    intervals = []
+    for variant in variant_list.variants:
+        chrom, pos, *_ = variant["id"].split("-")
+        intervals.append((f"{chrom_prefix}{chrom}", int(pos), int(pos)))
+
+    return intervals
+
+
 def get_recommended_variants(metadata, transcript):
     gnomad_version = metadata["gnomad_version"]
     reference_genome = metadata["reference_genome"]
@@ -306,51 +529,51 @@ def get_recommended_variants(metadata, transcript):
     subset = "_non_ukb" if gnomad_version == "4.0.0_non-ukb" else ""
     gnomad_version = "4.1.0" if gnomad_version == "4.0.0" else gnomad_version
 
-    ds = hl.read_table(
-        f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_variants.ht"
-    )
-
-    assert ds.locus.dtype.reference_genome.name == reference_genome
-
-    contig = transcript["chrom"]
-    if reference_genome == "GRCh38":
-        contig = f"chr{contig}"
-
-    ds = hl.filter_intervals(
-        ds,
-        [
-            hl.interval(
-                hl.locus(contig, transcript["start"], reference_genome),
-                hl.locus(contig, transcript["stop"], reference_genome),
-                includes_start=True,
-                includes_end=True,
-            )
-        ],
-    )
-
-    if gnomad_version == "4.1.0":
-        ds.transmute(
-            freq=hl.struct(
-                exome=ds.freq[f"exome{subset}"],
-                genome=ds.freq[f"genome{subset}"],
-                joint=ds.freq["joint"],
+    intervals = [get_transcript_interval(transcript, reference_genome)]
+
+    if uses_serving_variants(gnomad_version):
+        # Variants with a consequence in the transcript, read by key
+        ds = get_transcript_consequences(gnomad_version, metadata["transcript_id"])
+        ds = ds.annotate(
+            clinvar=hl.or_missing(
+                hl.is_defined(ds.clinical_significance_category),
+                ds.row.select(
+                    "clinical_significance_category",
+                    "conflicting_clinical_significance_categories",
+                ),
             )
         )
     else:
-        ds.transmute(
-            freq=hl.struct(
-                exome=ds.freq[f"exome{subset}"],
-                genome=ds.freq[f"genome{subset}"],
-            )
+        ds = tables.get_table_in_intervals(
+            get_gnomad_variants_path(gnomad_version), intervals, reference_genome
         )
 
-    ds = ds.transmute(
-        transcript_consequence=ds.transcript_consequences.find(
-            lambda csq: csq.transcript_id == metadata["transcript_id"]
+        if gnomad_version == "4.1.0":
+            ds.transmute(
+                freq=hl.struct(
+                    exome=ds.freq[f"exome{subset}"],
+                    genome=ds.freq[f"genome{subset}"],
+                    joint=ds.freq["joint"],
+                )
+            )
+        else:
+            ds.transmute(
+                freq=hl.struct(
+                    exome=ds.freq[f"exome{subset}"],
+                    genome=ds.freq[f"genome{subset}"],
+                )
+            )
+
+        ds = ds.transmute(
+            transcript_consequence=ds.transcript_consequences.find(
+                lambda csq: csq.transcript_id == metadata["transcript_id"]
+            )
         )
-    )
-    ds = ds.filter(hl.is_defined(ds.transcript_consequence))
-    ds = ds.transmute(**ds.transcript_consequence)
+        ds = ds.filter(hl.is_defined(ds.transcript_consequence))
+        ds = ds.transmute(**ds.transcript_consequence)
+
+        clinvar = get_clinvar_variants(reference_genome, intervals)
+        ds = ds.annotate(clinvar=clinvar[ds.locus, ds.alleles].select(*CLINVAR_FIELDS))
 
     # TODO: add a test for this
     if (
@@ -367,10 +590,6 @@ def get_recommended_variants(metadata, transcript):
 
     ds = ds.annotate(include_from_gnomad=include_from_gnomad)
 
-    clinvar = hl.read_table(
-        f"{settings.CLINVAR_DATA_PATH}/ClinVar_{reference_genome}_variants.ht"
-    )
-
     if not metadata["include_clinvar_clinical_significance"]:
         ds = ds.annotate(include_from_clinvar=False)
     else:
@@ -383,7 +602,7 @@ def get_recommended_variants(metadata, transcript):
                 "pathogenic_or_likely_pathogenic"
             )
             & (
-                clinvar[ds.locus, ds.alleles].clinical_significance_category
+                ds.clinvar.clinical_significance_category
                 == "pathogenic_or_likely_pathogenic"
             )
         ) | (
@@ -391,13 +610,11 @@ def get_recommended_variants(metadata, transcript):
                 "conflicting_interpretations"
             )
             & (
-                clinvar[ds.locus, ds.alleles].clinical_significance_category
+                ds.clinvar.clinical_significance_category
                 == "conflicting_interpretations"
             )
             & (
-                clinvar[
-                    ds.locus, ds.alleles
-                ].conflicting_clinical_significance_categories.contains(
+                ds.clinvar.conflicting_clinical_significance_categories.contains(
                     "pathogenic_or_likely_pathogenic"
                 )
             )
@@ -410,11 +627,8 @@ def get_recommended_variants(metadata, transcript):
     # filter out any variant included from gnomAD that has a B/LB classification from ClinVar
     ds = ds.annotate(
         has_benign_or_likely_benign_classification_in_clinvar=hl.if_else(
-            hl.is_defined(clinvar[ds.locus, ds.alleles])
-            & (
-                clinvar[ds.locus, ds.alleles].clinical_significance_category
-                == "benign_or_likely_benign"
-            ),
+            hl.is_defined(ds.clinvar)
+            & (ds.clinvar.clinical_significance_category == "benign_or_likely_benign"),
             True,
             False,
         )
@@ -449,13 +663,7 @@ def _import_existing_variants(variant_list, gnomad_version, reference_genome):
     return ds
 
 
-def _annotate_variants_with_gnomAD(ds, variant_list, gnomad_version, metadata):
-    gnomad = hl.read_table(
-        f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_variants.ht"
-    )
-
-    ds = ds.annotate(**gnomad[ds.locus, ds.alleles])
-
+def _select_transcript_consequence(ds, metadata):
     if metadata.get("transcript_id"):
         ds = ds.transmute(
             transcript_consequence=ds.transcript_consequences.find(
@@ -465,10 +673,19 @@ def _annotate_variants_with_gnomAD(ds, variant_list, gnomad_version, metadata):
     else:
         ds = ds.transmute(transcript_consequence=ds.transcript_consequences.first())
 
-    ds = ds.transmute(**ds.transcript_consequence)
+    return ds.transmute(**ds.transcript_consequence)
 
-    populations = hl.eval(gnomad.globals.populations)
-    variant_list.metadata["populations"] = populations
+
+def _annotate_variants_with_gnomAD(
+    ds, variant_list, gnomad_version, metadata, intervals
+):
+    gnomad = get_gnomad_variants(gnomad_version, intervals)
+
+    ds = ds.annotate(**gnomad[ds.locus, ds.alleles])
+    ds = _select_transcript_consequence(ds, metadata)
+
+    populations = get_gnomad_populations(gnomad_version)
+    variant_list.metadata["populations"] = list(populations)
 
     ds = ds.annotate(
         **combined_freq(
@@ -479,12 +696,12 @@ def _annotate_variants_with_gnomAD(ds, variant_list, gnomad_version, metadata):
     return ds
 
 
-def _annotate_variants_with_ClinVar(ds, variant_list, reference_genome):
-    clinvar = hl.read_table(
-        f"{settings.CLINVAR_DATA_PATH}/ClinVar_{reference_genome}_variants.ht"
-    )
+def _annotate_variants_with_ClinVar(ds, variant_list, reference_genome, intervals):
+    clinvar = get_clinvar_variants(reference_genome, intervals)
 
-    variant_list.metadata["clinvar_version"] = hl.eval(clinvar.globals.release_date)
+    variant_list.metadata["clinvar_version"] = get_clinvar_release_date(
+        reference_genome
+    )
 
     ds = ds.annotate(
         **clinvar[ds.locus, ds.alleles].select(
@@ -498,10 +715,48 @@ def _annotate_variants_with_ClinVar(ds, variant_list, reference_genome):
     return ds
 
 
+def _annotate_variants_with_serving_variants(
+    ds, variant_list, gnomad_version, metadata, intervals
+):
+    serving_variants = get_serving_variants(gnomad_version, intervals)
+    serving_variants_globals = tables.get_globals(
+        get_serving_variants_path(gnomad_version)
+    )
+
+    ds = ds.annotate(**serving_variants[ds.locus, ds.alleles])
+    ds = _select_transcript_consequence(ds, metadata)
+
+    populations = serving_variants_globals.populations
+    variant_list.metadata["populations"] = list(populations)
+    variant_list.metadata[
+        "clinvar_version"
+    ] = serving_variants_globals.clinvar_release_date
+
+    # Frequencies are combined when the serving table is built
+    zeroes = hl.range(1 + len(populations)).map(lambda _: 0)
+    ds = ds.annotate(
+        **{
+            field: hl.or_else(ds.freq[field], zeroes)
+            for field in ("AC", "AN", "homozygote_count")
+        }
+    )
+
+    return ds
+
+
 def _annotate_variants_with_LoF_curation(ds, metadata, gnomad_version):
     gene_id, gene_version = metadata["gene_id"].split(".")
 
-    lof_curation_results = hl.read_table(
+    if uses_serving_variants(gnomad_version):
+        ds = ds.annotate(
+            lof_curation=ds.lof_curations.find(
+                lambda result: result.gene_id == gene_id
+            ).select("verdict", "flags", "project")
+        )
+
+        return ds
+
+    lof_curation_results = tables.get_table(
         f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_lof_curation_results.ht"
     )
 
@@ -611,6 +866,7 @@ def _process_variant_list(variant_list):
     reference_genome = metadata["reference_genome"]
 
     ds = None
+    intervals = get_variant_list_intervals(variant_list, gnomad_version)
 
     if variant_list.variants:
         ds = _import_existing_variants(variant_list, gnomad_version, reference_genome)
@@ -624,6 +880,7 @@ def _process_variant_list(variant_list):
             time.strftime("%Y-%m-%d %H:%M:%S"),
         )
         recommended_variants = get_recommended_variants(metadata, transcript)
+        intervals.append(get_transcript_interval(transcript, reference_genome))
         if ds:
             ds = ds.join(recommended_variants, how="outer")
         else:
@@ -631,11 +888,28 @@ def _process_variant_list(variant_list):
 
     ds = ds.annotate(id=variant_id(ds.locus, ds.alleles))
 
-    logger.info("  Annotating with gnomAD at: %s", time.strftime("%Y-%m-%d %H:%M:%S"))
-    ds = _annotate_variants_with_gnomAD(ds, variant_list, gnomad_version, metadata)
+    if uses_serving_variants(gnomad_version):
+        logger.info(
+            "  Annotating with gnomAD and ClinVar at: %s",
+            time.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        ds = _annotate_variants_with_serving_variants(
+            ds, variant_list, gnomad_version, metadata, intervals
+        )
+    else:
+        logger.info(
+            "  Annotating with gnomAD at: %s", time.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        ds = _annotate_variants_with_gnomAD(
+            ds, variant_list, gnomad_version, metadata, intervals
+        )
 
-    logger.info("  Annotating with ClinVar at: %s", time.strftime("%Y-%m-%d %H:%M:%S"))
-    ds = _annotate_variants_with_ClinVar(ds, variant_list, reference_genome)
+        logger.info(
+            "  Annotating with ClinVar at: %s", time.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        ds = _annotate_variants_with_ClinVar(
+            ds, variant_list, reference_genome, intervals
+        )
 
     ds = ds.transmute(
         source=hl.array(
@@ -671,7 +945,8 @@ def _process_variant_list(variant_list):
     )
     variants = [json.loads(variant) for variant in hl.json(ds.row_value).collect()]
     variant_list.variants = variants
-    variant_list.save()
+    # metadata may include the gene symbol added above
+    variant_list.save(update_fields=["variants", "metadata", "updated_at"])
     logger.info(
         "  Finished loading short variants at: %s", time.strftime("%Y-%m-%d %H:%M:%S")
     )
@@ -686,7 +961,7 @@ def _process_variant_list(variant_list):
             for structural_variant in hl.json(structural_variants.row_value).collect()
         ]
         variant_list.structural_variants = structural_variants
-        variant_list.save()
+        variant_list.save(update_fields=["structural_variants", "updated_at"])
         logger.info("  Finished loading SVs at: %s", time.strftime("%Y-%m-%d %H:%M:%S"))
 
 
@@ -699,7 +974,7 @@ def annotate_structural_variants_with_flags(ds):
 
 
 def get_structural_variants(structural_variants, metadata, gnomad_version):
-    gnomad_structural_variants = hl.read_table(
+    gnomad_structural_variants = tables.get_table(
         f"{settings.GNOMAD_DATA_PATH}/gnomAD_v{gnomad_version}_structural_variants.ht"
     )
 
@@ -746,30 +1021,176 @@ def get_structural_variants(structural_variants, metadata, gnomad_version):
     return ds
 
 
-def process_variant_list(uid):
-    global IS_SHUTTING_DOWN
+def start_variant_list_job(uid, generation, worker_id):
+    """
+    Mark a variant list as processing for its latest job generation.
+
+    Returns None if the message for the given generation should be dropped,
+    because that generation has already been started or because a newer
+    generation will be processed instead.
+    """
+    with transaction.atomic():
+        variant_list = VariantList.objects.select_for_update().get(uuid=uid)
+        job_counters = VariantList.objects.filter(id=variant_list.id)
+
+        if generation is not None:
+            # A list that is queued again for a generation that was started was
+            #   released by a worker that could not finish the run
+            if (
+                generation <= variant_list.started_generation
+                and variant_list.status != VariantList.Status.QUEUED
+            ):
+                logger.info(
+                    "Dropping message for %s, generation %d was already started",
+                    uid,
+                    generation,
+                )
+                job_counters.update(num_dropped_jobs=F("num_dropped_jobs") + 1)
+                return None
+
+            is_in_progress = (
+                variant_list.status == VariantList.Status.PROCESSING
+                and variant_list.lease_expires_at
+                and variant_list.lease_expires_at > timezone.now()
+            )
+            if generation < variant_list.job_generation or is_in_progress:
+                # The newest generation is processed by its own message or, if a
+                #   run is in progress, by a requeue when that run finishes
+                logger.info("Coalescing message for %s, generation %d", uid, generation)
+                job_counters.update(num_coalesced_jobs=F("num_coalesced_jobs") + 1)
+                return None
+
+        if get_num_free_slots(variant_list.lane, exclude_id=variant_list.id) == 0:
+            raise LaneAtCapacityError(
+                f"{VariantList.Lane(variant_list.lane).label} jobs lane is at capacity"
+            )
+
+        variant_list.set_status(
+            VariantList.Status.PROCESSING,
+            lease_owner=worker_id,
+            lease_expires_at=get_lease_expiration(),
+            processing_attempts=variant_list.processing_attempts + 1,
+        )
+
+        job_counters.update(started_generation=variant_list.job_generation)
+        variant_list.started_generation = variant_list.job_generation
 
+    return variant_list
+
+
+def requeue_if_requested_again(variant_list):
+    """Requeue a variant list if processing was requested again during a run."""
+    with transaction.atomic():
+        num_requeued = VariantList.objects.filter(
+            id=variant_list.id,
+            lease_owner__isnull=True,
+            job_generation__gt=variant_list.started_generation,
+        ).update(status=VariantList.Status.QUEUED, processing_attempts=0)
+
+        if num_requeued:
+            variant_list.refresh_from_db(
+                fields=["status", "processing_attempts", "job_generation"]
+            )
+            variant_list.record_processing_event("queued")
+            logger.info(
+                "Requeuing %s for generation %d",
+                variant_list.uuid,
+                variant_list.job_generation,
+            )
+            # published to the worker by the website's scheduled outbox dispatch
+            OutboxMessage.objects.create(message=variant_list.get_process_message())
+
+
+def process_variant_list(uid, generation=None):
     if IS_SHUTTING_DOWN:
         logger.info("Worker is about to recycle - refuse job")
         raise RuntimeError("Worker is about to recycle - retry on another")
 
-    start_time = time.time()
+    worker_id = get_worker_id()
+
+    variant_list = start_variant_list_job(uid, generation, worker_id)
+    if variant_list is None:
+        return
+
     logger.info(
         "Processing new variant list %s at: %s", uid, time.strftime("%Y-%m-%d %H:%M:%S")
     )
 
-    variant_list = VariantList.objects.get(uuid=uid)
-    variant_list.status = VariantList.Status.PROCESSING
-    variant_list.save()
+    # Heartbeats show that the list is still being worked on, if this worker
+    #   dies the lease expires and the list can be requeued
+    with LeaseHeartbeat(worker_id, [variant_list.id]):
+        run_variant_list_job(variant_list)
+
+
+def finish_variant_list_job(variant_list, status, **fields):
+    """
+    Record the outcome of a run, unless another run has since claimed the list.
+
+    Returns whether the outcome was recorded.
+    """
+    if not variant_list.set_finished_status(status, **fields):
+        logger.warning(
+            "Not recording result of %s for generation %d, the list was claimed by another run",
+            variant_list.uuid,
+            variant_list.started_generation,
+        )
+        return False
+
+    variant_list.record_processing_event("finished")
+    return True
+
+
+def release_variant_list_job(variant_list):
+    """
+    Return a variant list to the queue after a run that this worker could not
+    finish, so that it is processed again when its message is redelivered.
+
+    The list is only released if it is still leased to the run's worker for the
+    generation that the run started. Returns whether the list was released.
+    """
+    num_released = VariantList.objects.filter(
+        id=variant_list.id,
+        lease_owner=variant_list.lease_owner,
+        started_generation=variant_list.started_generation,
+    ).update(
+        status=VariantList.Status.QUEUED,
+        lease_owner=None,
+        lease_expires_at=None,
+        updated_at=timezone.now(),
+    )
+    if not num_released:
+        return False
+
+    variant_list.status = VariantList.Status.QUEUED
+    variant_list.lease_owner = None
+    variant_list.lease_expires_at = None
+    return True
+
+
+def run_variant_list_job(variant_list):
+    """Process a variant list that has been marked as processing."""
+    global IS_SHUTTING_DOWN
+
+    uid = variant_list.uuid
+    start_time = time.time()
+
+    variant_list.record_processing_event("started")
 
     try:
-        _process_variant_list(variant_list)
+        # Tables are read lazily, so cached partitions used by the job must be
+        #   kept until it finishes
+        with pin_job_partitions():
+            _process_variant_list(variant_list)
 
     except (ConnectionRefusedError, requests.exceptions.ConnectionError):
         logger.warning(
             f"Worker got ConnectionRefused. Raise error to recycle this worker {uid}."
         )
         IS_SHUTTING_DOWN = True
+        # Another worker processes the list when its message is redelivered
+        if release_variant_list_job(variant_list):
+            requeue_if_requested_again(variant_list)
+
         raise RuntimeError("Connection refused, force this container to recycle")
 
     except Exception:  # pylint: disable=broad-except
@@ -778,10 +1199,9 @@ def process_variant_list(uid):
             extra={"json_fields": {"variant_list": str(uid)}},
         )
 
-        variant_list.refresh_from_db()
-        variant_list.status = VariantList.Status.ERROR
-        variant_list.error = traceback.format_exc()
-        variant_list.save()
+        is_finished = finish_variant_list_job(
+            variant_list, VariantList.Status.ERROR, error=traceback.format_exc()
+        )
         IS_SHUTTING_DOWN = True
 
     else:
@@ -794,11 +1214,13 @@ def process_variant_list(uid):
             duration,
         )
 
-        variant_list.status = VariantList.Status.READY
-
-        variant_list.save()
+        is_finished = finish_variant_list_job(variant_list, VariantList.Status.READY)
         IS_SHUTTING_DOWN = True
 
+    # A run that lost its lease must not requeue a list that another run holds
+    if is_finished:
+        requeue_if_requested_again(variant_list)
+
 
 def handle_event(event):
     try:
@@ -806,7 +1228,9 @@ def handle_event(event):
         args = event["args"]
 
         if event_type == "process_variant_list":
-            process_variant_list(uuid.UUID(hex=args["uuid"]))
+            process_variant_list(
+                uuid.UUID(hex=args["uuid"]), generation=args.get("generation")
+            )
 
     except KeyError:
         logger.error("Invalid event %s", event)
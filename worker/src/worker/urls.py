@@ -1,9 +1,12 @@
 from django.urls import path
 
-from worker.views import receive_message_view
+from worker.views import readiness_view, receive_message_view
 
 
-urlpatterns = [path("", receive_message_view, name="receive-message")]
+urlpatterns = [
+    path("", receive_message_view, name="receive-message"),
+    path("ready/", readiness_view, name="readiness"),
+]
 
 handler400 = "rest_framework.exceptions.bad_request"  # pylint: disable=invalid-name
 handler500 = "rest_framework.exceptions.server_error"  # pylint: disable=invalid-name
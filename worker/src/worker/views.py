@@ -3,14 +3,23 @@ import binascii
 import json
 import logging
 
+from django.conf import settings
 from rest_framework import status
-from rest_framework.decorators import api_view, authentication_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 
 
-from .tasks import handle_event
+from .job_queue import run_queued_jobs
+from .lanes import LaneAtCapacityError
+from .partition_cache import get_partition_cache
+from .tasks import handle_event, keep_container_after_request
+from .warmup import get_status, has_finished
 
 
 logger = logging.getLogger(__name__)
@@ -38,6 +47,45 @@ def receive_message_view(request):
 
     logger.info("Received message %s", payload)
 
-    handle_event(payload)
+    if settings.JOB_QUEUE_MODE == "pull":
+        # The message only signals that there is work in the queue
+        run_queued_jobs()
+    else:
+        try:
+            handle_event(payload)
+        except LaneAtCapacityError as e:
+            # Pub/Sub redelivers the message after its retry backoff. No job was
+            #   run, so the warm container is kept for the next message.
+            logger.info("Deferring message: %s", e)
+            keep_container_after_request()
+            return Response(status=status.HTTP_429_TOO_MANY_REQUESTS)
 
     return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+@api_view(["GET"])
+@authentication_classes([])
+@permission_classes([])
+def readiness_view(request):  # pylint: disable=unused-argument
+    """
+    Report whether the worker has warmed up and is ready to process jobs.
+
+    A worker whose warm-up failed is reported as ready, with the failed status and
+    the error, since it can still process jobs.
+    """
+    keep_container_after_request()
+
+    response = get_status()
+
+    partition_cache = get_partition_cache()
+    if partition_cache:
+        response["partition_cache"] = partition_cache.get_stats()
+
+    return Response(
+        response,
+        status=(
+            status.HTTP_200_OK
+            if has_finished()
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+    )
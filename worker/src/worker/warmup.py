@@ -0,0 +1,147 @@
+"""
+Warm-up run when a worker starts.
+
+The first job on a new container would otherwise pay for compiling Hail and Spark
+code and for loading table metadata. The warm-up runs a small pipeline like the
+one used for jobs against each configured gnomAD version, and loads the table
+globals that jobs read. The worker reports itself as ready once the warm-up has
+finished, so that jobs are only routed to warm workers.
+
+A failed warm-up is retried with backoff. If every attempt fails, the worker
+still reports itself as ready, with the error, and processes jobs without the
+warm-up. Otherwise it would never become ready, and the platform would restart
+it again and again.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+from calculator.constants import GNOMAD_REFERENCE_GENOMES
+
+from .tasks import (
+    get_clinvar_release_date,
+    get_clinvar_variants,
+    get_gnomad_populations,
+    get_gnomad_variants,
+    get_serving_variants,
+    uses_serving_variants,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+# A small region, in PCSK9, read by the warm-up pipeline
+WARMUP_INTERVALS = {
+    "GRCh37": ("1", 55505000, 55506000),
+    "GRCh38": ("chr1", 55039000, 55040000),
+}
+
+WARMUP_ATTEMPTS = 3
+
+# Seconds to wait before retrying the warm-up, doubled after each failed attempt
+WARMUP_RETRY_DELAY = 10
+
+
+class WarmupStatus:
+    PENDING = "pending"
+    WARMING_UP = "warming up"
+    READY = "ready"
+    FAILED = "failed"
+
+
+_state = {"status": WarmupStatus.PENDING, "error": None}
+
+_state_lock = threading.Lock()
+
+_finished = threading.Event()
+
+
+def set_status(status, error=None):
+    with _state_lock:
+        _state["status"] = status
+        _state["error"] = error
+
+    if status in (WarmupStatus.READY, WarmupStatus.FAILED):
+        _finished.set()
+
+
+def get_status():
+    with _state_lock:
+        return dict(_state)
+
+
+def is_ready():
+    return get_status()["status"] == WarmupStatus.READY
+
+
+def has_finished():
+    """Return whether the warm-up has succeeded or has failed for good."""
+    return get_status()["status"] in (WarmupStatus.READY, WarmupStatus.FAILED)
+
+
+def warm_up_gnomad_version(gnomad_version):
+    reference_genome = GNOMAD_REFERENCE_GENOMES[gnomad_version]
+
+    intervals = [WARMUP_INTERVALS[reference_genome]]
+
+    get_gnomad_populations(gnomad_version)
+
+    if uses_serving_variants(gnomad_version):
+        ds = get_serving_variants(gnomad_version, intervals)
+        ds = ds.select("clinical_significance")
+    else:
+        get_clinvar_release_date(reference_genome)
+
+        ds = get_gnomad_variants(gnomad_version, intervals)
+        clinvar = get_clinvar_variants(reference_genome, intervals)
+        ds = ds.select(
+            clinical_significance=clinvar[ds.locus, ds.alleles].clinical_significance
+        )
+
+    ds.collect()
+
+
+def warm_up():
+    """Run the warm-up pipeline for each gnomAD version configured for warm-up."""
+    gnomad_versions = settings.WORKER_WARMUP_GNOMAD_VERSIONS
+    if not gnomad_versions:
+        set_status(WarmupStatus.READY)
+        return
+
+    set_status(WarmupStatus.WARMING_UP)
+    start_time = time.time()
+
+    for attempt in range(1, WARMUP_ATTEMPTS + 1):
+        try:
+            for gnomad_version in gnomad_versions:
+                logger.info("Warming up gnomAD %s", gnomad_version)
+                warm_up_gnomad_version(gnomad_version)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("Warm-up attempt %d failed", attempt)
+            if attempt == WARMUP_ATTEMPTS:
+                set_status(WarmupStatus.FAILED, error=str(e))
+                return
+
+            set_status(WarmupStatus.WARMING_UP, error=str(e))
+            time.sleep(WARMUP_RETRY_DELAY * 2 ** (attempt - 1))
+        else:
+            logger.info("Warm-up finished in %.2f seconds", time.time() - start_time)
+            set_status(WarmupStatus.READY)
+            return
+
+
+def start_warm_up():
+    """Run the warm-up in the background, so that readiness checks are answered."""
+    if get_status()["status"] != WarmupStatus.PENDING:
+        return
+
+    set_status(WarmupStatus.WARMING_UP)
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+def wait_for_warm_up(timeout=None):
+    return _finished.wait(timeout)
@@ -0,0 +1,160 @@
+# pylint: disable=no-self-use
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from calculator.models import VariantList
+from worker.job_queue import claim_jobs, run_queued_jobs
+from worker.lanes import LANE_LOCK_NAMESPACE
+
+
+def create_variant_list(
+    label, num_variants=1, include_recommended=False, lane=VariantList.Lane.INTERACTIVE
+):
+    metadata = {
+        "version": "2",
+        "gnomad_version": "4.1.0",
+    }
+    if include_recommended:
+        metadata.update(
+            {
+                "gene_id": "ENSG00000169174.11",
+                "transcript_id": "ENST00000302118.5",
+                "include_gnomad_plof": True,
+            }
+        )
+
+    return VariantList.objects.create(
+        label=label,
+        type=(
+            VariantList.Type.RECOMMENDED
+            if include_recommended
+            else VariantList.Type.CUSTOM
+        ),
+        metadata=metadata,
+        variants=[{"id": f"1-55516888-G-A{i}"} for i in range(num_variants)],
+        lane=lane,
+    )
+
+
+@pytest.mark.django_db
+class TestJobQueue:
+    def test_claims_queued_variant_lists(self):
+        variant_list = create_variant_list("List 1")
+
+        claimed = claim_jobs("worker-1")
+        assert [v.id for v in claimed] == [variant_list.id]
+
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.PROCESSING
+        assert variant_list.lease_owner == "worker-1"
+        assert variant_list.lease_expires_at is not None
+        assert variant_list.processing_attempts == 1
+
+        assert not claim_jobs("worker-2")
+
+    def test_claims_several_small_jobs_at_once(self):
+        create_variant_list("List 1")
+        create_variant_list("List 2")
+        create_variant_list("List 3", include_recommended=True)
+
+        claimed = claim_jobs("worker-1", max_jobs=3)
+        assert [v.label for v in claimed] == ["List 1", "List 2"]
+
+    def test_claims_large_jobs_alone(self):
+        create_variant_list("List 1", include_recommended=True)
+        create_variant_list("List 2")
+
+        claimed = claim_jobs("worker-1", max_jobs=3)
+        assert [v.label for v in claimed] == ["List 1"]
+
+    def test_claims_jobs_in_priority_order(self):
+        create_variant_list("Bulk", lane=VariantList.Lane.BULK)
+        create_variant_list(
+            "Large", include_recommended=True, lane=VariantList.Lane.LARGE
+        )
+        create_variant_list("Interactive")
+
+        assert [v.label for v in claim_jobs("worker-1")] == ["Interactive"]
+        assert [v.label for v in claim_jobs("worker-1")] == ["Large"]
+        assert [v.label for v in claim_jobs("worker-1")] == ["Bulk"]
+
+    def test_does_not_claim_jobs_from_lane_at_capacity(self, settings):
+        settings.JOB_QUEUE_MAX_BULK_JOBS = 1
+
+        create_variant_list("Bulk 1", lane=VariantList.Lane.BULK)
+        create_variant_list("Bulk 2", lane=VariantList.Lane.BULK)
+
+        assert [v.label for v in claim_jobs("worker-1", max_jobs=3)] == ["Bulk 1"]
+        assert not claim_jobs("worker-2")
+
+    def test_claims_jobs_only_from_given_lanes(self):
+        create_variant_list("Interactive")
+        create_variant_list("Bulk", lane=VariantList.Lane.BULK)
+
+        claimed = claim_jobs("worker-1", lanes=[VariantList.Lane.BULK])
+        assert [v.label for v in claimed] == ["Bulk"]
+
+    def test_claims_from_limited_lanes_while_holding_lane_lock(self, monkeypatch):
+        connection = MagicMock(vendor="postgresql")
+        cursor = connection.cursor.return_value.__enter__.return_value
+        monkeypatch.setattr("worker.lanes.connection", connection)
+
+        create_variant_list("Bulk", lane=VariantList.Lane.BULK)
+
+        claim_jobs("worker-1", lanes=[VariantList.Lane.BULK])
+        cursor.execute.assert_called_once_with(
+            "SELECT pg_advisory_xact_lock(%s, %s)",
+            [LANE_LOCK_NAMESPACE, ord(VariantList.Lane.BULK)],
+        )
+
+    def test_run_queued_jobs_releases_leases(self, monkeypatch):
+        mock_run_variant_list_job = Mock()
+        monkeypatch.setattr(
+            "worker.job_queue.run_variant_list_job", mock_run_variant_list_job
+        )
+
+        create_variant_list("List 1")
+        create_variant_list("List 2")
+
+        assert run_queued_jobs("worker-1") == 2
+        assert mock_run_variant_list_job.call_count == 2
+        assert not VariantList.objects.filter(lease_owner__isnull=False).exists()
+
+    def test_run_queued_jobs_requeues_unstarted_jobs_on_failure(self, monkeypatch):
+        monkeypatch.setattr(
+            "worker.job_queue.run_variant_list_job",
+            Mock(side_effect=RuntimeError("Connection refused")),
+        )
+
+        create_variant_list("List 1")
+        create_variant_list("List 2")
+
+        with pytest.raises(RuntimeError):
+            run_queued_jobs("worker-1")
+
+        assert VariantList.objects.get(label="List 1").lease_owner == "worker-1"
+        unstarted_list = VariantList.objects.get(label="List 2")
+        assert unstarted_list.status == VariantList.Status.QUEUED
+        assert unstarted_list.processing_attempts == 0
+
+    def test_run_queued_jobs_requeues_next_job_if_releasing_lease_fails(
+        self, monkeypatch
+    ):
+        monkeypatch.setattr("worker.job_queue.run_variant_list_job", Mock())
+        mock_release_lease = Mock(
+            side_effect=[RuntimeError("Database unavailable"), None]
+        )
+        monkeypatch.setattr("worker.job_queue.release_lease", mock_release_lease)
+
+        create_variant_list("List 1")
+        create_variant_list("List 2")
+
+        with pytest.raises(RuntimeError):
+            run_queued_jobs("worker-1")
+
+        # The second list was not started, so it is returned to the queue
+        assert mock_release_lease.call_count == 2
+        requeued_list = mock_release_lease.call_args.args[1]
+        assert requeued_list.label == "List 2"
+        assert mock_release_lease.call_args.kwargs == {"requeue": True}
@@ -0,0 +1,180 @@
+# pylint: disable=no-self-use
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from worker.partition_cache import PartitionCache
+
+
+class LocalFileListEntry:
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+
+    def is_dir(self):
+        return os.path.isdir(self.path)
+
+
+class LocalFileSystem:
+    """Stand-in for a bucket that reads tables from a local directory."""
+
+    def __init__(self):
+        self.copied_paths = []
+
+    def open(self, path, mode="r"):
+        return open(path, mode)  # pylint: disable=unspecified-encoding
+
+    def ls(self, path):
+        return [
+            LocalFileListEntry(os.path.join(path, name))
+            for name in sorted(os.listdir(path))
+        ]
+
+    def copy(self, src, dest):
+        self.copied_paths.append(src)
+        shutil.copyfile(src, dest)
+
+
+def write_json(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with gzip.open(path, "wt") as f:
+        json.dump(value, f)
+
+
+def write_table(path, partition_size=100, version=1):
+    """Write a table with one partition for each of three regions of chromosome 1."""
+    partition_files = ["part-0", "part-1", "part-2"]
+    bounds = [(1, 999), (1000, 1999), (2000, 2999)]
+
+    write_json(os.path.join(path, "metadata.json.gz"), {"version": version})
+    write_json(
+        os.path.join(path, "rows", "metadata.json.gz"),
+        {
+            "_partFiles": partition_files,
+            "_indexSpec": {},
+            "_jRangeBounds": [
+                {
+                    "start": {"locus": {"contig": "1", "position": start}},
+                    "end": {"locus": {"contig": "1", "position": end}},
+                    "includeStart": True,
+                    "includeEnd": True,
+                }
+                for start, end in bounds
+            ],
+        },
+    )
+    write_json(os.path.join(path, "globals", "metadata.json.gz"), {})
+
+    os.makedirs(os.path.join(path, "rows", "parts"), exist_ok=True)
+    for partition_file in partition_files:
+        with open(os.path.join(path, "rows", "parts", partition_file), "wb") as f:
+            f.write(b"\0" * partition_size)
+
+        index_path = os.path.join(path, "index", f"{partition_file}.idx")
+        os.makedirs(index_path, exist_ok=True)
+        with open(os.path.join(index_path, "index"), "wb") as f:
+            f.write(b"\0" * 10)
+
+
+@pytest.fixture(name="table_path")
+def fixture_table_path(tmp_path):
+    path = str(tmp_path / "bucket" / "variants.ht")
+    write_table(path)
+    return path
+
+
+class TestPartitionCache:
+    def test_copies_partitions_overlapping_intervals(self, tmp_path, table_path):
+        fs = LocalFileSystem()
+        cache = PartitionCache(str(tmp_path / "cache"), max_size=1000, fs=fs)
+
+        local_path = cache.get_table_path(table_path, [("1", 1500, 2500)])
+
+        assert sorted(os.listdir(os.path.join(local_path, "rows", "parts"))) == [
+            "part-1",
+            "part-2",
+        ]
+        assert sorted(os.listdir(os.path.join(local_path, "index"))) == [
+            "part-1.idx",
+            "part-2.idx",
+        ]
+        assert os.path.exists(os.path.join(local_path, "globals", "metadata.json.gz"))
+
+        num_copies = len(fs.copied_paths)
+        cache.get_table_path(table_path, [("1", 1200, 1300), ("2", 1, 100)])
+        assert len(fs.copied_paths) == num_copies
+
+        assert cache.get_stats() == {
+            "hits": 1,
+            "misses": 2,
+            "evictions": 0,
+            "bytes_fetched": 220,
+            "num_partitions": 2,
+            "size": 220,
+            "max_size": 1000,
+        }
+
+    def test_evicts_least_recently_used_partitions(self, tmp_path, table_path):
+        cache = PartitionCache(
+            str(tmp_path / "cache"), max_size=250, fs=LocalFileSystem()
+        )
+
+        cache.get_table_path(table_path, [("1", 100, 100)])
+        cache.get_table_path(table_path, [("1", 1100, 1100)])
+        cache.get_table_path(table_path, [("1", 100, 100)])
+        local_path = cache.get_table_path(table_path, [("1", 2100, 2100)])
+
+        assert sorted(os.listdir(os.path.join(local_path, "rows", "parts"))) == [
+            "part-0",
+            "part-2",
+        ]
+        assert cache.get_stats()["evictions"] == 1
+
+        # Partitions already on disk are used by a new process
+        cache = PartitionCache(
+            str(tmp_path / "cache"), max_size=250, fs=LocalFileSystem()
+        )
+        cache.get_table_path(table_path, [("1", 100, 100)])
+        assert cache.get_stats()["hits"] == 1
+
+    def test_discards_copy_of_changed_table(self, tmp_path, table_path):
+        cache = PartitionCache(
+            str(tmp_path / "cache"), max_size=1000, fs=LocalFileSystem()
+        )
+        cache.get_table_path(table_path, [("1", 100, 100)])
+
+        shutil.rmtree(table_path)
+        write_table(table_path, partition_size=50, version=2)
+
+        cache = PartitionCache(
+            str(tmp_path / "cache"), max_size=1000, fs=LocalFileSystem()
+        )
+        local_path = cache.get_table_path(table_path, [("1", 100, 100)])
+
+        assert (
+            os.path.getsize(os.path.join(local_path, "rows", "parts", "part-0")) == 50
+        )
+        assert cache.get_stats()["misses"] == 1
+
+    def test_keeps_partitions_pinned_by_running_job(self, tmp_path, table_path):
+        cache = PartitionCache(
+            str(tmp_path / "cache"), max_size=150, fs=LocalFileSystem()
+        )
+
+        with cache.pin_partitions():
+            cache.get_table_path(table_path, [("1", 100, 100)])
+            local_path = cache.get_table_path(table_path, [("1", 1100, 1100)])
+
+            # The first partition is still needed by the job
+            assert sorted(os.listdir(os.path.join(local_path, "rows", "parts"))) == [
+                "part-0",
+                "part-1",
+            ]
+            assert cache.get_stats()["evictions"] == 0
+
+        # Partitions are evicted once the job finishes
+        assert len(os.listdir(os.path.join(local_path, "rows", "parts"))) == 1
+        assert cache.get_stats()["evictions"] == 1
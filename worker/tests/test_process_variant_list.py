@@ -1,11 +1,13 @@
 # pylint: disable=no-self-use
 import base64
 import json
+from unittest.mock import Mock
 
 import pytest
 from rest_framework.test import APIClient
 
 from calculator.models import VariantList
+from worker.tasks import run_variant_list_job, start_variant_list_job
 
 
 TEST_CASES = [
@@ -266,3 +268,26 @@ class TestProcessVariantList:
         self._request_process_variant_list(variant_list)
         variant_list.refresh_from_db()
         assert variant_list.variants
+
+
+@pytest.mark.django_db
+class TestConnectionRefused:
+    def test_releases_list_for_redelivered_message(self, monkeypatch):
+        monkeypatch.setattr(
+            "worker.tasks._process_variant_list",
+            Mock(side_effect=ConnectionRefusedError()),
+        )
+        monkeypatch.setattr("worker.tasks.IS_SHUTTING_DOWN", False)
+
+        variant_list = VariantList.objects.create(**TEST_CASES[-1], job_generation=1)
+
+        started_list = start_variant_list_job(variant_list.uuid, 1, "worker-1")
+        with pytest.raises(RuntimeError):
+            run_variant_list_job(started_list)
+
+        variant_list.refresh_from_db()
+        assert variant_list.status == VariantList.Status.QUEUED
+        assert variant_list.lease_owner is None
+
+        # The redelivered message is processed by another worker
+        assert start_variant_list_job(variant_list.uuid, 1, "worker-2") is not None
@@ -0,0 +1,70 @@
+# pylint: disable=no-self-use
+from unittest.mock import Mock
+
+import pytest
+from rest_framework.test import APIClient
+
+from worker.warmup import WARMUP_ATTEMPTS, WarmupStatus, get_status, set_status, warm_up
+
+
+class TestReadinessView:
+    @pytest.fixture(autouse=True)
+    def reset_warmup_status(self):
+        yield
+        set_status(WarmupStatus.READY)
+
+    @pytest.mark.parametrize(
+        "warmup_status,expected_response",
+        [
+            (WarmupStatus.WARMING_UP, 503),
+            (WarmupStatus.FAILED, 200),
+            (WarmupStatus.READY, 200),
+        ],
+    )
+    def test_reports_ready_once_warmed_up(self, warmup_status, expected_response):
+        set_status(warmup_status)
+
+        client = APIClient()
+        response = client.get("/ready/")
+        assert response.status_code == expected_response
+        assert response.json()["status"] == warmup_status
+
+    def test_does_not_recycle_container(self, monkeypatch):
+        set_status(WarmupStatus.READY)
+        kill = Mock()
+        monkeypatch.setattr("worker.tasks.os.kill", kill)
+        monkeypatch.setattr("worker.tasks.time.sleep", Mock())
+
+        client = APIClient()
+        response = client.get("/ready/")
+        assert response.status_code == 200
+        kill.assert_not_called()
+
+
+class TestWarmUp:
+    @pytest.fixture(autouse=True)
+    def reset_warmup_status(self, settings, monkeypatch):
+        settings.WORKER_WARMUP_GNOMAD_VERSIONS = ["4.1.1"]
+        monkeypatch.setattr("worker.warmup.time.sleep", Mock())
+        yield
+        set_status(WarmupStatus.READY)
+
+    def test_retries_failed_warm_up(self, monkeypatch):
+        warm_up_gnomad_version = Mock(side_effect=[Exception("Timed out"), None])
+        monkeypatch.setattr(
+            "worker.warmup.warm_up_gnomad_version", warm_up_gnomad_version
+        )
+
+        warm_up()
+        assert warm_up_gnomad_version.call_count == 2
+        assert get_status() == {"status": WarmupStatus.READY, "error": None}
+
+    def test_reports_error_after_last_attempt(self, monkeypatch):
+        warm_up_gnomad_version = Mock(side_effect=Exception("Timed out"))
+        monkeypatch.setattr(
+            "worker.warmup.warm_up_gnomad_version", warm_up_gnomad_version
+        )
+
+        warm_up()
+        assert warm_up_gnomad_version.call_count == WARMUP_ATTEMPTS
+        assert get_status() == {"status": WarmupStatus.FAILED, "error": "Timed out"}
@@ -6,6 +6,8 @@ from unittest.mock import Mock
 import pytest
 from rest_framework.test import APIClient
 
+from worker.lanes import LaneAtCapacityError
+
 
 class TestReceiveMessage:
     @pytest.fixture(autouse=True)
@@ -61,3 +63,19 @@ class TestReceiveMessage:
         )
         assert response.status_code == 204
         self.mock_handle_event.assert_called_with(payload)
+
+    def test_deferring_message_does_not_recycle_container(self, monkeypatch):
+        self.mock_handle_event.side_effect = LaneAtCapacityError(
+            "Bulk jobs lane is at capacity"
+        )
+        kill = Mock()
+        monkeypatch.setattr("worker.tasks.os.kill", kill)
+        monkeypatch.setattr("worker.tasks.time.sleep", Mock())
+
+        client = APIClient()
+        response = client.post(
+            "/",
+            {"message": {"data": base64.b64encode(json.dumps({}).encode("utf-8"))}},
+        )
+        assert response.status_code == 429
+        kill.assert_not_called()
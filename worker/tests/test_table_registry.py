@@ -0,0 +1,41 @@
+# pylint: disable=no-self-use
+from unittest.mock import MagicMock, Mock
+
+import pytest
+
+from worker.tasks import TableRegistry
+
+
+def mock_table(reference_genome):
+    table = MagicMock()
+    table.row = {"locus": Mock()}
+    table.locus.dtype.reference_genome.name = reference_genome
+    return table
+
+
+class TestTableRegistry:
+    def test_reads_each_table_once(self, monkeypatch):
+        mock_read_table = Mock(side_effect=lambda path: mock_table("GRCh38"))
+        monkeypatch.setattr("worker.tasks.hl.read_table", mock_read_table)
+        mock_eval = Mock(return_value={"release_date": "2024-06-01"})
+        monkeypatch.setattr("worker.tasks.hl.eval", mock_eval)
+
+        registry = TableRegistry()
+        table = registry.get_table("ClinVar_GRCh38_variants.ht", "GRCh38")
+        assert registry.get_table("ClinVar_GRCh38_variants.ht") is table
+        assert registry.get_globals("ClinVar_GRCh38_variants.ht") == {
+            "release_date": "2024-06-01"
+        }
+        registry.get_globals("ClinVar_GRCh38_variants.ht")
+
+        mock_read_table.assert_called_once_with("ClinVar_GRCh38_variants.ht")
+        mock_eval.assert_called_once()
+
+    def test_checks_reference_genome(self, monkeypatch):
+        monkeypatch.setattr(
+            "worker.tasks.hl.read_table", Mock(return_value=mock_table("GRCh37"))
+        )
+
+        registry = TableRegistry()
+        with pytest.raises(AssertionError):
+            registry.get_table("gnomAD_v2.1.1_variants.ht", "GRCh38")